@@ -0,0 +1,357 @@
+"""
+Almacén columnar en memoria de animales y decomisos para las estadísticas.
+
+Carga una sola vez las columnas que usan los análisis en arreglos compactos de NumPy
+(especie, sexo, producto y motivo como códigos de categoría, peso float32, fechas
+datetime64[D] e ids int32) y calcula agrupaciones, histogramas y percentiles
+vectorizados sobre cualquier filtro sin volver a consultar la base. refrescar() trae
+solo las filas con id mayor al último cargado: animales y decomisos solo reciben
+inserciones.
+
+    from analitica import analitica
+    analitica.refrescar()
+    seleccion = analitica.filtrar(id_establecimiento=3, desde="2024-01-01")
+    seleccion.contar_por("especie")                 # {"Bovino": 120, "Porcino": 45}
+    seleccion.percentiles_peso_por("especie")       # {"Bovino": [380.0, 452.5, 530.0], ...}
+    seleccion.contar_decomisos_por("producto")      # {"Hígado": 12, ...}
+"""
+import threading
+
+import numpy as np
+
+from consultas import LOTE_ANALITICA, OperacionesDB
+
+# Columnas por las que se puede agrupar además de las categorías: las fechas
+# truncadas al día, a la semana (desde el lunes) o al mes
+GRANULARIDADES = ("dia", "semana", "mes")
+
+COLUMNAS_ANIMAL = ("especie", "sexo", "id_establecimiento")
+
+
+class Categorias:
+    """Códigos enteros de una columna de texto; el código 0 es el valor vacío (NULL o '')."""
+
+    def __init__(self):
+        self.etiquetas = [None]
+        self._codigos = {None: 0, "": 0}
+
+    def codificar(self, valores):
+        codigos = self._codigos
+        resultado = np.empty(len(valores), dtype=np.int16)
+        for i, valor in enumerate(valores):
+            codigo = codigos.get(valor)
+            if codigo is None:
+                codigo = codigos[valor] = len(self.etiquetas)
+                self.etiquetas.append(valor)
+            resultado[i] = codigo
+        return resultado
+
+    def codigo(self, valor):
+        """Código del valor, o -1 si nunca se cargó (no coincide con ninguna fila)."""
+        return self._codigos.get(valor, -1)
+
+
+class _Tabla:
+    """
+    Columnas de NumPy del mismo largo que crecen duplicando su capacidad, como una lista.
+    Las filas ya cargadas no se modifican, así las vistas de columnas() siguen siendo
+    válidas aunque después se agreguen filas.
+    """
+
+    def __init__(self, tipos):
+        self.cantidad = 0
+        self._columnas = {nombre: np.empty(0, dtype=tipo) for nombre, tipo in tipos.items()}
+
+    def agregar(self, valores):
+        total = self.cantidad + len(valores["id"])
+        for nombre, nuevos in valores.items():
+            columna = self._columnas[nombre]
+            if total > len(columna):
+                ampliada = np.empty(max(total, 2 * len(columna)), dtype=columna.dtype)
+                ampliada[:self.cantidad] = columna[:self.cantidad]
+                self._columnas[nombre] = columna = ampliada
+            columna[self.cantidad:total] = nuevos
+        self.cantidad = total
+
+    def columnas(self):
+        return {nombre: columna[:self.cantidad] for nombre, columna in self._columnas.items()}
+
+
+def _enteros(filas, indice):
+    return np.fromiter((fila[indice] or 0 for fila in filas), dtype=np.int32, count=len(filas))
+
+
+def _fechas(filas, indice):
+    # Las fechas nulas quedan como NaT y no cumplen ningún filtro de rango
+    return np.array([fila[indice] for fila in filas], dtype="datetime64[D]")
+
+
+def truncar_fechas(fechas, granularidad):
+    """Lleva cada fecha al primer día de su periodo ("dia", "semana" desde el lunes o "mes")."""
+    if granularidad == "dia":
+        return fechas
+    if granularidad == "semana":
+        # Las semanas de NumPy empiezan el jueves (1970-01-01); se corren 3 días para empezar el lunes
+        tres_dias = np.timedelta64(3, "D")
+        return (fechas + tres_dias).astype("datetime64[W]").astype("datetime64[D]") - tres_dias
+    if granularidad == "mes":
+        return fechas.astype("datetime64[M]").astype("datetime64[D]")
+    raise ValueError(f"Granularidad no soportada: {granularidad}")
+
+
+class Analitica:
+    """Columnas de animales y decomisos en memoria; se comparte entre las pantallas del proceso."""
+
+    def __init__(self, conexion_db=None):
+        # Sin conexion_db cada refresco usa OperacionesDB.fabrica_conexion, como los catálogos
+        self.conexion_db = conexion_db
+        self._lock = threading.Lock()
+        self.especies = Categorias()
+        self.sexos = Categorias()
+        self.productos = Categorias()
+        self.motivos = Categorias()
+        self._animales = _Tabla({"id": np.int32, "id_establecimiento": np.int32, "especie": np.int16,
+                                 "sexo": np.int16, "peso": np.float32, "fecha": "datetime64[D]"})
+        # fila_animal: posición del animal del decomiso en las columnas de animales
+        self._decomisos = _Tabla({"id": np.int32, "fila_animal": np.int32, "producto": np.int16,
+                                  "motivo": np.int16, "fecha": "datetime64[D]"})
+        self.ultimo_animal = 0
+        self.ultimo_decomiso = 0
+
+    @property
+    def marca(self):
+        """(último id de animales, último id de decomisos) cargados; comparable con OperacionesDB.obtener_marca_cambios()."""
+        return (self.ultimo_animal, self.ultimo_decomiso)
+
+    def refrescar(self):
+        """
+        Carga los animales y decomisos con id mayor al último cargado.
+        Retorna la cantidad de filas nuevas, o None si la base no respondió (se conservan los datos anteriores).
+        """
+        with self._lock:
+            db = OperacionesDB(self.conexion_db)
+            # Decomisos antes que animales: todo animal de un decomiso leído ya existe al leer los animales
+            decomisos = self._leer(db.obtener_columnas_decomisos, self.ultimo_decomiso)
+            if decomisos is None:
+                return None
+            animales = self._leer(db.obtener_columnas_animales, self.ultimo_animal)
+            if animales is None:
+                return None
+
+            if animales:
+                self._animales.agregar({
+                    "id": _enteros(animales, 0),
+                    "id_establecimiento": _enteros(animales, 1),
+                    "especie": self.especies.codificar([fila[2] for fila in animales]),
+                    "sexo": self.sexos.codificar([fila[3] for fila in animales]),
+                    "peso": np.array([np.nan if fila[4] is None else float(fila[4]) for fila in animales],
+                                     dtype=np.float32),
+                    "fecha": _fechas(animales, 5),
+                })
+                self.ultimo_animal = animales[-1][0]
+            if decomisos:
+                # Los ids de animales están ordenados: la posición de cada uno se busca en bloque
+                ids = self._animales.columnas()["id"]
+                filas = np.searchsorted(ids, _enteros(decomisos, 1)).astype(np.int32)
+                self._decomisos.agregar({
+                    "id": _enteros(decomisos, 0),
+                    "fila_animal": filas,
+                    "producto": self.productos.codificar([fila[2] for fila in decomisos]),
+                    "motivo": self.motivos.codificar([fila[3] for fila in decomisos]),
+                    "fecha": _fechas(decomisos, 4),
+                })
+                self.ultimo_decomiso = decomisos[-1][0]
+            return len(animales) + len(decomisos)
+
+    @staticmethod
+    def _leer(obtener, desde_id):
+        filas = []
+        while True:
+            lote = obtener(desde_id)
+            if lote is None:
+                return None
+            filas.extend(lote)
+            if len(lote) < LOTE_ANALITICA:
+                return filas
+            desde_id = lote[-1][0]
+
+    def filtrar(self, id_establecimiento=None, especie=None, sexo=None, desde=None, hasta=None):
+        """
+        Retorna la Seleccion de los animales que cumplen los filtros (None = sin filtro) y
+        de sus decomisos. desde y hasta (inclusive) se comparan con la fecha de ingreso.
+        """
+        with self._lock:
+            animales = self._animales.columnas()
+            decomisos = self._decomisos.columnas()
+        mascara = np.ones(len(animales["id"]), dtype=bool)
+        if id_establecimiento is not None:
+            mascara &= animales["id_establecimiento"] == id_establecimiento
+        if especie is not None:
+            mascara &= animales["especie"] == self.especies.codigo(especie)
+        if sexo is not None:
+            mascara &= animales["sexo"] == self.sexos.codigo(sexo)
+        if desde is not None:
+            mascara &= animales["fecha"] >= np.datetime64(desde, "D")
+        if hasta is not None:
+            mascara &= animales["fecha"] <= np.datetime64(hasta, "D")
+        return Seleccion(self, animales, decomisos, mascara)
+
+
+class Seleccion:
+    """
+    Animales filtrados de Analitica y sus decomisos. Los resultados por grupo son
+    diccionarios {valor: resultado}: por categoría en el orden en que aparecieron en
+    la base y por fecha ("dia", "semana", "mes") en orden cronológico, con la fecha
+    de inicio del periodo como "YYYY-MM-DD".
+    """
+
+    def __init__(self, analitica, animales, decomisos, mascara):
+        self.categorias = {"especie": analitica.especies, "sexo": analitica.sexos,
+                           "producto": analitica.productos, "motivo": analitica.motivos}
+        self.animales = {nombre: columna[mascara] for nombre, columna in animales.items()}
+        de_seleccionados = mascara[decomisos["fila_animal"]]
+        self.decomisos = {nombre: columna[de_seleccionados] for nombre, columna in decomisos.items()}
+        # Columnas del animal de cada decomiso, para agrupar decomisos por especie o establecimiento
+        for nombre in COLUMNAS_ANIMAL:
+            self.decomisos[nombre] = animales[nombre][self.decomisos["fila_animal"]]
+
+    def cantidad(self):
+        return len(self.animales["id"])
+
+    def cantidad_decomisos(self):
+        return len(self.decomisos["id"])
+
+    def _agrupar(self, tabla, columna, validos=None):
+        """Retorna (etiquetas de los grupos, índice del grupo de cada fila) de la columna."""
+        if columna in GRANULARIDADES:
+            valores = truncar_fechas(tabla["fecha"], columna)
+        elif columna in tabla and columna != "fecha":
+            valores = tabla[columna]
+        else:
+            raise ValueError(f"No se puede agrupar por {columna}")
+        if validos is not None:
+            valores = valores[validos]
+        unicos, grupos = np.unique(valores, return_inverse=True)
+        if columna in GRANULARIDADES:
+            etiquetas = [str(valor) for valor in unicos]
+        elif columna in self.categorias:
+            nombres = self.categorias[columna].etiquetas
+            etiquetas = [nombres[codigo] for codigo in unicos]
+        else:
+            etiquetas = [int(valor) for valor in unicos]
+        return etiquetas, grupos
+
+    @staticmethod
+    def _sin_fecha(etiquetas, resultado):
+        # np.unique deja NaT al final; esas filas no se informan en los resultados por fecha
+        return {etiqueta: valor for etiqueta, valor in zip(etiquetas, resultado) if etiqueta != "NaT"}
+
+    def contar_por(self, columna):
+        """Cantidad de animales por especie, sexo, id_establecimiento o periodo de ingreso."""
+        etiquetas, grupos = self._agrupar(self.animales, columna)
+        return self._sin_fecha(etiquetas, np.bincount(grupos, minlength=len(etiquetas)).tolist())
+
+    def peso_promedio_por(self, columna):
+        """Peso promedio de los animales con peso por especie, sexo, id_establecimiento o periodo."""
+        peso = self.animales["peso"]
+        validos = ~np.isnan(peso)
+        etiquetas, grupos = self._agrupar(self.animales, columna, validos)
+        sumas = np.bincount(grupos, weights=peso[validos].astype(np.float64), minlength=len(etiquetas))
+        cantidades = np.bincount(grupos, minlength=len(etiquetas))
+        return self._sin_fecha(etiquetas, (sumas / cantidades).tolist())
+
+    def histograma_peso(self, clases=20, rango=None):
+        """Retorna (cantidades por clase, bordes de las clases) de los pesos registrados."""
+        peso = self.animales["peso"]
+        cantidades, bordes = np.histogram(peso[~np.isnan(peso)], bins=clases, range=rango)
+        return cantidades.tolist(), bordes.tolist()
+
+    def percentiles_peso(self, percentiles=(10, 50, 90)):
+        """Percentiles del peso (interpolación lineal, como np.percentile); None si no hay pesos."""
+        peso = self.animales["peso"]
+        peso = peso[~np.isnan(peso)]
+        if not len(peso):
+            return None
+        # peso es DECIMAL(10, 2): se redondea el ruido de guardarlo en float32
+        return np.round(np.percentile(peso.astype(np.float64), percentiles), 2).tolist()
+
+    def _pesos_por_grupo(self, columna):
+        """
+        Ordena los pesos registrados por (grupo, peso). Retorna (etiquetas, pesos ordenados,
+        grupo de cada peso ordenado, inicio y tamaño del tramo de cada grupo).
+        """
+        peso = self.animales["peso"]
+        validos = ~np.isnan(peso)
+        etiquetas, grupos = self._agrupar(self.animales, columna, validos)
+        peso = peso[validos].astype(np.float64)
+        orden = np.lexsort((peso, grupos))
+        tamanos = np.bincount(grupos, minlength=len(etiquetas))
+        return etiquetas, peso[orden], grupos[orden], np.cumsum(tamanos) - tamanos, tamanos
+
+    @staticmethod
+    def _percentiles_tramos(ordenados, inicios, tamanos, percentiles):
+        # Interpolación lineal dentro del tramo de cada grupo, igual que np.percentile
+        resultado = np.empty((len(tamanos), len(percentiles)))
+        for j, percentil in enumerate(percentiles):
+            posicion = (tamanos - 1) * (percentil / 100)
+            bajo = np.floor(posicion).astype(np.int64)
+            alto = np.minimum(bajo + 1, tamanos - 1)
+            fraccion = posicion - bajo
+            resultado[:, j] = (ordenados[inicios + bajo] * (1 - fraccion)
+                               + ordenados[inicios + alto] * fraccion)
+        return resultado
+
+    def percentiles_peso_por(self, columna, percentiles=(10, 50, 90)):
+        """
+        Percentiles del peso por grupo con un solo ordenamiento: se ordena por (grupo, peso)
+        y cada percentil se interpola en el tramo de su grupo, igual que np.percentile.
+        """
+        etiquetas, ordenados, _, inicios, tamanos = self._pesos_por_grupo(columna)
+        resultado = self._percentiles_tramos(ordenados, inicios, tamanos, percentiles)
+        return self._sin_fecha(etiquetas, np.round(resultado, 2).tolist())
+
+    def distribucion_peso_por(self, columna="especie", clases=20, percentiles=(10, 50, 90)):
+        """
+        Distribución del peso por grupo, calculada con un solo ordenamiento:
+        {"Bovino": {"cantidad": 120, "percentiles": [380.0, 452.5, 530.0], "atipicos": 3,
+                    "cantidades": [...], "bordes": [...]}, ...}
+        atipicos son los pesos fuera de [p25 - 1.5 RIC, p75 + 1.5 RIC] (regla de Tukey) y
+        cantidades/bordes el histograma de clases iguales entre el mínimo y el máximo del grupo.
+        """
+        etiquetas, ordenados, grupos, inicios, tamanos = self._pesos_por_grupo(columna)
+        calculados = self._percentiles_tramos(ordenados, inicios, tamanos, (25, 75) + tuple(percentiles))
+        cuartil1, cuartil3 = calculados[:, 0], calculados[:, 1]
+        rango = cuartil3 - cuartil1
+        fuera = ((ordenados < (cuartil1 - 1.5 * rango)[grupos])
+                 | (ordenados > (cuartil3 + 1.5 * rango)[grupos]))
+        atipicos = np.bincount(grupos, weights=fuera, minlength=len(etiquetas)).astype(np.int64)
+
+        # Histograma de todos los grupos a la vez: cada peso cae en la fila de su grupo
+        minimo = ordenados[inicios].copy()
+        maximo = ordenados[inicios + tamanos - 1].copy()
+        iguales = maximo == minimo
+        # Como np.histogram, si todos los pesos son iguales las clases van de -0.5 a +0.5
+        minimo[iguales] -= 0.5
+        maximo[iguales] += 0.5
+        ancho = (maximo - minimo) / clases
+        clase = np.minimum(((ordenados - minimo[grupos]) / ancho[grupos]).astype(np.int64), clases - 1)
+        cantidades = np.bincount(grupos * clases + clase, minlength=len(etiquetas) * clases)
+        cantidades = cantidades.reshape(len(etiquetas), clases)
+        bordes = minimo[:, None] + ancho[:, None] * np.arange(clases + 1)
+
+        return self._sin_fecha(etiquetas, [{
+            "cantidad": int(tamanos[i]),
+            "percentiles": np.round(calculados[i, 2:], 2).tolist(),
+            "atipicos": int(atipicos[i]),
+            "cantidades": cantidades[i].tolist(),
+            "bordes": np.round(bordes[i], 2).tolist(),
+        } for i in range(len(etiquetas))])
+
+    def contar_decomisos_por(self, columna):
+        """Cantidad de decomisos por producto, motivo, especie, sexo, id_establecimiento o periodo del decomiso."""
+        etiquetas, grupos = self._agrupar(self.decomisos, columna)
+        return self._sin_fecha(etiquetas, np.bincount(grupos, minlength=len(etiquetas)).tolist())
+
+
+# Instancia única del proceso
+analitica = Analitica()
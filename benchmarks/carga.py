@@ -0,0 +1,262 @@
+"""
+Prueba de carga: reproduce sesiones de las estaciones de trabajo contra OperacionesDB y
+reporta p50/p95/p99 por método.
+
+    python benchmarks/carga.py                         # SQLite en memoria con datos sintéticos
+    python benchmarks/carga.py --sqlite evc.sqlite3    # base creada con datos_sinteticos.py
+    python benchmarks/carga.py --mysql                 # base proyectoevc (ya poblada)
+    python benchmarks/carga.py --estaciones 6 --sesiones 50 --semilla 7
+
+Cada estación es un hilo que repite sesiones elegidas al azar (con semilla fija) según
+lo que hace cada pantalla: ingreso de animales, guía de transporte, consulta y
+estadísticas. Los PDF de las guías se escriben en un directorio temporal.
+"""
+import argparse
+import datetime
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from consultas import OperacionesDB  # noqa: E402
+from instrumentacion import metricas  # noqa: E402
+
+from datos_sinteticos import ANIMALES_POR_GUIA, SEMILLA, generar_datos  # noqa: E402
+
+# (sesión, peso relativo): cuántas veces aparece cada pantalla en una jornada
+SESIONES = [("ingreso", 2), ("guia", 2), ("consulta", 4), ("estadisticas", 1)]
+
+
+def percentil(valores_ordenados, p):
+    """Percentil p (0-100) por rango más cercano."""
+    if not valores_ordenados:
+        return None
+    posicion = max(0, math.ceil(p / 100 * len(valores_ordenados)) - 1)
+    return valores_ordenados[posicion]
+
+
+class Muestra:
+    """Valores reales de la base para armar las sesiones (fechas, marcas, guías, números)."""
+
+    def __init__(self, conexion_db):
+        connection = conexion_db.conectar()
+        if not connection:
+            raise RuntimeError("No se pudo establecer conexión con la base de datos.")
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT id, marca_diferencial FROM establecimiento ORDER BY id")
+                self.establecimientos = [tuple(fila) for fila in cursor.fetchall()]
+                cursor.execute("SELECT fecha FROM ingresos ORDER BY fecha DESC LIMIT 1")
+                fila = cursor.fetchone()
+                self.fecha_fin = fila[0] if fila else None
+                # Establecimientos con animales en corrales el último día, los de más animales primero
+                cursor.execute("""
+                    SELECT e.id, e.marca_diferencial FROM animales a
+                    INNER JOIN establecimiento e ON e.id = a.id_establecimiento
+                    WHERE a.estado = 'NO_DESPACHADO' AND a.fecha_ingreso = %s
+                    GROUP BY e.id, e.marca_diferencial ORDER BY COUNT(a.id) DESC, e.id
+                """, (self.fecha_fin,))
+                self.en_corrales = [tuple(fila) for fila in cursor.fetchall()]
+                cursor.execute("""
+                    SELECT numero_tiquete, guia_movilizacion FROM animales
+                    ORDER BY id DESC LIMIT 2000
+                """)
+                animales = cursor.fetchall()
+                self.tiquetes = [fila[0] for fila in animales]
+                self.guias_ica = sorted({fila[1] for fila in animales})
+        finally:
+            conexion_db.cerrar_conexion()
+        if not self.establecimientos or self.fecha_fin is None:
+            raise RuntimeError("La base no tiene datos; generar primero con datos_sinteticos.py.")
+
+
+class Estacion(threading.Thread):
+    """Una estación de trabajo: un hilo con su propia instancia de OperacionesDB."""
+
+    contador_animales = 0
+    _lock = threading.Lock()
+
+    def __init__(self, numero, muestra, sesiones, semilla, tiempos):
+        super().__init__(name=f"estacion-{numero}")
+        self.numero = numero
+        self.muestra = muestra
+        self.sesiones = sesiones
+        self.aleatorio = random.Random(semilla * 1000 + numero)
+        self.tiempos = tiempos
+        self.db = OperacionesDB()
+        self.errores = 0
+
+    def llamar(self, metodo, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return getattr(self.db, metodo)(*args, **kwargs)
+        except Exception as e:
+            self.errores += 1
+            print(f"[{self.name}] {metodo}: {e}")
+            return None
+        finally:
+            self.tiempos.append((metodo, (time.perf_counter() - inicio) * 1000))
+
+    @classmethod
+    def _siguiente_animal(cls):
+        with cls._lock:
+            cls.contador_animales += 1
+            return cls.contador_animales
+
+    def run(self):
+        nombres = [nombre for nombre, _ in SESIONES]
+        pesos = [peso for _, peso in SESIONES]
+        for _ in range(self.sesiones):
+            getattr(self, "sesion_" + self.aleatorio.choices(nombres, pesos)[0])()
+
+    # Sesiones: lo que consulta cada pantalla durante su uso normal
+
+    def sesion_ingreso(self):
+        """AnimalForm: abre el formulario, revisa el ingreso del día y guarda un lote de animales."""
+        fecha = self.muestra.fecha_fin + datetime.timedelta(days=1)
+        self.llamar("obtener_catalogos")
+        self.llamar("obtener_ingreso_por_fecha", fecha)
+        animales = []
+        for _ in range(self.aleatorio.randint(10, 60)):
+            numero = self._siguiente_animal()
+            id_establecimiento, _ = self.aleatorio.choice(self.muestra.establecimientos)
+            especie = self.aleatorio.choice(["Bovino", "Porcino"])
+            animales.append({
+                "destino": id_establecimiento,
+                "numero_animal": f"C{self.numero}-{numero}",
+                "sexo": self.aleatorio.choice(["Macho", "Hembra"]),
+                "peso": round(self.aleatorio.gauss(430 if especie == "Bovino" else 105, 20), 2),
+                "numero_tiquete": f"C{self.numero}T{numero}",
+                "fecha_ingreso": fecha.isoformat(),
+                "guia_movilizacion": f"C{self.numero}{id_establecimiento:03d}{fecha:%m%d}",
+                "fecha_ica": fecha.isoformat(),
+                "numero_corral": str(self.aleatorio.randint(1, 20)),
+                "especie": especie,
+            })
+        self.llamar("guardar_ingreso_lote", self.numero, 1, fecha, animales)
+
+    def sesion_guia(self):
+        """GuiaTransporteApp: elige establecimiento, carga sus animales del día y guarda la guía."""
+        self.llamar("obtener_catalogos")
+        fecha = self.aleatorio.choice([self.muestra.fecha_fin, self.muestra.fecha_fin + datetime.timedelta(days=1)])
+        id_destino, marca = self.aleatorio.choice((self.muestra.en_corrales or self.muestra.establecimientos)[:40])
+        animales = self.llamar("obtener_animales", marca, fecha) or []
+        if not animales:
+            return
+        # Casi siempre sale todo lo que hay en corrales, hasta el tope de una guía
+        cantidad = len(animales) if self.aleatorio.random() < 0.8 else self.aleatorio.randint(1, len(animales))
+        seleccion = self.aleatorio.sample(animales, min(cantidad, ANIMALES_POR_GUIA))
+        detalles = []
+        for numero_animal, id_ingreso_detalle, id_animal in seleccion:
+            decomisos = []
+            if self.aleatorio.random() < 0.1:
+                decomisos.append({"id_animal": id_animal, "producto": "Hígado", "cantidad": 1,
+                                  "motivo": "Fasciola hepática", "fecha": fecha})
+            detalles.append({
+                "id_ingreso_detalle": id_ingreso_detalle, "id_animal": id_animal, "carne_octavos": 8,
+                "viseras_blancas": 1, "viseras_rojas": 1, "cabezas": 1, "temperatura_promedio": "4.0",
+                "dictamen": "AC" if decomisos else "A", "decomisos": decomisos,
+            })
+        self.llamar("guardar_datos_backend", {
+            "fecha": fecha, "id_planta": 1, "id_destino": id_destino,
+            "id_vehiculo": self.aleatorio.randint(1, 8), "id_conductores": self.aleatorio.randint(1, 8),
+            "guia_transporte": detalles,
+        })
+
+    def sesion_consulta(self):
+        """ConsultaWidget: búsqueda mientras se escribe y revisión de guías de un establecimiento."""
+        texto = self.aleatorio.choice([
+            self.aleatorio.choice(self.muestra.tiquetes),
+            self.aleatorio.choice(self.muestra.guias_ica),
+            self.aleatorio.choice(self.muestra.guias_ica)[3:8],
+        ])
+        # Cada pausa al escribir dispara una búsqueda (ver Buscador.on_texto_cambiado)
+        for largo in range(3, len(texto) + 1, 2):
+            self.llamar("buscar_animal_pagina", texto[:largo])
+        id_establecimiento, _ = self.aleatorio.choice(self.muestra.establecimientos)
+        guias = self.llamar("obtener_guias_por_establecimiento", id_establecimiento) or []
+        for guia in guias[:3]:
+            self.llamar("obtener_animales_por_guia", guia["id"])
+
+    def sesion_estadisticas(self):
+        """Estadisticas: totales globales y recorrido por algunos establecimientos."""
+        self.llamar("obtener_estadisticas_animales_por_especie")
+        self.llamar("obtener_decomisos_totales_por_especie")
+        for id_establecimiento, _ in self.aleatorio.sample(self.muestra.establecimientos, 5):
+            self.llamar("obtener_estadisticas_animales_por_especie_establecimiento", id_establecimiento)
+            self.llamar("obtener_distribucion_sexo_por_especie_establecimiento", id_establecimiento)
+            self.llamar("obtener_peso_promedio_por_especie_establecimiento", id_establecimiento)
+            self.llamar("obtener_evolucion_ingresos_establecimiento", id_establecimiento)
+
+
+def ejecutar_carga(estaciones=4, sesiones=25, semilla=SEMILLA):
+    """Corre las estaciones en paralelo y retorna (tiempos [(metodo, ms)], segundos, errores)."""
+    muestra = Muestra(OperacionesDB.fabrica_conexion())
+    tiempos = []  # list.append es seguro entre hilos
+    hilos = [Estacion(numero, muestra, sesiones, semilla, tiempos) for numero in range(1, estaciones + 1)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return tiempos, time.perf_counter() - inicio, sum(hilo.errores for hilo in hilos)
+
+
+def reporte(tiempos):
+    """Tabla con llamadas, p50/p95/p99/máx y viajes por llamada de cada método."""
+    por_metodo = defaultdict(list)
+    for metodo, ms in tiempos:
+        por_metodo[metodo].append(ms)
+    viajes = {metodo.split(".")[-1]: datos for metodo, datos in metricas.instantanea().items()}
+    ancho = max([len("método")] + [len(metodo) for metodo in por_metodo])
+    lineas = [f"{'método':<{ancho}} {'llamadas':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'máx ms':>8} {'viajes/llamada':>14}"]
+    for metodo, valores in sorted(por_metodo.items(), key=lambda item: -percentil(sorted(item[1]), 95)):
+        valores.sort()
+        datos = viajes.get(metodo)
+        viajes_llamada = datos["viajes"] / datos["llamadas"] if datos and datos["llamadas"] else 0
+        lineas.append(f"{metodo:<{ancho}} {len(valores):>8} {percentil(valores, 50):>8.1f} "
+                      f"{percentil(valores, 95):>8.1f} {percentil(valores, 99):>8.1f} {valores[-1]:>8.1f} "
+                      f"{viajes_llamada:>14.1f}")
+    return "\n".join(lineas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    destino = parser.add_mutually_exclusive_group()
+    destino.add_argument("--sqlite", metavar="RUTA", help="base SQLite ya poblada con datos_sinteticos.py")
+    destino.add_argument("--mysql", action="store_true", help="usar la base proyectoevc de ConexionDB")
+    parser.add_argument("--estaciones", type=int, default=4)
+    parser.add_argument("--sesiones", type=int, default=25, help="sesiones por estación")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    parser.add_argument("--dias", type=int, default=90, help="días de datos sintéticos (solo SQLite en memoria)")
+    args = parser.parse_args()
+
+    if not args.mysql:
+        from conexion_sqlite import BaseSQLite, ConexionSQLite
+        base = BaseSQLite(args.sqlite or ":memory:")
+        OperacionesDB.fabrica_conexion = lambda: ConexionSQLite(base)
+        if not args.sqlite:
+            print(f"Generando {args.dias} días de datos sintéticos (semilla {args.semilla})...")
+            generar_datos(ConexionSQLite(base), semilla=args.semilla, dias=args.dias)
+
+    # Los PDF de las guías no deben quedar en el directorio del proyecto
+    os.chdir(tempfile.mkdtemp(prefix="evc_carga_"))
+    metricas.reiniciar()
+    tiempos, segundos, errores = ejecutar_carga(args.estaciones, args.sesiones, args.semilla)
+    print(reporte(tiempos))
+    print(f"\n{len(tiempos)} llamadas en {segundos:.1f} s ({len(tiempos) / segundos:.1f} llamadas/s), "
+          f"{args.estaciones} estaciones, {errores} errores")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
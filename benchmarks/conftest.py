@@ -0,0 +1,94 @@
+import json
+import math
+import os
+import sys
+
+import pytest
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(BENCHMARKS)
+for ruta in (RAIZ, BENCHMARKS):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from conexion_sqlite import BaseSQLite, ConexionSQLite  # noqa: E402
+from consultas import OperacionesDB  # noqa: E402
+from instrumentacion import metricas  # noqa: E402
+
+from carga import Muestra  # noqa: E402
+from datos_sinteticos import generar_datos  # noqa: E402
+
+# Viajes a la base por llamada que no deben superarse (se actualiza con --actualizar-viajes)
+ARCHIVO_VIAJES = os.path.join(BENCHMARKS, "viajes_base.json")
+
+# Días de datos sintéticos de la base de las pruebas (~220 animales por día)
+DIAS_BASE = 60
+
+
+def pytest_addoption(parser):
+    parser.addoption("--actualizar-viajes", action="store_true",
+                     help="reescribe benchmarks/viajes_base.json con los viajes medidos")
+
+
+def pytest_configure(config):
+    # Las corridas guardadas con --benchmark-save/--benchmark-autosave quedan junto a las pruebas
+    if config.getoption("benchmark_storage", default=None) == "file://./.benchmarks":
+        config.option.benchmark_storage = "file://" + os.path.join(BENCHMARKS, "resultados")
+
+
+@pytest.fixture(scope="session")
+def base_sintetica():
+    """Base SQLite en memoria con datos sintéticos; todas las OperacionesDB la usan."""
+    base = BaseSQLite()
+    generar_datos(ConexionSQLite(base), dias=DIAS_BASE)
+    fabrica_anterior = OperacionesDB.fabrica_conexion
+    OperacionesDB.fabrica_conexion = lambda: ConexionSQLite(base)
+    yield base
+    OperacionesDB.fabrica_conexion = fabrica_anterior
+    base.cerrar()
+
+
+@pytest.fixture(scope="session")
+def muestra(base_sintetica):
+    return Muestra(ConexionSQLite(base_sintetica))
+
+
+@pytest.fixture
+def db(base_sintetica, tmp_path, monkeypatch):
+    # Los PDF de las pruebas se escriben en el directorio temporal de la prueba
+    monkeypatch.chdir(tmp_path)
+    metricas.reiniciar()
+    return OperacionesDB()
+
+
+@pytest.fixture(scope="session")
+def viajes_base(request):
+    actualizar = request.config.getoption("--actualizar-viajes")
+    base = {}
+    if os.path.exists(ARCHIVO_VIAJES):
+        with open(ARCHIVO_VIAJES, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+    yield base
+    if actualizar:
+        with open(ARCHIVO_VIAJES, "w", encoding="utf-8") as archivo:
+            json.dump(dict(sorted(base.items())), archivo, indent=2)
+            archivo.write("\n")
+
+
+@pytest.fixture
+def verificar_viajes(request, viajes_base):
+    """
+    Compara los viajes a la base por llamada del método con el presupuesto guardado
+    en viajes_base.json para esta prueba.
+    """
+    def verificar(metodo):
+        datos = metricas.instantanea()[f"OperacionesDB.{metodo}"]
+        viajes = math.ceil(datos["viajes"] / datos["llamadas"])
+        if request.config.getoption("--actualizar-viajes"):
+            viajes_base[request.node.name] = viajes
+            return
+        presupuesto = viajes_base.get(request.node.name)
+        assert presupuesto is not None, f"Sin presupuesto de viajes para {request.node.name}; usar --actualizar-viajes"
+        assert viajes <= presupuesto, f"{metodo}: {viajes} viajes por llamada, presupuesto {presupuesto}"
+
+    return verificar
@@ -0,0 +1,270 @@
+"""
+Generador de datos sintéticos reproducibles (semilla fija) para pruebas de rendimiento.
+
+    python benchmarks/datos_sinteticos.py --sqlite evc_sintetico.sqlite3 [--dias 365]
+    python benchmarks/datos_sinteticos.py --mysql     # base proyectoevc vacía
+
+Los volúmenes por defecto corresponden a una planta de beneficio mediana: 200
+establecimientos proveedores (unos pocos concentran la mayor parte de los animales),
+~220 animales por día durante un año, guías de transporte que reúnen hasta 40 animales
+de un establecimiento (o lo de una semana, si tiene pocos) y decomisos en ~8 % de los
+animales. Las filas se confirman por lotes de días, así bases de varios años
+(--dias 3650 --animales-por-dia 600) no se arman completas en memoria.
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from consultas import TAMANO_LOTE, _insertar_multifila, _insertar_trigramas  # noqa: E402
+from esquema import reconstruir_estadisticas  # noqa: E402
+
+SEMILLA = 20240101
+FECHA_FIN = datetime.date(2024, 12, 31)
+# Filas de detalle que caben en una guía de transporte
+ANIMALES_POR_GUIA = 40
+
+DEPARTAMENTOS = {
+    "Huila": ["Neiva", "Pitalito", "Garzón", "La Plata", "Campoalegre"],
+    "Tolima": ["Ibagué", "Espinal", "Chaparral"],
+    "Caquetá": ["Florencia", "San Vicente del Caguán"],
+}
+PLANTAS = [("Frigorífico Central", "8712345", "Km 3 vía Sur"), ("Planta Norte", "8719876", "Calle 80 # 12-40")]
+TIPOS_VEHICULO = ["Camión", "Furgón", "Turbo"]
+# (especie, proporción, peso medio kg, desviación kg)
+ESPECIES = [("Bovino", 0.7, 430, 60), ("Porcino", 0.3, 105, 15)]
+PRODUCTOS_DECOMISO = {
+    "Bovino": [("Hígado", ["Fasciola hepática", "Abscesos", "Telangiectasia"]),
+               ("Pulmón", ["Neumonía", "Broncoaspiración", "Enfisema"]),
+               ("Riñón", ["Nefritis", "Quistes"]),
+               ("Canal", ["Contaminación", "Contusiones"])],
+    "Porcino": [("Hígado", ["Manchas de leche", "Abscesos"]),
+                ("Pulmón", ["Neumonía", "Pleuritis"]),
+                ("Intestinos", ["Contaminación"]),
+                ("Cabeza", ["Cisticercosis"])],
+}
+
+
+def _insertar(cursor, tabla, columnas, filas):
+    """INSERT de múltiples filas por lotes."""
+    insert_sql = f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES "
+    fila_sql = "(" + ", ".join(["%s"] * len(columnas)) + ")"
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        _insertar_multifila(cursor, insert_sql, fila_sql, filas[inicio:inicio + TAMANO_LOTE])
+
+
+def _marca(indice):
+    """Marca diferencial de dos letras y dos dígitos, p. ej. AB07."""
+    letras = "ABCDEFGHJKLMNPRSTUVWXYZ"
+    return f"{letras[indice // len(letras) % len(letras)]}{letras[indice % len(letras)]}{indice % 100:02d}"
+
+
+class _LoteDias:
+    """Filas de varios días que se escriben juntas en una transacción."""
+
+    def __init__(self):
+        self.ingresos, self.animales, self.trigramas, self.detalles = [], [], [], []
+        self.guias, self.guias_detalle, self.decomisos = [], [], []
+
+    def escribir(self, cursor):
+        _insertar(cursor, "ingresos", ["id", "id_user", "id_planta", "fecha"], self.ingresos)
+        _insertar(cursor, "animales",
+                  ["id", "numero_animal", "peso", "numero_tiquete", "sexo", "guia_movilizacion", "fecha_guia_ica",
+                   "fecha_ingreso", "especie", "id_establecimiento", "numero_corral", "estado"], self.animales)
+        _insertar_trigramas(cursor, self.trigramas)
+        _insertar(cursor, "ingresos_detalles", ["id", "id_ingresos", "id_animales"], self.detalles)
+        _insertar(cursor, "guia_transporte", ["id", "fecha", "id_planta", "id_vehiculo_conductor"], self.guias)
+        _insertar(cursor, "guia_transporte_detalle",
+                  ["id_guia_transporte", "id_ingreso_detalle", "carne_octavos", "viseras_blancas", "viseras_rojas",
+                   "cabezas", "temperatura_promedio", "dictamen"], self.guias_detalle)
+        _insertar(cursor, "decomisos", ["id", "id_animal", "producto", "cantidad", "motivo", "fecha"], self.decomisos)
+
+
+def generar_datos(conexion_db, semilla=SEMILLA, establecimientos=200, dias=365, animales_por_dia=220,
+                  proporcion_decomisos=0.08, fecha_fin=FECHA_FIN, animales_por_guia=ANIMALES_POR_GUIA,
+                  dias_por_guia=7, dias_por_lote=30):
+    """
+    Llena una base vacía (MySQL o conexion_sqlite.BaseSQLite) con datos sintéticos.
+    Los ids se asignan explícitamente, así la misma semilla produce exactamente las
+    mismas filas en cualquier backend. Cada guía de transporte reúne los animales de un
+    establecimiento de varios días, hasta animales_por_guia filas o dias_por_guia días.
+    Las filas se escriben y confirman cada dias_por_lote días; si algo falla quedan los
+    lotes ya confirmados. Retorna un diccionario con la cantidad de filas por tabla.
+    """
+    aleatorio = random.Random(semilla)
+    connection = conexion_db.conectar()
+    if not connection:
+        raise RuntimeError("No se pudo establecer conexión con la base de datos.")
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM animales")
+            if cursor.fetchone()[0]:
+                raise RuntimeError("La base ya tiene animales; el generador necesita una base vacía.")
+
+            # Catálogos
+            municipios = []
+            _insertar(cursor, "departamento", ["id", "nombre_departamento"],
+                      [(i, nombre) for i, nombre in enumerate(DEPARTAMENTOS, start=1)])
+            for id_departamento, nombre in enumerate(DEPARTAMENTOS, start=1):
+                for municipio in DEPARTAMENTOS[nombre]:
+                    municipios.append((len(municipios) + 1, municipio, id_departamento))
+            _insertar(cursor, "municipio", ["id", "nombre_municipios", "id_departamento"], municipios)
+
+            _insertar(cursor, "establecimiento",
+                      ["id", "nombre_dueno", "nombre_establecimiento", "direccion", "marca_diferencial", "id_municipio"],
+                      [(i, f"Propietario {i}", f"Finca {i}", f"Vereda {aleatorio.randint(1, 60)}", _marca(i - 1),
+                        aleatorio.randint(1, len(municipios))) for i in range(1, establecimientos + 1)])
+            _insertar(cursor, "planta", ["id", "nombre", "telefono", "direccion"],
+                      [(i, *planta) for i, planta in enumerate(PLANTAS, start=1)])
+            _insertar(cursor, "vehiculo", ["id", "placa", "tipo_vehiculo", "tipo_refrigeracion"],
+                      [(i, f"SXT{100 + i}", aleatorio.choice(TIPOS_VEHICULO), "Mecánica") for i in range(1, 9)])
+            _insertar(cursor, "conductores", ["id", "nombre", "numero_cedula", "telefono"],
+                      [(i, f"Conductor {i}", str(10_000_000 + i * 7919), f"31{i:08d}") for i in range(1, 9)])
+            _insertar(cursor, "vehiculo_conductor", ["id", "id_vehiculo", "id_conductores"],
+                      [(i, i, i) for i in range(1, 9)])
+        connection.commit()
+
+        # Unos pocos establecimientos grandes concentran la mayor parte de los animales
+        pesos_establecimiento = [1 / (i ** 0.8) for i in range(1, establecimientos + 1)]
+        especies = [especie for especie, _, _, _ in ESPECIES]
+        proporciones = [proporcion for _, proporcion, _, _ in ESPECIES]
+        peso_especie = {especie: (media, desviacion) for especie, _, media, desviacion in ESPECIES}
+
+        totales = dict.fromkeys(["animales", "guia_transporte", "guia_transporte_detalle", "decomisos"], 0)
+        lote = _LoteDias()
+        # Animales ya beneficiados que esperan guía: {id_establecimiento: [(id_animal, dictamen)]}
+        # y el día en que llegó el primero de ellos
+        pendientes, desde = {}, {}
+        id_animal = 0
+        fecha_inicio = fecha_fin - datetime.timedelta(days=dias - 1)
+        for dia in range(dias):
+            fecha = fecha_inicio + datetime.timedelta(days=dia)
+            id_ingreso = dia + 1
+            lote.ingresos.append((id_ingreso, 1, 1, fecha))
+            # Los domingos se beneficia cerca de la mitad
+            media = animales_por_dia * (0.5 if fecha.weekday() == 6 else 1.0)
+            cantidad = max(0, int(aleatorio.gauss(media, media * 0.15)))
+            guia_por_establecimiento = {}
+            for numero in range(1, cantidad + 1):
+                id_animal += 1
+                id_establecimiento = aleatorio.choices(range(1, establecimientos + 1), pesos_establecimiento)[0]
+                especie = aleatorio.choices(especies, proporciones)[0]
+                media_peso, desviacion = peso_especie[especie]
+                # Una guía ICA de movilización por establecimiento y día
+                if id_establecimiento not in guia_por_establecimiento:
+                    guia_por_establecimiento[id_establecimiento] = \
+                        f"{fecha:%y}{id_establecimiento:03d}{aleatorio.randint(0, 99999):05d}"
+                guia_ica = guia_por_establecimiento[id_establecimiento]
+                lote.animales.append((
+                    id_animal, f"{numero:04d}", round(max(20.0, aleatorio.gauss(media_peso, desviacion)), 2),
+                    f"T{id_animal:07d}", "Macho" if aleatorio.random() < 0.55 else "Hembra", guia_ica,
+                    fecha - datetime.timedelta(days=aleatorio.randint(0, 3)), fecha, especie, id_establecimiento,
+                    str(aleatorio.randint(1, 20)), "DESPACHADO" if dia < dias - 1 else "NO_DESPACHADO"
+                ))
+                lote.trigramas.append((id_animal, guia_ica))
+                lote.detalles.append((id_animal, id_ingreso, id_animal))
+
+                dictamen = "A"
+                if aleatorio.random() < proporcion_decomisos:
+                    producto, motivos = aleatorio.choice(PRODUCTOS_DECOMISO[especie])
+                    totales["decomisos"] += 1
+                    lote.decomisos.append((totales["decomisos"], id_animal, producto, aleatorio.randint(1, 3),
+                                           aleatorio.choice(motivos), fecha))
+                    dictamen = "AC"
+                # Los animales del último día siguen en corrales
+                if dia < dias - 1:
+                    desde.setdefault(id_establecimiento, dia)
+                    pendientes.setdefault(id_establecimiento, []).append((id_animal, dictamen))
+
+            # Una guía sale al completar animales_por_guia filas o dias_por_guia días; el
+            # penúltimo día salen todas, así solo quedan en corrales los animales del último
+            for id_establecimiento in sorted(pendientes):
+                animales_guia = pendientes[id_establecimiento]
+                vence = dia == dias - 2 or dia - desde[id_establecimiento] + 1 >= dias_por_guia
+                while len(animales_guia) >= animales_por_guia or (animales_guia and vence):
+                    totales["guia_transporte"] += 1
+                    id_guia = totales["guia_transporte"]
+                    lote.guias.append((id_guia, fecha, aleatorio.randint(1, len(PLANTAS)), aleatorio.randint(1, 8)))
+                    for id_animal_guia, dictamen in animales_guia[:animales_por_guia]:
+                        # El id del detalle de ingreso es el mismo del animal
+                        lote.guias_detalle.append((id_guia, id_animal_guia, 8, 1, 1, 1,
+                                                   f"{aleatorio.uniform(2, 7):.1f}", dictamen))
+                    animales_guia = animales_guia[animales_por_guia:]
+                if animales_guia:
+                    # Lo que sobró de una guía llena es de hoy
+                    if len(animales_guia) < len(pendientes[id_establecimiento]):
+                        desde[id_establecimiento] = dia
+                    pendientes[id_establecimiento] = animales_guia
+                else:
+                    del pendientes[id_establecimiento]
+                    del desde[id_establecimiento]
+
+            if (dia + 1) % dias_por_lote == 0 or dia == dias - 1:
+                with connection.cursor() as cursor:
+                    lote.escribir(cursor)
+                connection.commit()
+                totales["animales"] += len(lote.animales)
+                totales["guia_transporte_detalle"] += len(lote.guias_detalle)
+                lote = _LoteDias()
+
+        with connection.cursor() as cursor:
+            # Las filas se insertaron directamente; los resúmenes diarios se calculan al final
+            filas_resumenes = reconstruir_estadisticas(cursor)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        conexion_db.cerrar_conexion()
+
+    return {
+        "establecimiento": establecimientos,
+        "ingresos": dias,
+        "animales": totales["animales"],
+        "ingresos_detalles": totales["animales"],
+        "guia_transporte": totales["guia_transporte"],
+        "guia_transporte_detalle": totales["guia_transporte_detalle"],
+        "decomisos": totales["decomisos"],
+        "resumenes_diarios": filas_resumenes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    destino = parser.add_mutually_exclusive_group(required=True)
+    destino.add_argument("--sqlite", metavar="RUTA", help="archivo SQLite a crear")
+    destino.add_argument("--mysql", action="store_true", help="usar la base proyectoevc de ConexionDB")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    parser.add_argument("--establecimientos", type=int, default=200)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--animales-por-dia", type=int, default=220)
+    parser.add_argument("--animales-por-guia", type=int, default=ANIMALES_POR_GUIA,
+                        help="filas máximas por guía de transporte")
+    parser.add_argument("--dias-por-lote", type=int, default=30, help="días que se confirman en cada transacción")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        from conexion_sqlite import BaseSQLite, ConexionSQLite
+        conexion_db = ConexionSQLite(BaseSQLite(args.sqlite))
+    else:
+        from conexion import ConexionDB
+        conexion_db = ConexionDB()
+
+    inicio = time.perf_counter()
+    filas = generar_datos(conexion_db, semilla=args.semilla, establecimientos=args.establecimientos,
+                          dias=args.dias, animales_por_dia=args.animales_por_dia,
+                          animales_por_guia=args.animales_por_guia, dias_por_lote=args.dias_por_lote)
+    for tabla, cantidad in filas.items():
+        print(f"{tabla:<25} {cantidad:>9}")
+    print(f"Generado en {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmarks de analitica.py sobre la misma base sintética de test_consultas.py: la carga
+completa de las columnas y las agrupaciones en memoria que reemplazan consultas a la base.
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from analitica import Analitica  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def cargada(base_sintetica):
+    analitica = Analitica()
+    assert analitica.refrescar()
+    return analitica
+
+
+def test_refrescar_completo(benchmark, base_sintetica):
+    filas = benchmark.pedantic(lambda: Analitica().refrescar(), rounds=3)
+    assert filas
+
+
+def test_refrescar_sin_cambios(benchmark, cargada):
+    assert benchmark(cargada.refrescar) == 0
+
+
+@pytest.mark.parametrize("columna", ["especie", "id_establecimiento", "semana"])
+def test_contar_por(benchmark, cargada, columna):
+    resultados = benchmark(lambda: cargada.filtrar().contar_por(columna))
+    assert resultados
+
+
+def test_percentiles_peso_establecimiento(benchmark, cargada, muestra):
+    id_establecimiento = muestra.establecimientos[0][0]
+    resultados = benchmark(lambda: cargada.filtrar(id_establecimiento=id_establecimiento).percentiles_peso_por("especie"))
+    assert resultados
+
+
+def test_histograma_peso(benchmark, cargada):
+    cantidades, _ = benchmark(lambda: cargada.filtrar(especie="Bovino").histograma_peso())
+    assert sum(cantidades)
+
+
+def test_distribucion_peso_establecimiento(benchmark, cargada, muestra):
+    id_establecimiento = muestra.establecimientos[0][0]
+    resultados = benchmark(lambda: cargada.filtrar(id_establecimiento=id_establecimiento).distribucion_peso_por("especie"))
+    assert all(grupo["cantidad"] == sum(grupo["cantidades"]) for grupo in resultados.values())
@@ -0,0 +1,253 @@
+"""
+Benchmarks de las rutas críticas de OperacionesDB sobre una base SQLite sembrada con
+datos_sinteticos.py. Además del tiempo, cada prueba verifica que los viajes a la base
+por llamada no superen el presupuesto de viajes_base.json.
+
+    python -m pytest benchmarks                                  # correr y verificar viajes
+    python -m pytest benchmarks --benchmark-save=base            # guardar la línea base
+    python -m pytest benchmarks --benchmark-compare=0001 --benchmark-compare-fail=mean:20%
+    python -m pytest benchmarks --actualizar-viajes              # tras un cambio intencional
+
+La línea base de tiempos está en benchmarks/resultados/<máquina>/0001_base.json
+(Linux-CPython-3.11-64bit, un núcleo Xeon). Los tiempos solo se comparan en la misma
+máquina: en otra, guardar primero su propia base con --benchmark-save y comparar
+contra ese número. La base de viajes (viajes_base.json) no depende de la máquina.
+"""
+import datetime
+import itertools
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from conexion_sqlite import ConexionSQLite  # noqa: E402
+from consultas import OperacionesDB  # noqa: E402
+from esquema import reconstruir_estadisticas  # noqa: E402
+from pdf_guias import renderizar_guia  # noqa: E402
+
+# Rondas por tamaño de lote: cada ronda agrega animales nuevos a la base
+RONDAS_INGRESO = {10: 30, 100: 15, 1000: 5}
+
+_numeros = itertools.count(1)
+
+
+def _animales(cantidad, fecha, muestra):
+    animales = []
+    for i in range(cantidad):
+        numero = next(_numeros)
+        id_establecimiento = muestra.establecimientos[i % len(muestra.establecimientos)][0]
+        animales.append({
+            "destino": id_establecimiento,
+            "numero_animal": f"B{numero}",
+            "sexo": "Macho" if i % 2 else "Hembra",
+            "peso": 400 + i % 80,
+            "numero_tiquete": f"BT{numero:07d}",
+            "fecha_ingreso": fecha.isoformat(),
+            "guia_movilizacion": f"B{id_establecimiento:03d}{fecha:%y%m%d}",
+            "fecha_ica": fecha.isoformat(),
+            "numero_corral": str(i % 20 + 1),
+            "especie": "Bovino" if i % 3 else "Porcino",
+        })
+    return animales
+
+
+@pytest.mark.parametrize("cantidad", [10, 100, 1000])
+def test_guardar_ingreso(benchmark, db, muestra, verificar_viajes, cantidad):
+    fecha = muestra.fecha_fin
+
+    def preparar():
+        return (1, 1, fecha, _animales(cantidad, fecha, muestra)), {}
+
+    guardado = benchmark.pedantic(db.guardar_ingreso, setup=preparar, rounds=RONDAS_INGRESO[cantidad])
+    assert guardado
+    verificar_viajes("guardar_ingreso")
+
+
+def test_guardar_ingreso_ids_leidos(benchmark, db, muestra, verificar_viajes, monkeypatch):
+    # innodb_autoinc_lock_mode 2 (MySQL 8): los ids de cada lote se leen de vuelta
+    monkeypatch.setattr(OperacionesDB, "_autoinc_consecutivo", {type(db.conexion_db): False})
+    fecha = muestra.fecha_fin
+    animales = []
+
+    def preparar():
+        animales[:] = _animales(100, fecha, muestra)
+        return (1, 1, fecha, animales), {}
+
+    guardado = benchmark.pedantic(db.guardar_ingreso, setup=preparar, rounds=RONDAS_INGRESO[100])
+    assert guardado
+    vinculados = db.obtener_animales(muestra.establecimientos[0][1], fecha)
+    numeros = {numero for numero, _, _ in vinculados}
+    assert {animal["numero_animal"] for animal in animales[::len(muestra.establecimientos)]} <= numeros
+    verificar_viajes("guardar_ingreso")
+
+
+def test_guardar_datos_backend(benchmark, db, muestra, verificar_viajes):
+    id_destino, marca = muestra.establecimientos[0]
+    animales = db.obtener_animales(marca, muestra.fecha_fin)[:20]
+    assert animales
+    datos = {
+        "fecha": muestra.fecha_fin, "id_planta": 1, "id_destino": id_destino, "id_vehiculo": 1, "id_conductores": 1,
+        "guia_transporte": [{
+            "id_ingreso_detalle": id_ingreso_detalle, "id_animal": id_animal, "carne_octavos": 8,
+            "viseras_blancas": 1, "viseras_rojas": 1, "cabezas": 1, "temperatura_promedio": "4.0",
+            "dictamen": "AC" if i % 4 == 0 else "A",
+            "decomisos": [{"id_animal": id_animal, "producto": "Hígado", "cantidad": 1,
+                           "motivo": "Fasciola hepática", "fecha": muestra.fecha_fin}] if i % 4 == 0 else [],
+        } for i, (_, id_ingreso_detalle, id_animal) in enumerate(animales)],
+    }
+    id_guia = benchmark.pedantic(db.guardar_datos_backend, args=(datos,), rounds=10)
+    assert id_guia
+    verificar_viajes("guardar_datos_backend")
+
+
+def _resumenes(conexion_db):
+    connection = conexion_db.conectar()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT fecha, id_establecimiento, especie, sexo, cantidad, peso_total, con_peso, decomisos
+                FROM estadisticas_diarias ORDER BY id_establecimiento, fecha, especie, sexo
+            """)
+            estadisticas = [fila[:5] + (round(float(fila[5]), 2),) + fila[6:] for fila in cursor.fetchall()]
+            cursor.execute("""
+                SELECT fecha, id_establecimiento, producto, motivo, cantidad
+                FROM decomisos_diarios ORDER BY id_establecimiento, fecha, producto, motivo
+            """)
+            return estadisticas, cursor.fetchall()
+    finally:
+        conexion_db.cerrar_conexion()
+
+
+def test_resumenes_incrementales_igual_reconstruccion(db, muestra, base_sintetica):
+    # Lo que suman guardar_ingreso y guardar_datos_backend, también para animales sin
+    # fecha de ingreso, debe ser igual a recalcular los resúmenes desde animales y decomisos
+    id_destino, marca = muestra.establecimientos[0]
+    fecha = muestra.fecha_fin + datetime.timedelta(days=2)
+    animales = _animales(30, fecha, muestra)
+    for i, animal in enumerate(animales):
+        animal["destino"] = id_destino
+        if i % 3 == 0:
+            animal["fecha_ingreso"] = None
+    assert db.guardar_ingreso(1, 1, fecha, animales)
+    en_corrales = db.obtener_animales(marca, fecha)
+    assert len(en_corrales) == len(animales)
+    assert db.guardar_datos_backend({
+        "fecha": fecha, "id_planta": 1, "id_destino": id_destino, "id_vehiculo": 1, "id_conductores": 1,
+        "guia_transporte": [{
+            "id_ingreso_detalle": id_ingreso_detalle, "id_animal": id_animal, "carne_octavos": 8,
+            "viseras_blancas": 1, "viseras_rojas": 1, "cabezas": 1, "temperatura_promedio": "4.0",
+            "dictamen": "AC" if i % 2 == 0 else "A",
+            "decomisos": [{"id_animal": id_animal, "producto": "Pulmón", "cantidad": 1,
+                           "motivo": "Neumonía", "fecha": fecha}] if i % 2 == 0 else [],
+        } for i, (_, id_ingreso_detalle, id_animal) in enumerate(en_corrales)],
+    })
+
+    conexion_db = ConexionSQLite(base_sintetica)
+    incrementales = _resumenes(conexion_db)
+    connection = conexion_db.conectar()
+    try:
+        with connection.cursor() as cursor:
+            reconstruir_estadisticas(cursor)
+            cursor.execute("SELECT COUNT(*) FROM animales")
+            total_animales = cursor.fetchone()[0]
+        connection.commit()
+    finally:
+        conexion_db.cerrar_conexion()
+    assert _resumenes(conexion_db) == incrementales
+    # Los totales globales incluyen a los animales sin fecha de ingreso
+    assert sum(fila["cantidad"] for fila in db.obtener_estadisticas_animales_por_especie()) == total_animales
+
+
+def _guia_guardada(db, muestra):
+    id_destino = muestra.establecimientos[0][0]
+    guias = db.obtener_guias_por_establecimiento(id_destino)
+    assert guias
+    return guias[0]["id"], id_destino
+
+
+def test_obtener_datos_pdf(benchmark, db, muestra, verificar_viajes):
+    id_guia, id_destino = _guia_guardada(db, muestra)
+    datos = benchmark(db.obtener_datos_pdf, id_guia, id_destino)
+    assert datos["detalles"]
+    verificar_viajes("obtener_datos_pdf")
+
+
+def test_renderizar_guia(benchmark, db, muestra, tmp_path):
+    # Lo que hace cada proceso de pdf_guias.ColaPDF por guía
+    datos = db.obtener_datos_pdf(*_guia_guardada(db, muestra))
+    ruta = benchmark(renderizar_guia, 1, datos, str(tmp_path))
+    assert os.path.getsize(ruta) > 0
+
+
+@pytest.mark.parametrize("tipo", ["exacta", "prefijo", "subcadena"])
+def test_buscar_animal(benchmark, db, muestra, verificar_viajes, tipo):
+    tiquete = muestra.tiquetes[len(muestra.tiquetes) // 2]
+    texto = {
+        "exacta": tiquete,
+        "prefijo": tiquete[:6],
+        "subcadena": muestra.guias_ica[len(muestra.guias_ica) // 2][3:9],
+    }[tipo]
+    resultados = benchmark(db.buscar_animal, texto)
+    assert resultados
+    verificar_viajes("buscar_animal")
+
+
+def test_obtener_animales(benchmark, db, muestra, verificar_viajes):
+    resultados = benchmark(db.obtener_animales, muestra.establecimientos[0][1], muestra.fecha_fin)
+    assert resultados
+    verificar_viajes("obtener_animales")
+
+
+def test_obtener_ingreso_por_fecha(benchmark, db, muestra, verificar_viajes):
+    ingreso = benchmark(db.obtener_ingreso_por_fecha, muestra.fecha_fin)
+    assert ingreso
+    verificar_viajes("obtener_ingreso_por_fecha")
+
+
+def test_obtener_guias_por_establecimiento(benchmark, db, muestra, verificar_viajes):
+    guias = benchmark(db.obtener_guias_por_establecimiento, muestra.establecimientos[0][0])
+    assert guias
+    verificar_viajes("obtener_guias_por_establecimiento")
+
+
+@pytest.mark.parametrize("metodo", [
+    "obtener_estadisticas_animales_por_especie",
+    "obtener_decomisos_totales_por_especie",
+    "obtener_marca_cambios",
+])
+def test_estadisticas_globales(benchmark, db, verificar_viajes, metodo):
+    resultados = benchmark(getattr(db, metodo))
+    assert resultados
+    verificar_viajes(metodo)
+
+
+@pytest.mark.parametrize("metodo", [
+    "obtener_estadisticas_animales_por_especie_establecimiento",
+    "obtener_distribucion_sexo_por_especie_establecimiento",
+    "obtener_peso_promedio_por_especie_establecimiento",
+    "obtener_evolucion_ingresos_establecimiento",
+    "obtener_resumen_establecimiento",
+])
+def test_estadisticas_establecimiento(benchmark, db, muestra, verificar_viajes, metodo):
+    resultados = benchmark(getattr(db, metodo), muestra.establecimientos[0][0])
+    assert resultados
+    verificar_viajes(metodo)
+
+
+@pytest.mark.parametrize("granularidad", ["dia", "semana", "mes"])
+def test_evolucion_ingresos_por_periodo(benchmark, db, muestra, verificar_viajes, granularidad):
+    desde = muestra.fecha_fin - datetime.timedelta(days=364)
+    resultados = benchmark(db.obtener_evolucion_ingresos_establecimiento, muestra.establecimientos[0][0],
+                           desde, muestra.fecha_fin, granularidad)
+    assert resultados
+    verificar_viajes("obtener_evolucion_ingresos_establecimiento")
+
+
+@pytest.mark.parametrize("granularidad", ["semana", "mes"])
+def test_tasas_decomiso(benchmark, db, muestra, verificar_viajes, granularidad):
+    desde = muestra.fecha_fin - datetime.timedelta(days=364)
+    tasas = benchmark(db.obtener_tasas_decomiso, muestra.establecimientos[0][0], desde, muestra.fecha_fin,
+                      granularidad)
+    assert tasas["por_producto"]
+    verificar_viajes("obtener_tasas_decomiso")
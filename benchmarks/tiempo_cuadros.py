@@ -0,0 +1,102 @@
+"""
+Tiempo por cuadro de la pantalla Estadísticas al recorrer los establecimientos.
+
+    python benchmarks/tiempo_cuadros.py [--establecimientos 200] [--dias 90] [--presupuesto-ms 40]
+
+Crea una base SQLite en memoria con datos sintéticos, precarga en la caché de la
+pantalla los datos de cada establecimiento (así solo se mide el dibujado) y los
+selecciona uno por uno en el combo, midiendo desde el cambio de selección hasta que
+Qt termina de pintar. Los cuadros que solo cambian valores se resuelven con blit; los
+que cambian la escala o las categorías necesitan un dibujado completo y forman la cola
+(p95/p99). Falla si el promedio por cuadro supera el presupuesto.
+"""
+import argparse
+import os
+import sys
+import time
+
+# Sin ventana visible salvo que se indique otra plataforma de Qt
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from conexion_sqlite import BaseSQLite, ConexionSQLite  # noqa: E402
+from consultas import OperacionesDB  # noqa: E402
+
+from carga import percentil  # noqa: E402
+from datos_sinteticos import generar_datos  # noqa: E402
+
+
+def _esperar(app, condicion, limite=30):
+    fin = time.monotonic() + limite
+    while not condicion():
+        if time.monotonic() > fin:
+            raise SystemExit("La pantalla no terminó de cargar los datos.")
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def medir(establecimientos, dias):
+    """Retorna (tiempos de cada cuadro en ms, cantidad de cuadros con dibujado completo)."""
+    app = QApplication.instance() or QApplication(sys.argv)
+    base = BaseSQLite()
+    generar_datos(ConexionSQLite(base), establecimientos=establecimientos, dias=dias)
+    OperacionesDB.fabrica_conexion = lambda: ConexionSQLite(base)
+
+    from estadisticas import Estadisticas
+
+    pantalla = Estadisticas()
+    pantalla.temporizador.setInterval(10 ** 9)
+    pantalla.resize(1000, 800)
+    pantalla.show()
+    combo = pantalla.combo_establecimientos
+    _esperar(app, lambda: combo.count() > establecimientos and pantalla.globales_dibujados is not None)
+
+    periodo = pantalla.combo_periodo.currentData()
+    for indice in range(1, combo.count()):
+        clave = (combo.itemData(indice), periodo)
+        pantalla.cache_establecimientos[clave] = (pantalla.marca, pantalla.consultar_establecimiento(*clave))
+    app.processEvents()
+
+    completos = []
+    pantalla.lower_canvas.mpl_connect("draw_event", lambda event: completos.append(1))
+    tiempos = []
+    for indice in range(1, combo.count()):
+        inicio = time.perf_counter()
+        combo.setCurrentIndex(indice)
+        # draw_idle() se atiende en la primera vuelta y el pintado del lienzo en la segunda
+        app.processEvents()
+        app.processEvents()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    pantalla.close()
+    base.cerrar()
+    return tiempos, len(completos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--establecimientos", type=int, default=200)
+    parser.add_argument("--dias", type=int, default=90)
+    parser.add_argument("--presupuesto-ms", type=float, default=40)
+    args = parser.parse_args()
+
+    print(f"Generando {args.dias} días de datos sintéticos para {args.establecimientos} establecimientos...")
+    tiempos, completos = medir(args.establecimientos, args.dias)
+    ordenados = sorted(tiempos)
+    promedio = sum(tiempos) / len(tiempos)
+    print(f"{'cuadros':>8} {'prom ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'máx ms':>8} {'completos':>10}")
+    print(f"{len(tiempos):>8} {promedio:8.1f} {percentil(ordenados, 50):8.1f} {percentil(ordenados, 95):8.1f} "
+          f"{percentil(ordenados, 99):8.1f} {ordenados[-1]:8.1f} {completos:>10}")
+
+    if promedio > args.presupuesto_ms:
+        print(f"FALLA: {promedio:.1f} ms por cuadro en promedio, presupuesto {args.presupuesto_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
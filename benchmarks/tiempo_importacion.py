@@ -0,0 +1,68 @@
+"""
+Reporte de tiempos de importación al arrancar (python -X importtime).
+
+    python benchmarks/tiempo_importacion.py [--presupuesto-ms 1500] [--top 25]
+
+Importa lo mismo que carga main.py antes de mostrar la primera ventana (main y la
+pantalla inicial) y falla si aparece alguna librería que debe cargarse diferida o si
+el tiempo acumulado supera el presupuesto.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lo que se importa antes de la primera ventana
+IMPORTACION_ARRANQUE = "import main, entradaproducto"
+
+# Solo se deben cargar al abrir Estadísticas o al generar un PDF
+DIFERIDOS = ("matplotlib", "numpy", "reportlab")
+
+
+def medir():
+    """Retorna [(modulo, propio_us, acumulado_us)] en el orden en que se importaron."""
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORTACION_ARRANQUE],
+        cwd=RAIZ, capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        raise SystemExit(f"No se pudo importar la aplicación:\n{proceso.stderr}")
+    filas = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "[us]" in linea:
+            continue
+        propio, acumulado, modulo = linea[len("import time:"):].split("|")
+        filas.append((modulo.strip(), int(propio), int(acumulado)))
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--presupuesto-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    filas = medir()
+    total_ms = sum(propio for _, propio, _ in filas) / 1000
+    print(f"{'acumulado ms':>13} {'propio ms':>10}  módulo")
+    for modulo, propio, acumulado in sorted(filas, key=lambda f: f[2], reverse=True)[:args.top]:
+        print(f"{acumulado / 1000:13.1f} {propio / 1000:10.1f}  {modulo}")
+    print(f"\nTotal de importación al arrancar: {total_ms:.1f} ms ({len(filas)} módulos)")
+
+    fallas = []
+    cargados = {modulo.split(".")[0] for modulo, _, _ in filas}
+    for diferido in DIFERIDOS:
+        if diferido in cargados:
+            fallas.append(f"{diferido} se importa al arrancar y debería ser diferido")
+    if total_ms > args.presupuesto_ms:
+        fallas.append(f"el arranque importa en {total_ms:.1f} ms, presupuesto {args.presupuesto_ms:.0f} ms")
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Tiempo de maquetado de los PDF de varias guías: en serie contra pdf_guias.ColaPDF.
+
+    python benchmarks/tiempo_pdf.py [--guias 16] [--procesos N]
+
+Crea una base SQLite en memoria con datos sintéticos, consulta los datos del PDF de
+las guías más recientes y los maqueta primero uno tras otro en este proceso (como
+hacía guardar_datos_backend) y después con ColaPDF, esperando en el ciclo de eventos
+de Qt hasta que llega el aviso de cada uno. Con varios núcleos la cola debe terminar
+antes; la primera corrida incluye el arranque de los procesos del pool.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from PyQt5.QtCore import QCoreApplication  # noqa: E402
+
+from conexion_sqlite import BaseSQLite, ConexionSQLite  # noqa: E402
+from consultas import OperacionesDB  # noqa: E402
+from pdf_guias import ColaPDF, renderizar_guia  # noqa: E402
+
+from carga import Muestra  # noqa: E402
+from datos_sinteticos import generar_datos  # noqa: E402
+
+
+def _datos_guias(cantidad):
+    """[(id_guia, datos del PDF)] de las guías más recientes de la base sintética."""
+    base = BaseSQLite()
+    generar_datos(ConexionSQLite(base), establecimientos=40, dias=30)
+    OperacionesDB.fabrica_conexion = lambda: ConexionSQLite(base)
+    db = OperacionesDB()
+    guias = []
+    for id_destino, _ in Muestra(ConexionSQLite(base)).establecimientos:
+        for guia in db.obtener_guias_por_establecimiento(id_destino)[:cantidad - len(guias)]:
+            guias.append((guia["id"], db.obtener_datos_pdf(guia["id"], id_destino)))
+        if len(guias) >= cantidad:
+            break
+    base.cerrar()
+    return guias
+
+
+def _en_cola(app, cola, guias):
+    listos = []
+    cola.terminado.connect(lambda id_guia, ruta: listos.append(id_guia))
+    cola.fallido.connect(lambda id_guia, mensaje: listos.append(id_guia))
+    inicio = time.perf_counter()
+    for id_guia, datos in guias:
+        cola.encolar(id_guia, datos)
+    encolado = time.perf_counter() - inicio
+    while len(listos) < len(guias):
+        app.processEvents()
+        time.sleep(0.001)
+    return encolado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guias", type=int, default=16)
+    parser.add_argument("--procesos", type=int, default=None)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    guias = _datos_guias(args.guias)
+    print(f"{len(guias)} guías, {os.cpu_count()} núcleos")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        inicio = time.perf_counter()
+        for id_guia, datos in guias:
+            renderizar_guia(id_guia, datos, directorio)
+        serie = time.perf_counter() - inicio
+
+        cola = ColaPDF(procesos=args.procesos, directorio=directorio)
+        frio = _en_cola(app, cola, guias)
+        caliente = _en_cola(app, cola, guias)
+        cola.cerrar()
+
+    print(f"{'modo':>22} {'bloquea ms':>11} {'total ms':>9}")
+    print(f"{'en serie':>22} {serie * 1000:11.1f} {serie * 1000:9.1f}")
+    print(f"{'ColaPDF (arranque)':>22} {frio[0] * 1000:11.1f} {frio[1] * 1000:9.1f}")
+    print(f"{f'ColaPDF ({cola.procesos} procesos)':>22} {caliente[0] * 1000:11.1f} {caliente[1] * 1000:9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,35 @@
 from PyQt5.QtWidgets import QPushButton, QTableWidget, QGridLayout, QHeaderView, QMessageBox, QTableWidgetItem
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 
-from consultas import OperacionesDB
+from consultas import OperacionesDB, puede_refinar, rango_coincidencia
+from ejecutor_db import EjecutorDB
+
+# Filas que se piden por página al hacer scroll
+TAMANO_PAGINA = 100
+# Milisegundos sin teclear antes de consultar la base de datos
+ESPERA_TECLEO_MS = 120
 
 class Buscador(QWidget):
     def __init__(self):
         super().__init__()
         self.db = OperacionesDB()
+        self.ejecutor = EjecutorDB(self)
+        self.ejecutor.ocupado_cambiado.connect(self.on_ocupado_cambiado)
+
+        # Estado de la paginación de la búsqueda actual
+        self.numero_buscado = None
+        self.siguiente_pagina = None
+        self.filas_cargadas = []
+        # (texto, filas) de la última búsqueda cargada completa; sirve para refinarla en memoria
+        # mientras se confirma con la base de datos
+        self.busqueda_base = None
+
+        # Agrupa las teclas: solo se consulta cuando el operador deja de teclear
+        self.temporizador = QTimer(self)
+        self.temporizador.setSingleShot(True)
+        self.temporizador.setInterval(ESPERA_TECLEO_MS)
+        self.temporizador.timeout.connect(self.buscar_incremental)
 
         #Configuracion de la Ventana
         self.setWindowTitle("Buscador")
@@ -20,6 +42,10 @@ class Buscador(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setFixedSize(600, 40)
         self.search_input.setPlaceholderText("Numero de animal, tiquete o guia...")
+        self.search_input.textChanged.connect(self.on_texto_cambiado)
+        self.search_input.returnPressed.connect(self.buscar_animal)
+
+        self.estado_label = QLabel("")
 
         self.search_button = QPushButton("Buscar")
         self.search_button.setFixedSize(150,40)
@@ -38,10 +64,13 @@ class Buscador(QWidget):
         self.results_table.setWordWrap(True)
 
         self.results_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        # Pedir la siguiente página cuando el scroll llega al final
+        self.results_table.verticalScrollBar().valueChanged.connect(self.on_scroll_resultados)
 
         layout.addWidget(self.search_label, 0, 1, Qt.AlignCenter)
         layout.addWidget(self.search_input, 2, 1, Qt.AlignCenter)
         layout.addWidget(self.search_button, 2, 1, Qt.AlignRight)
+        layout.addWidget(self.estado_label, 3, 1, Qt.AlignLeft)
         layout.addWidget(self.results_table, 4, 1)
 
         self.setLayout(layout)
@@ -59,17 +88,101 @@ class Buscador(QWidget):
             QMessageBox.warning(self, "Advertencia", "Por Favor, Ingrese un Numero para Buscar.")
             return
 
-        resultados = self.db.buscar_animal(numero)
-        if resultados:
-            self.mostrar_resultados(resultados)
-        else:
-            self.results_table.setRowCount(0)
+        self.temporizador.stop()
+        self.iniciar_busqueda(numero.strip(), avisar=True)
+
+    def on_texto_cambiado(self, texto):
+        texto = texto.strip()
+        if not texto:
+            self.temporizador.stop()
+            self.ejecutor.cancelar("buscar_animal")
+            self.ejecutor.cancelar("pagina_busqueda")
+            self.numero_buscado = None
+            self.reemplazar_resultados([], None)
+            return
+
+        base = self.busqueda_base
+        if base and puede_refinar(base[0], texto):
+            # Mientras llega la confirmación de la base de datos, se filtra en memoria
+            coincidencias = []
+            for fila in base[1]:
+                rango = rango_coincidencia(fila, texto)
+                if rango is not None:
+                    coincidencias.append((rango, -fila["id"], fila))
+            filas = [fila for _, _, fila in sorted(coincidencias, key=lambda c: c[:2])]
+            self.ejecutor.cancelar("buscar_animal")
+            self.ejecutor.cancelar("pagina_busqueda")
+            self.numero_buscado = texto
+            self.reemplazar_resultados(filas, None)
+
+        # Siempre se confirma con la base de datos: pudo haber ingresos nuevos desde la
+        # búsqueda base y un texto numérico también coincide con el id de un animal
+        self.temporizador.start()
+
+    def buscar_incremental(self):
+        texto = self.search_input.text().strip()
+        if texto:
+            self.iniciar_busqueda(texto, avisar=False)
+
+    def iniciar_busqueda(self, numero, avisar):
+        """Consulta la primera página; una búsqueda nueva reemplaza a la que esté en curso."""
+        self.numero_buscado = numero
+        # La base para refinar en memoria se vuelve a tomar del resultado de esta búsqueda
+        self.busqueda_base = None
+        self.ejecutor.cancelar("pagina_busqueda")
+        self.ejecutor.ejecutar("buscar_animal", self.db.buscar_animal_pagina, numero, tamano=TAMANO_PAGINA,
+                               al_terminar=lambda pagina: self.on_resultados_busqueda(pagina, avisar))
+
+    def on_resultados_busqueda(self, pagina, avisar):
+        self.reemplazar_resultados(pagina["resultados"], pagina["siguiente"])
+        if not pagina["resultados"] and avisar:
             QMessageBox.information(self, "Sin Resultados", "No se encontraron coincidencias")
 
+    def reemplazar_resultados(self, resultados, siguiente):
+        self.results_table.setRowCount(0)
+        self.filas_cargadas = []
+        self.siguiente_pagina = siguiente
+        self.mostrar_resultados(resultados)
+
+    def on_scroll_resultados(self, valor):
+        barra = self.results_table.verticalScrollBar()
+        if valor < barra.maximum() - 5 or not self.siguiente_pagina:
+            return
+        if self.ejecutor.en_curso("buscar_animal") or self.ejecutor.en_curso("pagina_busqueda"):
+            return  # La búsqueda o la página siguiente ya se están cargando
+        self.ejecutor.ejecutar("pagina_busqueda", self.db.buscar_animal_pagina, self.numero_buscado,
+                               despues_de=self.siguiente_pagina, tamano=TAMANO_PAGINA,
+                               al_terminar=self.on_pagina_siguiente)
+
+    def on_pagina_siguiente(self, pagina):
+        self.siguiente_pagina = pagina["siguiente"]
+        self.mostrar_resultados(pagina["resultados"])
+
+    def actualizar_estado(self):
+        """Muestra cuántos resultados hay y guarda la búsqueda si ya se cargó completa."""
+        if self.numero_buscado is None:
+            self.estado_label.setText("")
+            return
+        if self.siguiente_pagina is None:
+            self.busqueda_base = (self.numero_buscado, list(self.filas_cargadas))
+            cantidad = len(self.filas_cargadas)
+            self.estado_label.setText(f"{cantidad} resultados" if cantidad else "Sin resultados")
+        else:
+            self.estado_label.setText(f"Más de {len(self.filas_cargadas)} resultados")
+
+    def on_ocupado_cambiado(self, canal, ocupado):
+        if canal == "buscar_animal":
+            self.search_button.setEnabled(not ocupado)
+
     def mostrar_resultados(self, resultados):
-        self.results_table.setRowCount(len(resultados))  # Configura el número de filas
+        """Agrega una página de resultados al final de la tabla."""
+        self.filas_cargadas.extend(resultados)
+        inicio = self.results_table.rowCount()
+        # Con el orden activo las filas se moverían mientras se insertan
+        self.results_table.setSortingEnabled(False)
+        self.results_table.setRowCount(inicio + len(resultados))  # Configura el número de filas
 
-        for fila, resultado in enumerate(resultados):
+        for fila, resultado in enumerate(resultados, start=inicio):
             self.results_table.setItem(fila, 0, QTableWidgetItem(str(resultado.get('id', ''))))
             self.results_table.setItem(fila, 1, QTableWidgetItem(str(resultado.get('numero_animal', ''))))
             self.results_table.setItem(fila, 2, QTableWidgetItem(str(resultado.get('numero_tiquete', ''))))
@@ -79,3 +192,5 @@ class Buscador(QWidget):
             self.results_table.setItem(fila, 6, QTableWidgetItem(str(resultado.get('fecha_guia_ica', ''))))
             self.results_table.setItem(fila, 7, QTableWidgetItem(str(resultado.get('fecha_ingreso', ''))))
 
+        self.results_table.setSortingEnabled(True)
+        self.actualizar_estado()
@@ -3,12 +3,15 @@ from PyQt5.QtWidgets import (
     QTableWidgetItem, QHeaderView, QMessageBox
 )
 from PyQt5.QtCore import Qt
+from catalogos import catalogos
 from consultas import OperacionesDB
+from ejecutor_db import EjecutorDB
 
 class GuiasTransporteBuscador(QWidget):
     def __init__(self):
         super().__init__()
         self.db = OperacionesDB()
+        self.ejecutor = EjecutorDB(self)
         self.setWindowTitle("Guías de Transporte y Animales Asociados")
         self.setGeometry(100, 100, 1100, 600)
         
@@ -61,17 +64,29 @@ class GuiasTransporteBuscador(QWidget):
     
     def cargar_establecimientos(self):
         """
-        Se espera que 'obtener_establecimientos()' retorne una lista de tuplas:
+        Los establecimientos salen de la caché de catálogos compartida como una lista de tuplas:
         [(id, nombre), (id, nombre), ...]
         """
-        establecimientos = self.db.obtener_establecimientos()
+        self.ejecutor.ejecutar("establecimientos", catalogos.lista, "establecimientos",
+                               al_terminar=self.mostrar_establecimientos)
+
+    def recargar_catalogos(self):
+        self.cargar_establecimientos()
+
+    def mostrar_establecimientos(self, establecimientos):
+        # Al recargar los catálogos se conserva el establecimiento elegido si sigue existiendo
+        seleccion = self.combo_establecimientos.currentData()
+        self.combo_establecimientos.blockSignals(True)
         self.combo_establecimientos.clear()
         if not establecimientos:
+            self.combo_establecimientos.blockSignals(False)
             QMessageBox.warning(self, "Advertencia", "No hay establecimientos registrados.")
             return
         for est in establecimientos:
             # Se asume que cada tupla es (id, nombre)
             self.combo_establecimientos.addItem(est[1], est[0])
+        self.combo_establecimientos.setCurrentIndex(max(self.combo_establecimientos.findData(seleccion), 0))
+        self.combo_establecimientos.blockSignals(False)
         # Cargar las guías del primer establecimiento por defecto
         self.cargar_guias()
     
@@ -81,11 +96,18 @@ class GuiasTransporteBuscador(QWidget):
         las muestra en la tabla de guías.
         """
         establecimiento_id = self.combo_establecimientos.currentData()
+        # Los animales de una guía del establecimiento anterior ya no aplican
+        self.ejecutor.cancelar("animales_guia")
         if not establecimiento_id:
+            self.ejecutor.cancelar("guias")
             self.table_guias.setRowCount(0)
             return
         
-        guias = self.db.obtener_guias_por_establecimiento(establecimiento_id)
+        # Un cambio rápido de establecimiento cancela la consulta anterior
+        self.ejecutor.ejecutar("guias", self.db.obtener_guias_por_establecimiento, establecimiento_id,
+                               al_terminar=self.mostrar_guias)
+
+    def mostrar_guias(self, guias):
         if not guias:
             self.table_guias.setRowCount(0)
             QMessageBox.information(self, "Sin Resultados", "No se encontraron guías para este establecimiento.")
@@ -106,7 +128,10 @@ class GuiasTransporteBuscador(QWidget):
         if not guia_id_item:
             return
         guia_id = guia_id_item.text()
-        animales = self.db.obtener_animales_por_guia(guia_id)
+        self.ejecutor.ejecutar("animales_guia", self.db.obtener_animales_por_guia, guia_id,
+                               al_terminar=self.mostrar_animales)
+
+    def mostrar_animales(self, animales):
         if not animales:
             self.table_animales.setRowCount(0)
             QMessageBox.information(self, "Sin Resultados", "No se encontraron animales asociados a esta guía.")
@@ -0,0 +1,50 @@
+import threading
+import time
+
+from consultas import OperacionesDB
+
+
+class CacheCatalogos:
+    """
+    Caché de los datos de referencia (establecimientos, plantas, vehículos y conductores)
+    compartida por todos los formularios del proceso. Se carga una sola vez con
+    OperacionesDB.obtener_catalogos() y se vuelve a consultar cuando vence el TTL o
+    cuando se invalida explícitamente.
+    """
+
+    def __init__(self, ttl=600):
+        self.ttl = ttl  # segundos
+        self._lock = threading.Lock()
+        self._catalogos = None
+        self._cargado_en = 0
+
+    def obtener(self):
+        """
+        Retorna el diccionario de catálogos; solo consulta la base si no está cargado
+        o venció. Si varios hilos lo piden a la vez, solo uno consulta y los demás esperan.
+        """
+        with self._lock:
+            if self._catalogos is None or time.monotonic() - self._cargado_en > self.ttl:
+                catalogos = OperacionesDB().obtener_catalogos()
+                if catalogos is None:
+                    # Si la base no responde se conserva la copia anterior, aunque esté vencida
+                    return self._catalogos or {}
+                self._catalogos = catalogos
+                self._cargado_en = time.monotonic()
+            return self._catalogos
+
+    def invalidar(self):
+        """
+        Obliga a recargar los catálogos en la próxima consulta. Lo llama el botón
+        "Actualizar catálogos" (F5) de la ventana principal.
+        """
+        with self._lock:
+            self._catalogos = None
+
+    def lista(self, catalogo):
+        """Lista de tuplas (id, texto) del catálogo, p. ej. lista("plantas")."""
+        return self.obtener().get(catalogo, [])
+
+
+# Instancia única del proceso
+catalogos = CacheCatalogos()
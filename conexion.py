@@ -1,28 +1,245 @@
+import threading
+import time
+
 import pymysql
 
+from instrumentacion import ConexionMedida, metricas
+
+
+class PoolAgotadoError(pymysql.MySQLError):
+    """Se lanza cuando no hay conexiones libres dentro del tiempo de espera."""
+
+
+class _ConexionAgrupada:
+    """Envoltura interna con los tiempos de vida de una conexión del pool."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.creada = time.monotonic()
+        self.devuelta = self.creada
+
+
+class PoolConexiones:
+    """
+    Pool acotado y seguro entre hilos de conexiones pymysql.
+    Las conexiones se reutilizan entre consultas en lugar de abrir una nueva
+    conexión TCP + handshake de MySQL por cada operación.
+    """
+
+    def __init__(self, host, user, password, database, max_conexiones=5,
+                 tiempo_inactividad=300, tiempo_vida=3600, tiempo_espera=10):
+        self.parametros = {
+            "host": host,
+            "user": user,
+            "password": password,
+            "database": database,
+        }
+        self.max_conexiones = max_conexiones
+        self.tiempo_inactividad = tiempo_inactividad  # segundos libre antes de descartarla
+        self.tiempo_vida = tiempo_vida  # segundos máximos de vida de una conexión
+        self.tiempo_espera = tiempo_espera  # segundos esperando una conexión libre
+
+        # El candado solo protege el estado del pool; connect, ping, rollback y close
+        # se hacen fuera de él para que un servidor lento no frene a los demás hilos
+        self._condicion = threading.Condition()
+        self._libres = []
+        self._en_uso = {}
+        self._ocupadas = 0  # conexiones prestadas o reservadas mientras se crean o verifican
+        self._estadisticas = {
+            "creadas": 0,
+            "reutilizadas": 0,
+            "descartadas": 0,
+            "pings_fallidos": 0,
+            "esperas": 0,
+            "agotado": 0,
+        }
+
+    def _crear(self):
+        return _ConexionAgrupada(pymysql.connect(**self.parametros))
+
+    def _cerrar(self, agrupadas):
+        for agrupada in agrupadas:
+            try:
+                agrupada.connection.close()
+            except Exception:
+                pass
+
+    def _vencida(self, agrupada, ahora):
+        return (ahora - agrupada.creada > self.tiempo_vida
+                or ahora - agrupada.devuelta > self.tiempo_inactividad)
+
+    def _reservar(self, limite):
+        """
+        Reserva un lugar del pool y retorna la conexión libre a verificar, o None si
+        hay que crear una. Se llama con el candado tomado.
+        """
+        vencidas = []
+        try:
+            while True:
+                ahora = time.monotonic()
+                while self._libres:
+                    agrupada = self._libres.pop()
+                    if self._vencida(agrupada, ahora):
+                        self._estadisticas["descartadas"] += 1
+                        vencidas.append(agrupada)
+                        continue
+                    self._ocupadas += 1
+                    return agrupada
+
+                if self._ocupadas < self.max_conexiones:
+                    self._ocupadas += 1
+                    return None
+
+                restante = limite - ahora
+                if restante <= 0:
+                    self._estadisticas["agotado"] += 1
+                    raise PoolAgotadoError(
+                        f"No hay conexiones libres después de {self.tiempo_espera} segundos"
+                    )
+                self._estadisticas["esperas"] += 1
+                self._condicion.wait(restante)
+        finally:
+            if vencidas:
+                # Cerrarlas sin el candado
+                self._condicion.release()
+                try:
+                    self._cerrar(vencidas)
+                finally:
+                    self._condicion.acquire()
+
+    def _liberar_lugar(self):
+        """Libera un lugar del pool y despierta a un hilo en espera. Se llama con el candado tomado."""
+        self._ocupadas -= 1
+        self._condicion.notify()
+
+    def obtener(self):
+        """Entrega una conexión viva del pool (checkout), creando una si hace falta."""
+        limite = time.monotonic() + self.tiempo_espera
+        while True:
+            with self._condicion:
+                agrupada = self._reservar(limite)
+
+            if agrupada is None:
+                try:
+                    agrupada = self._crear()
+                except Exception:
+                    with self._condicion:
+                        self._liberar_lugar()
+                    raise
+                with self._condicion:
+                    self._estadisticas["creadas"] += 1
+                    self._en_uso[id(agrupada.connection)] = agrupada
+                return agrupada.connection
+
+            try:
+                # Verificar que el servidor no haya cerrado la conexión
+                agrupada.connection.ping(reconnect=False)
+            except pymysql.MySQLError:
+                with self._condicion:
+                    self._estadisticas["pings_fallidos"] += 1
+                    self._estadisticas["descartadas"] += 1
+                    self._liberar_lugar()
+                self._cerrar([agrupada])
+                continue
+            with self._condicion:
+                self._estadisticas["reutilizadas"] += 1
+                self._en_uso[id(agrupada.connection)] = agrupada
+            return agrupada.connection
+
+    def devolver(self, connection):
+        """Regresa una conexión al pool (checkin)."""
+        with self._condicion:
+            agrupada = self._en_uso.pop(id(connection), None)
+            if agrupada is None:
+                return
+        try:
+            # Terminar la transacción implícita para no leer una instantánea vieja
+            connection.rollback()
+            viva = True
+        except pymysql.MySQLError:
+            viva = False
+        agrupada.devuelta = time.monotonic()
+        descartar = not viva or self._vencida(agrupada, agrupada.devuelta)
+        with self._condicion:
+            if descartar:
+                self._estadisticas["descartadas"] += 1
+            else:
+                self._libres.append(agrupada)
+            self._liberar_lugar()
+        if descartar:
+            self._cerrar([agrupada])
+
+    def cerrar(self):
+        """Cierra todas las conexiones libres del pool."""
+        with self._condicion:
+            libres, self._libres = self._libres, []
+            self._estadisticas["descartadas"] += len(libres)
+        self._cerrar(libres)
+
+    def estadisticas(self):
+        """Retorna un diccionario con los contadores y el estado actual del pool."""
+        with self._condicion:
+            datos = dict(self._estadisticas)
+            datos["libres"] = len(self._libres)
+            datos["en_uso"] = len(self._en_uso)
+            datos["max_conexiones"] = self.max_conexiones
+            return datos
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def obtener_pool(host, user, password, database):
+    """Retorna el pool compartido por el proceso para los parámetros dados."""
+    clave = (host, user, password, database)
+    with _pools_lock:
+        pool = _pools.get(clave)
+        if pool is None:
+            pool = PoolConexiones(host, user, password, database)
+            _pools[clave] = pool
+        return pool
+
+
 class ConexionDB:
+    """
+    Backend MySQL de OperacionesDB. Un backend debe ofrecer conectar(), que retorna una
+    conexión con la interfaz de pymysql (cursor, begin, commit, rollback) o None, y
+    cerrar_conexion(), que la libera. Ver conexion_sqlite.ConexionSQLite.
+    """
+
     def __init__(self):
         self.host = "127.0.0.1"
         self.user = "root"
         self.password = ""
         self.database = "proyectoevc"
-        self.connection = None
+        # Cada hilo maneja su propia conexión prestada del pool
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        return getattr(self._local, "connection", None)
+
+    @connection.setter
+    def connection(self, value):
+        self._local.connection = value
+
+    @property
+    def pool(self):
+        return obtener_pool(self.host, self.user, self.password, self.database)
 
     def conectar(self):
         try:
-            self.connection = pymysql.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database
-            )
-            print("Conexión exitosa a la base de datos.")
-            return self.connection
+            inicio = time.perf_counter()
+            self.connection = self.pool.obtener()
+            metricas.registrar_adquisicion((time.perf_counter() - inicio) * 1000)
+            # Se entrega envuelta para contar viajes y tiempos; al pool se devuelve la original
+            return ConexionMedida(self.connection)
         except pymysql.MySQLError as e:
             print(f"Error al conectar a la base de datos: {e}")
             return None
 
     def cerrar_conexion(self):
         if self.connection:
-            self.connection.close()
-            print("Conexión cerrada correctamente.")
+            self.pool.devolver(self.connection)
+            self.connection = None
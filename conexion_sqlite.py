@@ -0,0 +1,306 @@
+"""
+Backend SQLite en proceso con el mismo esquema que proyectoevc.
+
+Permite ejecutar OperacionesDB sin XAMPP (pruebas de rendimiento reproducibles):
+
+    base = BaseSQLite()                       # en memoria, o BaseSQLite("evc.sqlite3")
+    db = OperacionesDB(ConexionSQLite(base))
+    # o para todas las instancias del proceso (catálogos, pantallas):
+    OperacionesDB.fabrica_conexion = lambda: ConexionSQLite(base)
+
+Las sentencias de consultas.py se traducen del dialecto de MySQL al de SQLite y los
+errores de sqlite3 se relanzan como errores de pymysql, así los bloques
+except pymysql.MySQLError de OperacionesDB se comportan igual.
+"""
+import datetime
+import decimal
+import functools
+import re
+import sqlite3
+import threading
+import time
+
+import pymysql
+
+from esquema import INDICES, TABLAS, TABLA_DECOMISOS_DIARIOS, TABLA_ESTADISTICAS_DIARIAS, TABLA_TRIGRAMAS
+from instrumentacion import ConexionMedida, metricas
+
+
+# SQLite no trae conversores para estos tipos; se registran para que las columnas DATE,
+# TIMESTAMP y DECIMAL lleguen con los mismos tipos de Python que entrega pymysql
+sqlite3.register_adapter(datetime.date, lambda valor: valor.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda valor: valor.isoformat(" "))
+sqlite3.register_adapter(decimal.Decimal, str)
+sqlite3.register_converter("DATE", lambda valor: datetime.date.fromisoformat(valor.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda valor: datetime.datetime.fromisoformat(valor.decode()))
+sqlite3.register_converter("DECIMAL", lambda valor: decimal.Decimal(valor.decode()))
+
+
+def _yearweek(fecha, modo=0):
+    """YEARWEEK() de MySQL; solo el modo 3 (semanas ISO, desde el lunes), el que usa consultas.py."""
+    if fecha is None:
+        return None
+    if modo != 3:
+        raise sqlite3.NotSupportedError(f"YEARWEEK con modo {modo} no está soportado")
+    anio, semana, _ = datetime.date.fromisoformat(fecha[:10]).isocalendar()
+    return anio * 100 + semana
+
+
+def _date_format(fecha, formato):
+    """DATE_FORMAT() de MySQL; los especificadores que usa consultas.py (%Y, %m, %d) coinciden con strftime."""
+    if fecha is None:
+        return None
+    return datetime.date.fromisoformat(fecha[:10]).strftime(formato)
+
+
+def tablas_sqlite():
+    """Traduce las sentencias CREATE TABLE de esquema.py y retorna (tablas, índices) para SQLite."""
+    tablas = []
+    indices = [(tabla, nombre, columnas) for tabla, nombre, columnas in INDICES]
+    for sql in TABLAS + [TABLA_TRIGRAMAS, TABLA_ESTADISTICAS_DIARIAS, TABLA_DECOMISOS_DIARIOS]:
+        tabla = re.search(r"CREATE TABLE IF NOT EXISTS (\w+)", sql).group(1)
+        sql = sql.replace("INT AUTO_INCREMENT PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT")
+        sql = re.sub(r"UNIQUE KEY \w+ \(", "UNIQUE (", sql)
+        # Los KEY secundarios dentro de CREATE TABLE pasan a CREATE INDEX
+        for nombre, columnas in re.findall(r"^\s*KEY (\w+) \(([^)]*)\),?\s*$", sql, flags=re.M):
+            indices.append((tabla, nombre, columnas))
+        sql = re.sub(r"^\s*KEY \w+ \([^)]*\),?\s*$\n", "", sql, flags=re.M)
+        sql = re.sub(r"\)\s*ENGINE=InnoDB", ")", sql)
+        tablas.append(sql)
+    return tablas, indices
+
+
+def _quitar_parentesis_union(sql):
+    """
+    MySQL acepta (SELECT ... LIMIT n) UNION ALL (SELECT ...); SQLite no admite paréntesis
+    alrededor de cada parte, así que cada una se envuelve como SELECT * FROM (SELECT ...).
+    """
+    partes = []
+    profundidad = 0
+    i = 0
+    while i < len(sql):
+        caracter = sql[i]
+        if caracter == "(" and profundidad == 0 and sql[i + 1:].lstrip().upper().startswith("SELECT"):
+            # Buscar el paréntesis que cierra esta parte
+            nivel = 0
+            for j in range(i, len(sql)):
+                if sql[j] == "(":
+                    nivel += 1
+                elif sql[j] == ")":
+                    nivel -= 1
+                    if nivel == 0:
+                        break
+            partes.append("SELECT * FROM " + sql[i:j + 1])
+            i = j + 1
+            continue
+        if caracter == "(":
+            profundidad += 1
+        elif caracter == ")":
+            profundidad -= 1
+        partes.append(caracter)
+        i += 1
+    return "".join(partes)
+
+
+@functools.lru_cache(maxsize=512)
+def traducir_sql(sql):
+    """Retorna (sql para SQLite, es_upsert) a partir de una sentencia escrita para MySQL."""
+    if re.match(r"\s*SELECT\s+@@innodb_autoinc_lock_mode", sql, flags=re.I):
+        # Los ids de un INSERT de varias filas en SQLite siempre son consecutivos
+        return "SELECT 1", False
+
+    sql = sql.replace("NOW()", "CURRENT_TIMESTAMP")
+    sql = re.sub(r"\bINSERT\s+IGNORE\b", "INSERT OR IGNORE", sql, flags=re.I)
+
+    es_upsert = False
+    duplicado = re.search(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b(.*)$", sql, flags=re.I | re.S)
+    if duplicado:
+        es_upsert = True
+        actualizacion = re.sub(r"\bVALUES\((\w+)\)", r"excluded.\1", duplicado.group(1).strip())
+        # RETURNING entrega el id de la fila insertada o actualizada, como LAST_INSERT_ID en MySQL
+        sql = sql[:duplicado.start()] + f"ON CONFLICT DO UPDATE SET {actualizacion} RETURNING id"
+
+    if re.match(r"\s*\(\s*SELECT", sql, flags=re.I):
+        sql = _quitar_parentesis_union(sql)
+
+    # Marcadores de pymysql (%s) a los de sqlite3 (?); %% es un % literal
+    sql = re.sub(r"%(s|%)", lambda m: "?" if m.group(1) == "s" else "%", sql)
+    # En MySQL la barra invertida es el escape por defecto de LIKE
+    sql = re.sub(r"\bLIKE\s+\?", r"LIKE ? ESCAPE '\\'", sql, flags=re.I)
+    return sql, es_upsert
+
+
+def _parametros(params):
+    """pymysql acepta None, una secuencia o un único valor como parámetros."""
+    if params is None:
+        return ()
+    if isinstance(params, (list, tuple)):
+        return tuple(params)
+    return (params,)
+
+
+class _CursorSQLite:
+    """Cursor con la interfaz de los cursores de pymysql que se usan en consultas.py."""
+
+    def __init__(self, connection, como_dict):
+        self._cursor = connection.cursor()
+        self._como_dict = como_dict
+        self._filas = []
+        self._posicion = 0
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._cursor.close()
+
+    def execute(self, sql, params=None):
+        sql_sqlite, es_upsert = traducir_sql(sql)
+        try:
+            self._cursor.execute(sql_sqlite, _parametros(params))
+            filas = self._cursor.fetchall() if self._cursor.description else []
+        except sqlite3.IntegrityError as e:
+            raise pymysql.err.IntegrityError(str(e)) from e
+        except sqlite3.Error as e:
+            raise pymysql.err.OperationalError(str(e)) from e
+
+        self._posicion = 0
+        if es_upsert:
+            self.description = None
+            self._filas = []
+            self.rowcount = 1
+            self.lastrowid = filas[0][0] if filas else None
+            return self.rowcount
+
+        self.description = self._cursor.description
+        if self.description:
+            if self._como_dict:
+                nombres = [columna[0] for columna in self.description]
+                filas = [dict(zip(nombres, fila)) for fila in filas]
+            self._filas = filas
+            self.rowcount = len(filas)
+        else:
+            self._filas = []
+            self.rowcount = self._cursor.rowcount
+            if sql_sqlite.lstrip().upper().startswith("INSERT") and self.rowcount > 0:
+                # pymysql entrega el id de la primera fila de un INSERT de varias filas
+                self.lastrowid = self._cursor.lastrowid - self.rowcount + 1
+        return self.rowcount
+
+    def executemany(self, sql, seq_params):
+        filas = 0
+        for params in seq_params:
+            filas += self.execute(sql, params)
+        self.rowcount = filas
+        return filas
+
+    def fetchone(self):
+        if self._posicion >= len(self._filas):
+            return None
+        fila = self._filas[self._posicion]
+        self._posicion += 1
+        return fila
+
+    def fetchmany(self, size=1):
+        filas = self._filas[self._posicion:self._posicion + size]
+        self._posicion += len(filas)
+        return filas
+
+    def fetchall(self):
+        filas = self._filas[self._posicion:]
+        self._posicion = len(self._filas)
+        return filas
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+
+class _ConexionSQLiteAdaptada:
+    """Conexión sqlite3 con la interfaz de pymysql.Connection usada en consultas.py."""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, clase=None):
+        como_dict = clase is not None and issubclass(clase, pymysql.cursors.DictCursorMixin)
+        return _CursorSQLite(self._connection, como_dict)
+
+    def begin(self):
+        if not self._connection.in_transaction:
+            self._connection.execute("BEGIN")
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+
+class BaseSQLite:
+    """
+    Base SQLite con las tablas e índices de esquema.py. Se usa una sola conexión
+    para todo el proceso y cada hilo la toma en exclusiva entre conectar() y
+    cerrar_conexion(), igual que una conexión prestada del pool.
+    """
+
+    def __init__(self, ruta=":memory:"):
+        self.ruta = ruta
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(ruta, check_same_thread=False,
+                                          detect_types=sqlite3.PARSE_DECLTYPES)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.create_function("YEARWEEK", 2, _yearweek, deterministic=True)
+        self.connection.create_function("DATE_FORMAT", 2, _date_format, deterministic=True)
+        if ruta != ":memory:":
+            self.connection.execute("PRAGMA journal_mode = WAL")
+        self.crear_esquema()
+
+    def crear_esquema(self):
+        tablas, indices = tablas_sqlite()
+        with self.lock:
+            for sql in tablas:
+                self.connection.execute(sql)
+            for tabla, nombre, columnas in indices:
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} ({columnas})")
+            self.connection.commit()
+
+    def cerrar(self):
+        with self.lock:
+            self.connection.close()
+
+
+class ConexionSQLite:
+    """Misma interfaz que ConexionDB (conectar / cerrar_conexion) sobre una BaseSQLite."""
+
+    def __init__(self, base):
+        self.base = base
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        return getattr(self._local, "connection", None)
+
+    @connection.setter
+    def connection(self, value):
+        self._local.connection = value
+
+    def conectar(self):
+        if self.connection is None:
+            inicio = time.perf_counter()
+            self.base.lock.acquire()
+            metricas.registrar_adquisicion((time.perf_counter() - inicio) * 1000)
+            self.connection = _ConexionSQLiteAdaptada(self.base.connection)
+        return ConexionMedida(self.connection)
+
+    def cerrar_conexion(self):
+        if self.connection:
+            # Igual que al devolver una conexión al pool: se descarta lo no confirmado
+            self.connection.rollback()
+            self.connection = None
+            self.base.lock.release()
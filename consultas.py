@@ -1,17 +1,183 @@
 import datetime
-import os
-import shutil
 import pymysql
-from reportlab.lib.pagesizes import letter, portrait, legal
-from reportlab.platypus import Table, TableStyle
-from reportlab.lib import colors
-from reportlab.pdfgen import canvas
 
 from conexion import ConexionDB
+from instrumentacion import instrumentar
 
+# Máximo de filas por sentencia INSERT de múltiples filas
+TAMANO_LOTE = 500
+
+
+# Fecha con la que estadisticas_diarias y decomisos_diarios agrupan a los animales sin
+# fecha de ingreso: cuentan en los totales, pero no en la evolución ni en las tasas
+FECHA_SIN_INGRESO = datetime.date(1000, 1, 1)
+
+
+# Máximo de coincidencias que retorna buscar_animal
+LIMITE_BUSQUEDA = 500
+
+
+# Máximo de filas por consulta al cargar analitica.py
+LOTE_ANALITICA = 50000
+
+
+# Agrupación de obtener_evolucion_ingresos_establecimiento por granularidad
+# (semanas ISO, que empiezan el lunes)
+AGRUPACION_EVOLUCION = {
+    "dia": "fecha",
+    "semana": "YEARWEEK(fecha, 3)",
+    "mes": "DATE_FORMAT(fecha, '%%Y-%%m')",
+}
+
+
+def inicio_periodo(fecha, granularidad):
+    """Primer día del periodo (lunes de la semana o día 1 del mes) que contiene la fecha."""
+    if isinstance(fecha, str):
+        fecha = datetime.date.fromisoformat(fecha[:10])
+    if granularidad == "semana":
+        return fecha - datetime.timedelta(days=fecha.weekday())
+    if granularidad == "mes":
+        return fecha.replace(day=1)
+    return fecha
+
+
+def trigramas(texto):
+    """Retorna el conjunto de subcadenas de 3 caracteres (en minúsculas) del texto."""
+    texto = str(texto or "").lower()
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _escapar_like(texto):
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def rango_coincidencia(animal, texto):
+    """
+    Reproduce en memoria el criterio de buscar_animal_pagina: retorna 0 (exacta),
+    1 (prefijo), 2 (guía que contiene el texto) o None si el animal no coincide.
+    """
+    texto = str(texto).strip().lower()
+    numero_animal = str(animal.get("numero_animal") or "").lower()
+    numero_tiquete = str(animal.get("numero_tiquete") or "").lower()
+    guia = str(animal.get("guia_movilizacion") or "").lower()
+    if texto in (str(animal.get("id")), numero_animal, numero_tiquete):
+        return 0
+    if numero_animal.startswith(texto) or numero_tiquete.startswith(texto) or guia.startswith(texto):
+        return 1
+    if len(texto) >= 3 and texto in guia:
+        return 2
+    return None
+
+
+def es_numero(texto):
+    """True si el texto son solo dígitos ASCII; isdigit() solo también acepta "²" o "١", que int() no convierte."""
+    return texto.isascii() and texto.isdigit()
+
+
+def puede_refinar(texto_base, texto):
+    """
+    Indica si las coincidencias de texto_base sirven para mostrar las de texto
+    filtrándolas con rango_coincidencia: texto extiende a texto_base, texto_base ya
+    buscaba en las guías (3 caracteres o más) y ambos son o no son números. Un número
+    también se compara con el id del animal, que la búsqueda base puede no incluir; por
+    eso el resultado filtrado se confirma siempre con la base de datos.
+    """
+    base = str(texto_base).strip().lower()
+    texto = str(texto).strip().lower()
+    return len(base) >= 3 and texto.startswith(base) and es_numero(base) == es_numero(texto)
+
+
+def _insertar_trigramas(cursor, animales):
+    """Indexa la guía de movilización de cada (id_animal, guia_movilizacion) en animales_trigramas."""
+    filas = [(trigrama, id_animal) for id_animal, guia in animales for trigrama in trigramas(guia)]
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        _insertar_multifila(cursor, "INSERT IGNORE INTO animales_trigramas (trigrama, id_animal) VALUES ",
+                            "(%s, %s)", filas[inicio:inicio + TAMANO_LOTE])
+
+
+def _insertar_multifila(cursor, insert_sql, fila_sql, filas, sufijo=""):
+    """
+    Ejecuta un único INSERT con una tupla de valores por cada fila y retorna el id
+    generado para la primera fila (LAST_INSERT_ID). El sufijo va después de los
+    valores, p. ej. una cláusula ON DUPLICATE KEY UPDATE.
+    """
+    sql = insert_sql + ", ".join([fila_sql] * len(filas)) + sufijo
+    cursor.execute(sql, [valor for fila in filas for valor in fila])
+    return cursor.lastrowid
+
+
+def _ids_animales_insertados(cursor, primer_id, lote):
+    """
+    Ids de las filas de un INSERT de múltiples filas en animales cuando no son
+    consecutivos (innodb_autoinc_lock_mode 2, el predeterminado de MySQL 8). Aun así
+    crecen en el orden de las filas, así que se leen los animales desde el primer id y
+    se asignan en orden por (numero_animal, numero_tiquete).
+    """
+    numeros = sorted({str(fila[0]) for fila in lote})
+    cursor.execute(f"""
+        SELECT id, numero_animal, numero_tiquete FROM animales
+        WHERE id >= %s AND numero_animal IN ({', '.join(['%s'] * len(numeros))})
+        ORDER BY id
+    """, [primer_id] + numeros)
+    por_clave = {}
+    for id_animal, numero_animal, numero_tiquete in cursor.fetchall():
+        por_clave.setdefault((str(numero_animal), str(numero_tiquete)), []).append(id_animal)
+    ids = []
+    for fila in lote:
+        candidatos = por_clave.get((str(fila[0]), str(fila[2])))
+        if not candidatos:
+            raise pymysql.MySQLError(f"No se encontró el id del animal {fila[0]} recién insertado")
+        ids.append(candidatos.pop(0))
+    return ids
+
+
+def _sumar_estadisticas(cursor, totales):
+    """
+    Suma a estadisticas_diarias los totales {(fecha, id_establecimiento, especie, sexo):
+    [cantidad, peso_total, con_peso, decomisos]}, dentro de la transacción que los generó.
+    """
+    filas = [(fecha, id_establecimiento, especie or "", sexo or "", cantidad, round(peso_total, 2), con_peso,
+              decomisos)
+             for (fecha, id_establecimiento, especie, sexo), (cantidad, peso_total, con_peso, decomisos)
+             in totales.items()]
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        _insertar_multifila(
+            cursor,
+            "INSERT INTO estadisticas_diarias (fecha, id_establecimiento, especie, sexo, cantidad, peso_total, "
+            "con_peso, decomisos) VALUES ",
+            "(%s, %s, %s, %s, %s, %s, %s, %s)",
+            filas[inicio:inicio + TAMANO_LOTE],
+            sufijo=" ON DUPLICATE KEY UPDATE cantidad = cantidad + VALUES(cantidad), "
+                   "peso_total = peso_total + VALUES(peso_total), con_peso = con_peso + VALUES(con_peso), "
+                   "decomisos = decomisos + VALUES(decomisos)")
+
+
+def _sumar_decomisos(cursor, totales):
+    """
+    Suma a decomisos_diarios los totales {(fecha, id_establecimiento, producto, motivo): cantidad},
+    dentro de la transacción que los generó.
+    """
+    filas = [(fecha, id_establecimiento, producto or "", motivo or "", cantidad)
+             for (fecha, id_establecimiento, producto, motivo), cantidad in totales.items()]
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        _insertar_multifila(
+            cursor,
+            "INSERT INTO decomisos_diarios (fecha, id_establecimiento, producto, motivo, cantidad) VALUES ",
+            "(%s, %s, %s, %s, %s)",
+            filas[inicio:inicio + TAMANO_LOTE],
+            sufijo=" ON DUPLICATE KEY UPDATE cantidad = cantidad + VALUES(cantidad)")
+
+
+@instrumentar
 class OperacionesDB:
-    def __init__(self):
-        self.conexion_db = ConexionDB()
+    _autoinc_consecutivo = {}  # Tipo de backend -> bool; se consulta una sola vez por proceso
+
+    # Backend de las instancias creadas sin conexion_db: cualquier objeto con
+    # conectar() y cerrar_conexion() como ConexionDB (p. ej. conexion_sqlite.ConexionSQLite)
+    fabrica_conexion = ConexionDB
+
+    def __init__(self, conexion_db=None):
+        self.conexion_db = conexion_db or type(self).fabrica_conexion()
         
     def obtener_estadisticas_animales_por_especie(self):
         """
@@ -20,8 +186,8 @@ class OperacionesDB:
         [{"especie": "Bovino", "cantidad": 150}, {"especie": "Porcino", "cantidad": 80}]
         """
         query = """
-            SELECT especie, COUNT(id) AS cantidad
-            FROM animales
+            SELECT NULLIF(especie, '') AS especie, SUM(cantidad) AS cantidad
+            FROM estadisticas_diarias
             GROUP BY especie
             ORDER BY cantidad DESC
         """
@@ -32,7 +198,7 @@ class OperacionesDB:
             with connection.cursor() as cursor:
                 cursor.execute(query)
                 resultados = cursor.fetchall()
-                return [{"especie": row[0], "cantidad": row[1]} for row in resultados]
+                return [{"especie": row[0], "cantidad": int(row[1])} for row in resultados]
         except pymysql.MySQLError as e:
             print(f"Error al obtener estadísticas de animales por especie: {e}")
             return []
@@ -47,10 +213,10 @@ class OperacionesDB:
         [{"especie": "Bovino", "cantidad_decomisos": 20}, {"especie": "Porcino", "cantidad_decomisos": 5}]
         """
         query = """
-            SELECT a.especie, COUNT(d.id) AS cantidad_decomisos
-            FROM decomisos d
-            JOIN animales a ON d.id_animal = a.id
-            GROUP BY a.especie
+            SELECT NULLIF(especie, '') AS especie, SUM(decomisos) AS cantidad_decomisos
+            FROM estadisticas_diarias
+            GROUP BY especie
+            HAVING SUM(decomisos) > 0
             ORDER BY cantidad_decomisos DESC
         """
         connection = self.conexion_db.conectar()
@@ -60,7 +226,7 @@ class OperacionesDB:
             with connection.cursor() as cursor:
                 cursor.execute(query)
                 resultados = cursor.fetchall()
-                return [{"especie": row[0], "cantidad_decomisos": row[1]} for row in resultados]
+                return [{"especie": row[0], "cantidad_decomisos": int(row[1])} for row in resultados]
         except pymysql.MySQLError as e:
             print(f"Error al obtener decomisos totales por especie: {e}")
             return []
@@ -76,8 +242,8 @@ class OperacionesDB:
         [{"especie": "Bovino", "cantidad": 25}, {"especie": "Porcino", "cantidad": 15}]
         """
         query = """
-            SELECT especie, COUNT(id) AS cantidad
-            FROM animales
+            SELECT NULLIF(especie, '') AS especie, SUM(cantidad) AS cantidad
+            FROM estadisticas_diarias
             WHERE id_establecimiento = %s
             GROUP BY especie
             ORDER BY cantidad DESC
@@ -89,7 +255,7 @@ class OperacionesDB:
             with connection.cursor() as cursor:
                 cursor.execute(query, (establecimiento_id,))
                 resultados = cursor.fetchall()
-                return [{"especie": row[0], "cantidad": row[1]} for row in resultados]
+                return [{"especie": row[0], "cantidad": int(row[1])} for row in resultados]
         except pymysql.MySQLError as e:
             print(f"Error al obtener estadísticas de animales por especie para establecimiento: {e}")
             return []
@@ -106,10 +272,10 @@ class OperacionesDB:
         {"especie": "Porcino", "Macho": 5, "Hembra": 8}]
         """
         query = """
-            SELECT especie,
-                SUM(CASE WHEN sexo = 'Macho' THEN 1 ELSE 0 END) AS Macho,
-                SUM(CASE WHEN sexo = 'Hembra' THEN 1 ELSE 0 END) AS Hembra
-            FROM animales
+            SELECT NULLIF(especie, '') AS especie,
+                SUM(CASE WHEN sexo = 'Macho' THEN cantidad ELSE 0 END) AS Macho,
+                SUM(CASE WHEN sexo = 'Hembra' THEN cantidad ELSE 0 END) AS Hembra
+            FROM estadisticas_diarias
             WHERE id_establecimiento = %s
             GROUP BY especie
             ORDER BY especie
@@ -121,7 +287,7 @@ class OperacionesDB:
             with connection.cursor() as cursor:
                 cursor.execute(query, (establecimiento_id,))
                 resultados = cursor.fetchall()
-                return [{"especie": row[0], "Macho": row[1], "Hembra": row[2]} for row in resultados]
+                return [{"especie": row[0], "Macho": int(row[1]), "Hembra": int(row[2])} for row in resultados]
         except pymysql.MySQLError as e:
             print(f"Error al obtener distribución de sexo por especie: {e}")
             return []
@@ -136,8 +302,8 @@ class OperacionesDB:
         [{"especie": "Bovino", "peso_promedio": 450.0}, {"especie": "Porcino", "peso_promedio": 120.0}]
         """
         query = """
-            SELECT especie, AVG(peso) AS peso_promedio
-            FROM animales
+            SELECT NULLIF(especie, '') AS especie, SUM(peso_total) / NULLIF(SUM(con_peso), 0) AS peso_promedio
+            FROM estadisticas_diarias
             WHERE id_establecimiento = %s
             GROUP BY especie
             ORDER BY peso_promedio DESC
@@ -150,7 +316,7 @@ class OperacionesDB:
                 cursor.execute(query, (establecimiento_id,))
                 resultados = cursor.fetchall()
                 # Convertir el peso promedio a float para mayor claridad
-                return [{"especie": row[0], "peso_promedio": float(row[1])} for row in resultados]
+                return [{"especie": row[0], "peso_promedio": float(row[1] or 0)} for row in resultados]
         except pymysql.MySQLError as e:
             print(f"Error al obtener peso promedio por especie para establecimiento: {e}")
             return []
@@ -158,18 +324,32 @@ class OperacionesDB:
             self.conexion_db.cerrar_conexion()
 
 
-    def obtener_evolucion_ingresos_establecimiento(self, establecimiento_id):
+    def obtener_evolucion_ingresos_establecimiento(self, establecimiento_id, desde=None, hasta=None,
+                                                   granularidad="dia"):
         """
         Retorna una lista de diccionarios con la evolución temporal de ingresos para
-        el establecimiento especificado, agrupando por la fecha de ingreso.
+        el establecimiento especificado entre desde y hasta (inclusive; None = sin límite),
+        agrupando por "dia", "semana" o "mes". La fecha de cada fila es el primer día del
+        periodo (el lunes de la semana o el día 1 del mes).
         Ejemplo de resultado:
-        [{"fecha": "2024-01-01", "cantidad": 3}, {"fecha": "2024-01-02", "cantidad": 5}]
+        [{"fecha": "2024-01-01", "cantidad": 3}, {"fecha": "2024-01-08", "cantidad": 5}]
         """
-        query = """
-            SELECT DATE(fecha_ingreso) AS fecha, COUNT(id) AS cantidad
-            FROM animales
-            WHERE id_establecimiento = %s
-            GROUP BY DATE(fecha_ingreso)
+        if granularidad not in AGRUPACION_EVOLUCION:
+            raise ValueError(f"Granularidad no soportada: {granularidad}")
+        # Rango sobre la columna sin funciones: lo resuelve el índice (id_establecimiento, fecha, ...)
+        # Sin desde, se empieza después de FECHA_SIN_INGRESO (animales sin fecha de ingreso)
+        if desde is None:
+            desde = FECHA_SIN_INGRESO + datetime.timedelta(days=1)
+        condiciones = ["id_establecimiento = %s", "fecha >= %s"]
+        parametros = [establecimiento_id, desde]
+        if hasta is not None:
+            condiciones.append("fecha <= %s")
+            parametros.append(hasta)
+        query = f"""
+            SELECT MIN(fecha) AS fecha, SUM(cantidad) AS cantidad
+            FROM estadisticas_diarias
+            WHERE {" AND ".join(condiciones)}
+            GROUP BY {AGRUPACION_EVOLUCION[granularidad]}
             ORDER BY fecha ASC
         """
         connection = self.conexion_db.conectar()
@@ -177,16 +357,243 @@ class OperacionesDB:
             return []
         try:
             with connection.cursor() as cursor:
-                cursor.execute(query, (establecimiento_id,))
+                cursor.execute(query, parametros)
                 resultados = cursor.fetchall()
-                return [{"fecha": row[0].strftime("%Y-%m-%d") if hasattr(row[0], "strftime") else row[0],
-                        "cantidad": row[1]} for row in resultados]
         except pymysql.MySQLError as e:
             print(f"Error al obtener evolución de ingresos para establecimiento: {e}")
             return []
         finally:
             self.conexion_db.cerrar_conexion()
 
+        return [{"fecha": inicio_periodo(fecha, granularidad).strftime("%Y-%m-%d"), "cantidad": int(cantidad)}
+                for fecha, cantidad in resultados]
+
+    def obtener_resumen_establecimiento(self, establecimiento_id):
+        """
+        Retorna en una sola consulta la cantidad de animales, la distribución por sexo y
+        el peso promedio por especie, y la primera y última fecha de ingreso del
+        establecimiento (la evolución se pide aparte, con obtener_evolucion_ingresos_establecimiento).
+        Las listas de cada especie están alineadas con "especies" (ordenadas por cantidad).
+        Ejemplo de resultado:
+        {"especies": ["Bovino", "Porcino"], "cantidad": [25, 15], "macho": [10, 5],
+         "hembra": [15, 8], "peso_promedio": [450.0, 120.0],
+         "primera_fecha": "2024-01-01", "ultima_fecha": "2024-03-31"}
+        """
+        vacio = {"especies": [], "cantidad": [], "macho": [], "hembra": [], "peso_promedio": [],
+                 "primera_fecha": None, "ultima_fecha": None}
+        query = """
+            SELECT NULLIF(especie, ''), sexo, SUM(cantidad), SUM(peso_total), SUM(con_peso),
+                   MIN(NULLIF(fecha, %s)), MAX(NULLIF(fecha, %s))
+            FROM estadisticas_diarias
+            WHERE id_establecimiento = %s
+            GROUP BY especie, sexo
+        """
+        connection = self.conexion_db.conectar()
+        if not connection:
+            return vacio
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query, (FECHA_SIN_INGRESO, FECHA_SIN_INGRESO, establecimiento_id))
+                resultados = cursor.fetchall()
+        except pymysql.MySQLError as e:
+            print(f"Error al obtener el resumen del establecimiento: {e}")
+            return vacio
+        finally:
+            self.conexion_db.cerrar_conexion()
+
+        por_especie = {}  # especie -> [cantidad, macho, hembra, peso_total, con_peso]
+        fechas = []
+        for especie, sexo, cantidad, peso_total, con_peso, primera, ultima in resultados:
+            cantidad = int(cantidad)
+            totales = por_especie.setdefault(especie, [0, 0, 0, 0.0, 0])
+            totales[0] += cantidad
+            if sexo == "Macho":
+                totales[1] += cantidad
+            elif sexo == "Hembra":
+                totales[2] += cantidad
+            totales[3] += float(peso_total or 0)
+            totales[4] += int(con_peso or 0)
+            for fecha in (primera, ultima):
+                # None si el grupo solo tiene animales sin fecha de ingreso
+                if fecha is not None:
+                    fechas.append(fecha.strftime("%Y-%m-%d") if hasattr(fecha, "strftime") else str(fecha)[:10])
+
+        especies = sorted(por_especie, key=lambda especie: por_especie[especie][0], reverse=True)
+        return {
+            "especies": especies,
+            "cantidad": [por_especie[especie][0] for especie in especies],
+            "macho": [por_especie[especie][1] for especie in especies],
+            "hembra": [por_especie[especie][2] for especie in especies],
+            "peso_promedio": [por_especie[especie][3] / por_especie[especie][4] if por_especie[especie][4] else 0.0
+                              for especie in especies],
+            "primera_fecha": min(fechas) if fechas else None,
+            "ultima_fecha": max(fechas) if fechas else None,
+        }
+
+    def obtener_tasas_decomiso(self, establecimiento_id=None, desde=None, hasta=None, granularidad="semana"):
+        """
+        Retorna las tasas de decomiso (decomisos por cada 100 animales ingresados) del
+        establecimiento (None = todos) entre desde y hasta, por producto, por motivo, por
+        establecimiento y por periodo ("dia", "semana" o "mes"). Los decomisos se cuentan
+        en el día de ingreso del animal, el mismo de los animales del denominador.
+        Retorna None si hubo un error.
+        Ejemplo de resultado:
+        {"animales": 1200, "decomisos": 96, "tasa": 8.0,
+         "por_producto": [{"producto": "Hígado", "decomisos": 40, "tasa": 3.33}, ...],
+         "por_motivo": [{"motivo": "Fasciola hepática", "decomisos": 30, "tasa": 2.5}, ...],
+         "por_establecimiento": [{"id_establecimiento": 3, "animales": 1200, "decomisos": 96, "tasa": 8.0}],
+         "por_periodo": [{"fecha": "2024-01-01", "animales": 300, "decomisos": 20, "tasa": 6.67}, ...]}
+        """
+        if granularidad not in AGRUPACION_EVOLUCION:
+            raise ValueError(f"Granularidad no soportada: {granularidad}")
+        condiciones = []
+        parametros = []
+        # Las tasas son por día de ingreso: sin desde, se excluye FECHA_SIN_INGRESO
+        if desde is None:
+            desde = FECHA_SIN_INGRESO + datetime.timedelta(days=1)
+        for condicion, valor in (("id_establecimiento = %s", establecimiento_id),
+                                 ("fecha >= %s", desde), ("fecha <= %s", hasta)):
+            if valor is not None:
+                condiciones.append(condicion)
+                parametros.append(valor)
+        filtro = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        agrupacion = AGRUPACION_EVOLUCION[granularidad]
+        # Decomisos y animales de los dos resúmenes diarios en un solo viaje; ambos se
+        # recorren por (id_establecimiento, fecha, ...)
+        query = f"""
+            SELECT id_establecimiento, MIN(fecha), NULLIF(producto, ''), NULLIF(motivo, ''), SUM(cantidad), 0
+            FROM decomisos_diarios
+            {filtro}
+            GROUP BY id_establecimiento, {agrupacion}, producto, motivo
+            UNION ALL
+            SELECT id_establecimiento, MIN(fecha), NULL, NULL, 0, SUM(cantidad)
+            FROM estadisticas_diarias
+            {filtro}
+            GROUP BY id_establecimiento, {agrupacion}
+        """
+        connection = self.conexion_db.conectar()
+        if not connection:
+            return None
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query, parametros * 2)
+                resultados = cursor.fetchall()
+        except pymysql.MySQLError as e:
+            print(f"Error al obtener las tasas de decomiso: {e}")
+            return None
+        finally:
+            self.conexion_db.cerrar_conexion()
+
+        por_producto, por_motivo, por_establecimiento, por_periodo = {}, {}, {}, {}
+        for id_establecimiento, fecha, producto, motivo, decomisos, animales in resultados:
+            decomisos, animales = int(decomisos or 0), int(animales or 0)
+            fecha = inicio_periodo(fecha, granularidad).strftime("%Y-%m-%d")
+            for totales, clave in ((por_establecimiento, id_establecimiento), (por_periodo, fecha)):
+                total = totales.setdefault(clave, [0, 0])
+                total[0] += animales
+                total[1] += decomisos
+            if decomisos:
+                por_producto[producto] = por_producto.get(producto, 0) + decomisos
+                por_motivo[motivo] = por_motivo.get(motivo, 0) + decomisos
+
+        animales = sum(total[0] for total in por_establecimiento.values())
+        decomisos = sum(total[1] for total in por_establecimiento.values())
+
+        def tasa(cantidad, sobre):
+            return round(100 * cantidad / sobre, 2) if sobre else 0.0
+
+        return {
+            "animales": animales,
+            "decomisos": decomisos,
+            "tasa": tasa(decomisos, animales),
+            "por_producto": [{"producto": producto, "decomisos": cantidad, "tasa": tasa(cantidad, animales)}
+                             for producto, cantidad in sorted(por_producto.items(), key=lambda fila: -fila[1])],
+            "por_motivo": [{"motivo": motivo, "decomisos": cantidad, "tasa": tasa(cantidad, animales)}
+                           for motivo, cantidad in sorted(por_motivo.items(), key=lambda fila: -fila[1])],
+            "por_establecimiento": [{"id_establecimiento": clave, "animales": total[0], "decomisos": total[1],
+                                     "tasa": tasa(total[1], total[0])}
+                                    for clave, total in sorted(por_establecimiento.items())],
+            "por_periodo": [{"fecha": clave, "animales": total[0], "decomisos": total[1],
+                             "tasa": tasa(total[1], total[0])}
+                            for clave, total in sorted(por_periodo.items())],
+        }
+
+    def obtener_marca_cambios(self):
+        """
+        Retorna una marca barata que cambia cuando se registran animales o decomisos:
+        la tupla (último id de animales, último id de decomisos), o None si hubo un error.
+        Ejemplo de resultado: (80412, 6233)
+        """
+        query = """
+            SELECT (SELECT COALESCE(MAX(id), 0) FROM animales),
+                (SELECT COALESCE(MAX(id), 0) FROM decomisos)
+        """
+        connection = self.conexion_db.conectar()
+        if not connection:
+            return None
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                fila = cursor.fetchone()
+                return (int(fila[0]), int(fila[1]))
+        except pymysql.MySQLError as e:
+            print(f"Error al obtener la marca de cambios: {e}")
+            return None
+        finally:
+            self.conexion_db.cerrar_conexion()
+
+    def obtener_columnas_animales(self, desde_id, limite=LOTE_ANALITICA):
+        """
+        Retorna hasta limite tuplas (id, id_establecimiento, especie, sexo, peso, fecha_ingreso)
+        de los animales con id mayor a desde_id, ordenadas por id (para analitica.py),
+        o None si hubo un error.
+        """
+        query = """
+            SELECT id, id_establecimiento, especie, sexo, peso, fecha_ingreso
+            FROM animales
+            WHERE id > %s
+            ORDER BY id
+            LIMIT %s
+        """
+        connection = self.conexion_db.conectar()
+        if not connection:
+            return None
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query, (desde_id, limite))
+                return cursor.fetchall()
+        except pymysql.MySQLError as e:
+            print(f"Error al obtener las columnas de animales: {e}")
+            return None
+        finally:
+            self.conexion_db.cerrar_conexion()
+
+    def obtener_columnas_decomisos(self, desde_id, limite=LOTE_ANALITICA):
+        """
+        Retorna hasta limite tuplas (id, id_animal, producto, motivo, fecha)
+        de los decomisos con id mayor a desde_id, ordenadas por id (para analitica.py),
+        o None si hubo un error.
+        """
+        query = """
+            SELECT id, id_animal, producto, motivo, fecha
+            FROM decomisos
+            WHERE id > %s
+            ORDER BY id
+            LIMIT %s
+        """
+        connection = self.conexion_db.conectar()
+        if not connection:
+            return None
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query, (desde_id, limite))
+                return cursor.fetchall()
+        except pymysql.MySQLError as e:
+            print(f"Error al obtener las columnas de decomisos: {e}")
+            return None
+        finally:
+            self.conexion_db.cerrar_conexion()
+
     def obtener_guias_por_establecimiento(self, establecimiento_id):
         """
         Retorna una lista de diccionarios con las guías de transporte asociadas al establecimiento.
@@ -385,7 +792,54 @@ class OperacionesDB:
         finally:
             self.conexion_db.cerrar_conexion()
 
+    def obtener_catalogos(self):
+        """
+        Retorna en una sola conexión los datos de referencia que usan los formularios,
+        como listas de tuplas (id, texto).
+        Ejemplo de resultado:
+        {"establecimientos": [(1, "AB")], "plantas": [(1, "Planta Caicedonia")],
+         "vehiculos": [(1, "XYZ123")], "conductores": [(1, "Juan Pérez")]}
+        """
+        consultas_sql = {
+            "establecimientos": "SELECT id, marca_diferencial FROM establecimiento ORDER BY id",
+            "plantas": "SELECT id, nombre FROM planta ORDER BY id",
+            "vehiculos": "SELECT id, placa FROM vehiculo ORDER BY id",
+            "conductores": "SELECT id, nombre FROM conductores ORDER BY id",
+        }
+        connection = self.conexion_db.conectar()
+        if not connection:
+            return None
+
+        try:
+            catalogos = {}
+            with connection.cursor() as cursor:
+                for nombre, consulta_sql in consultas_sql.items():
+                    cursor.execute(consulta_sql)
+                    catalogos[nombre] = [(fila[0], fila[1]) for fila in cursor.fetchall()]
+            return catalogos
+        except pymysql.MySQLError as e:
+            print(f"Error al obtener los catálogos: {e}")
+            return None
+        finally:
+            self.conexion_db.cerrar_conexion()
+
     def guardar_ingreso(self, id_user, id_planta, fecha, animales):
+        """
+        Guarda el ingreso del día con sus animales. Retorna True si la transacción
+        se confirmó; los animales que no se pudieron insertar se omiten como antes.
+        Ver guardar_ingreso_lote para conocer el detalle de las filas fallidas.
+        """
+        return self.guardar_ingreso_lote(id_user, id_planta, fecha, animales)["guardado"]
+
+    def guardar_ingreso_lote(self, id_user, id_planta, fecha, animales):
+        """
+        Inserta los animales con INSERT de múltiples filas (por lotes de TAMANO_LOTE) y
+        vincula todos los detalles del ingreso con una sola sentencia por lote.
+        Si un lote falla, se reintenta fila por fila para identificar las filas con error.
+        Ejemplo de resultado:
+        {"guardado": True, "id_ingreso": 12, "insertados": 298,
+         "fallidos": [{"fila": 17, "numero_animal": "4521", "error": "..."}]}
+        """
         insert_ingreso_sql = """
             INSERT INTO ingresos (id_user, id_planta, fecha, created_at, updated_at)
             VALUES (%s, %s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
@@ -395,17 +849,21 @@ class OperacionesDB:
         """
         insert_animal_sql = """
             INSERT INTO animales (numero_animal, peso, numero_tiquete, sexo, guia_movilizacion, fecha_guia_ica, fecha_ingreso, especie, id_establecimiento, numero_corral, estado, created_at, updated_at)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'NO_DESPACHADO', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            VALUES
         """
+        fila_animal_sql = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'NO_DESPACHADO', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
         insert_detalles_sql = """
             INSERT INTO ingresos_detalles (id_ingresos, id_animales, created_at, updated_at)
-            VALUES (%s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            VALUES
         """
+        fila_detalle_sql = "(%s, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+
+        resultado = {"guardado": False, "id_ingreso": None, "insertados": 0, "fallidos": []}
 
         connection = self.conexion_db.conectar()
         if not connection:
             print("No se pudo establecer conexión con la base de datos.")
-            return False
+            return resultado
 
         try:
             with connection.cursor() as cursor:
@@ -422,46 +880,106 @@ class OperacionesDB:
                     id_ingreso = cursor.lastrowid
                     print(f"Nuevo ingreso creado con ID: {id_ingreso}")
 
-                # Insertar los animales y vincularlos al ingreso
-                for animal in animales:
+                filas = [(
+                    animal["numero_animal"],
+                    animal["peso"],
+                    animal["numero_tiquete"],
+                    animal["sexo"],
+                    animal["guia_movilizacion"],
+                    animal["fecha_ica"],
+                    animal["fecha_ingreso"],
+                    animal["especie"],
+                    animal["destino"],
+                    animal["numero_corral"]
+                ) for animal in animales]
+
+                # Los ids de un INSERT de múltiples filas solo son consecutivos (a partir
+                # de LAST_INSERT_ID) con innodb_autoinc_lock_mode 0 o 1; si no, se leen de vuelta
+                ids_consecutivos = self._ids_autoincremento_consecutivos(cursor)
+
+                ids_animales = []
+                guias_animales = []  # (id_animal, guia_movilizacion) para el índice de trigramas
+                insertadas = []  # filas de los animales insertados, para estadisticas_diarias
+                for inicio in range(0, len(filas), TAMANO_LOTE):
+                    lote = filas[inicio:inicio + TAMANO_LOTE]
                     try:
-                        # Insertar animal
-                        cursor.execute(insert_animal_sql, (
-                            animal["numero_animal"],
-                            animal["peso"],
-                            animal["numero_tiquete"],
-                            animal["sexo"],
-                            animal["guia_movilizacion"],
-                            animal["fecha_ica"],
-                            animal["fecha_ingreso"],
-                            animal["especie"],
-                            animal["destino"],
-                            animal["numero_corral"]
-                        ))
-                        id_animal = cursor.lastrowid
-                        print(f"Animal creado con ID: {id_animal}")
-
-                        # Vincular animal con el ingreso
-                        cursor.execute(insert_detalles_sql, (id_ingreso, id_animal))
-                        print(f"Detalle creado para el ingreso {id_ingreso} con el animal {id_animal}")
+                        primer_id = _insertar_multifila(cursor, insert_animal_sql, fila_animal_sql, lote)
                     except pymysql.MySQLError as e:
-                        print(f"Error al insertar animal: {animal['numero_animal']} - {e}")
+                        # La sentencia fallida se revierte completa; se reintenta fila por fila
+                        print(f"Error en el lote de animales desde la fila {inicio}, reintentando por fila: {e}")
+                    else:
+                        if ids_consecutivos:
+                            ids_lote = range(primer_id, primer_id + len(lote))
+                        else:
+                            ids_lote = _ids_animales_insertados(cursor, primer_id, lote)
+                        ids_animales.extend(ids_lote)
+                        guias_animales.extend((id_animal, fila[4]) for id_animal, fila in zip(ids_lote, lote))
+                        insertadas.extend(lote)
                         continue
 
-                print(animales)
+                    for desplazamiento, fila in enumerate(lote):
+                        try:
+                            id_animal = _insertar_multifila(cursor, insert_animal_sql, fila_animal_sql, [fila])
+                            ids_animales.append(id_animal)
+                            guias_animales.append((id_animal, fila[4]))
+                            insertadas.append(fila)
+                        except pymysql.MySQLError as e:
+                            indice = inicio + desplazamiento
+                            print(f"Error al insertar animal: {animales[indice]['numero_animal']} - {e}")
+                            resultado["fallidos"].append({
+                                "fila": indice,
+                                "numero_animal": animales[indice]["numero_animal"],
+                                "error": str(e)
+                            })
+
+                # Vincular todos los animales con el ingreso
+                detalles = [(id_ingreso, id_animal) for id_animal in ids_animales]
+                for inicio in range(0, len(detalles), TAMANO_LOTE):
+                    _insertar_multifila(cursor, insert_detalles_sql, fila_detalle_sql,
+                                        detalles[inicio:inicio + TAMANO_LOTE])
+
+                # Mantener el índice de trigramas usado por buscar_animal
+                _insertar_trigramas(cursor, guias_animales)
+
+                # Sumar los animales del ingreso a estadisticas_diarias
+                totales = {}
+                for fila in insertadas:
+                    total = totales.setdefault((fila[6] or FECHA_SIN_INGRESO, fila[8], fila[7], fila[3]),
+                                               [0, 0.0, 0, 0])
+                    total[0] += 1
+                    if fila[1] not in (None, ""):
+                        total[1] += float(fila[1])
+                        total[2] += 1
+                _sumar_estadisticas(cursor, totales)
 
             connection.commit()
-            print("Ingreso y detalles guardados correctamente.")
-            return True
+            print(f"Ingreso {id_ingreso} guardado: {len(ids_animales)} animales, {len(resultado['fallidos'])} con error.")
+            resultado.update(guardado=True, id_ingreso=id_ingreso, insertados=len(ids_animales))
+            return resultado
 
         except pymysql.MySQLError as e:
             connection.rollback()
             print(f"Error al guardar los datos: {e}")
-            return False
+            return resultado
 
         finally:
             self.conexion_db.cerrar_conexion()
 
+    def _ids_autoincremento_consecutivos(self, cursor):
+        """Indica si el servidor asigna ids consecutivos en un INSERT de múltiples filas."""
+        backend = type(self.conexion_db)
+        if backend not in OperacionesDB._autoinc_consecutivo:
+            try:
+                cursor.execute("SELECT @@innodb_autoinc_lock_mode")
+                modo = cursor.fetchone()[0]
+                OperacionesDB._autoinc_consecutivo[backend] = int(modo) in (0, 1)
+                if not OperacionesDB._autoinc_consecutivo[backend]:
+                    print(f"innodb_autoinc_lock_mode={modo}: los ids de cada lote de animales se leen de vuelta")
+            except pymysql.MySQLError as e:
+                print(f"No se pudo consultar innodb_autoinc_lock_mode: {e}")
+                OperacionesDB._autoinc_consecutivo[backend] = False
+        return OperacionesDB._autoinc_consecutivo[backend]
+
 
     def guardar_datos_backend(self, datos):
         """
@@ -471,17 +989,44 @@ class OperacionesDB:
         print("Datos Recibidos: ", datos)
         
         print(f"id del destino {datos['id_destino']}")
-        
-        try:
-            connection = self.conexion_db.conectar()
 
+        sql_vehiculo_conductor = """
+        INSERT INTO vehiculo_conductor (id_vehiculo, id_conductores, created_at, updated_at)
+        VALUES (%s, %s, NOW(), NOW())
+        ON DUPLICATE KEY UPDATE updated_at = NOW()
+        """
+        sql_guia = """
+        INSERT INTO guia_transporte (fecha, id_planta, id_vehiculo_conductor)
+        VALUES (%s, %s, %s)
+        """
+        sql_detalle = """
+        INSERT INTO guia_transporte_detalle (id_guia_transporte, id_ingreso_detalle, carne_octavos, viseras_blancas, viseras_rojas, cabezas, temperatura_promedio, dictamen)
+        VALUES
+        """
+        fila_detalle_sql = "(%s, %s, %s, %s, %s, %s, %s, %s)"
+        sql_decomiso = """
+        INSERT INTO decomisos (id_animal, producto, cantidad, motivo, fecha)
+        VALUES
+        """
+        fila_decomiso_sql = "(%s, %s, %s, %s, %s)"
+
+        # Recolectar y validar los decomisos antes de abrir la transacción
+        decomisos = []
+        for detalle in datos['guia_transporte']:
+            for decomiso in detalle.get('decomisos', []):
+                # Validar que el id_animal esté en los datos
+                if 'id_animal' not in decomiso:
+                    raise Exception(f"Error al guardar los datos: El decomiso no contiene un id_animal válido: {decomiso}")
+                decomisos.append((decomiso['id_animal'], decomiso['producto'], decomiso['cantidad'],
+                                  decomiso['motivo'], decomiso['fecha']))
+
+        connection = self.conexion_db.conectar()
+        if not connection:
+            raise Exception("Error al guardar los datos: no se pudo establecer conexión con la base de datos.")
+
+        try:
             with connection.cursor(pymysql.cursors.DictCursor) as cursor:  # Usar DictCursor para obtener resultados como diccionarios
                 # Buscar o crear el registro vehiculo_conductor
-                sql_vehiculo_conductor = """
-                INSERT INTO vehiculo_conductor (id_vehiculo, id_conductores, created_at, updated_at)
-                VALUES (%s, %s, NOW(), NOW())
-                ON DUPLICATE KEY UPDATE updated_at = NOW()
-                """
                 cursor.execute(sql_vehiculo_conductor, (
                     datos['id_vehiculo'], datos['id_conductores']
                 ))
@@ -490,61 +1035,74 @@ class OperacionesDB:
                 id_vehiculo_conductor = cursor.lastrowid
 
                 # Insertar encabezado de la guía de transporte
-                sql_guia = """
-                INSERT INTO guia_transporte (fecha, id_planta, id_vehiculo_conductor)
-                VALUES (%s, %s, %s)
-                """
                 cursor.execute(sql_guia, (datos['fecha'], datos['id_planta'], id_vehiculo_conductor))
                 id_guia = cursor.lastrowid
 
-                # Insertar detalles de la guía de transporte
-                for detalle in datos['guia_transporte']:
-                    # Insertar el detalle de la guía
-                    sql_detalle = """
-                    INSERT INTO guia_transporte_detalle (id_guia_transporte, id_ingreso_detalle, carne_octavos, viseras_blancas, viseras_rojas, cabezas, temperatura_promedio, dictamen)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """
-                    cursor.execute(sql_detalle, (
-                        id_guia, detalle['id_ingreso_detalle'], detalle['carne_octavos'], detalle['viseras_blancas'],
-                        detalle['viseras_rojas'], detalle['cabezas'], detalle['temperatura_promedio'], detalle['dictamen']
-                    ))
-                    id_detalle = cursor.lastrowid
-
-                    # Procesar decomisos si están presentes
-                    if 'decomisos' in detalle:
-                        for decomiso in detalle['decomisos']:
-                            # Validar que el id_animal esté en los datos
-                            if 'id_animal' not in decomiso:
-                                raise Exception(f"El decomiso no contiene un id_animal válido: {decomiso}")
-
-                            # Usar el id_animal directamente de los datos
-                            id_animal = decomiso['id_animal']
-
-                            # Insertar el decomiso
-                            sql_decomiso = """
-                            INSERT INTO decomisos (id_animal, producto, cantidad, motivo, fecha)
-                            VALUES (%s, %s, %s, %s, %s)
-                            """
-                            cursor.execute(sql_decomiso, (id_animal, decomiso['producto'], decomiso['cantidad'], decomiso['motivo'], decomiso['fecha']))
-
-
-            # Confirmar cambios y cerrar conexión
+                # Insertar todos los detalles de la guía con INSERT de múltiples filas
+                detalles = [(
+                    id_guia, detalle['id_ingreso_detalle'], detalle['carne_octavos'], detalle['viseras_blancas'],
+                    detalle['viseras_rojas'], detalle['cabezas'], detalle['temperatura_promedio'], detalle['dictamen']
+                ) for detalle in datos['guia_transporte']]
+                for inicio in range(0, len(detalles), TAMANO_LOTE):
+                    _insertar_multifila(cursor, sql_detalle, fila_detalle_sql, detalles[inicio:inicio + TAMANO_LOTE])
+
+                # Insertar todos los decomisos de la guía
+                for inicio in range(0, len(decomisos), TAMANO_LOTE):
+                    _insertar_multifila(cursor, sql_decomiso, fila_decomiso_sql, decomisos[inicio:inicio + TAMANO_LOTE])
+
+                # Sumar los decomisos a estadisticas_diarias y decomisos_diarios en el día de ingreso de cada animal
+                decomisos_por_animal = {}
+                for decomiso in decomisos:
+                    decomisos_por_animal[decomiso[0]] = decomisos_por_animal.get(decomiso[0], 0) + 1
+                ids_animales = list(decomisos_por_animal)
+                totales = {}
+                ingresos = {}  # id_animal -> (fecha_ingreso, id_establecimiento)
+                for inicio in range(0, len(ids_animales), TAMANO_LOTE):
+                    lote = ids_animales[inicio:inicio + TAMANO_LOTE]
+                    cursor.execute(f"""
+                        SELECT id, fecha_ingreso, id_establecimiento, especie, sexo FROM animales
+                        WHERE id IN ({', '.join(['%s'] * len(lote))})
+                    """, lote)
+                    for animal in cursor.fetchall():
+                        fecha_ingreso = animal['fecha_ingreso'] or FECHA_SIN_INGRESO
+                        ingresos[animal['id']] = (fecha_ingreso, animal['id_establecimiento'])
+                        clave = (fecha_ingreso, animal['id_establecimiento'], animal['especie'], animal['sexo'])
+                        totales.setdefault(clave, [0, 0.0, 0, 0])[3] += decomisos_por_animal[animal['id']]
+                _sumar_estadisticas(cursor, totales)
+                por_producto = {}
+                for id_animal, producto, _, motivo, _ in decomisos:
+                    if id_animal in ingresos:
+                        clave = ingresos[id_animal] + (producto or "", motivo or "")
+                        por_producto[clave] = por_producto.get(clave, 0) + 1
+                _sumar_decomisos(cursor, por_producto)
+
+            # Confirmar cambios
             connection.commit()
+
+        except Exception as e:
+            if connection:
+                connection.rollback()
+            raise Exception(f"Error al guardar los datos: {str(e)}")
+        finally:
+            # Devolver la conexión al pool también cuando hay errores
             self.conexion_db.cerrar_conexion()
 
-            # Mostrar mensaje de éxito
-            print("Éxito", "La guía de transporte y los decomisos se guardaron correctamente.")
+        # Mostrar mensaje de éxito
+        print("Éxito", "La guía de transporte y los decomisos se guardaron correctamente.")
 
-            self.generar_pdf(id_guia_transporte=id_guia, id_destino=datos['id_destino'])
+        # El PDF se genera aparte (ver pdf_guias.ColaPDF) para no demorar el guardado
+        return id_guia
+
+    def obtener_datos_pdf(self, id_guia_transporte, id_destino):
+        """
+        Consulta lo que lleva el PDF de la guía: encabezado, detalles, decomisos y destino.
+        Retorna un diccionario que pdf_guias.renderizar_guia puede maquetar en otro proceso.
+        """
+        connection = self.conexion_db.conectar()
+        if not connection:
+            raise Exception("Error al consultar los datos del PDF: no se pudo establecer conexión con la base de datos.")
 
-        except Exception as e:
-            raise Exception(f"Error al guardar los datos: {str(e)}")
-        
-        
-    def generar_pdf(self, id_guia_transporte,id_destino):
         try:
-            # Conexión a la base de datos para obtener la información relacionada con la guía de transporte
-            connection = self.conexion_db.conectar()
             with connection.cursor(pymysql.cursors.DictCursor) as cursor:
                 # Obtener los datos principales de la guía de transporte
                 sql_guia = """
@@ -583,7 +1141,7 @@ class OperacionesDB:
                 JOIN guia_transporte g ON gd.id_guia_transporte = g.id
                 WHERE gd.id_guia_transporte = %s AND g.fecha = %s
                 """
-                cursor.execute(sql_decomiso, (id_guia_transporte, guia.get('fecha')))
+                cursor.execute(sql_decomiso, (id_guia_transporte, guia['fecha'] if guia else None))
                 decomisos = cursor.fetchall()
                 
                 sql_destino = """
@@ -594,345 +1152,143 @@ class OperacionesDB:
                 JOIN departamento d ON m.id_departamento = d.id
                 WHERE es.id = %s
                 """
-                cursor.execute(sql_destino, (id_destino))
+                cursor.execute(sql_destino, (id_destino,))
                 destino = cursor.fetchone()
-                
-            
-            print(f"informacion del destino{destino}")
-            
-            # Cerrar la conexión a la base de datos
+        except pymysql.MySQLError as e:
+            raise Exception(f"Error al consultar los datos del PDF: {str(e)}")
+        finally:
+            # Devolver la conexión al pool antes de maquetar el PDF
             self.conexion_db.cerrar_conexion()
 
-            # Crear el PDF con tamaño oficio
-            pdf_filename = f"guia_transporte_{id_guia_transporte}.pdf"
-            c = canvas.Canvas(pdf_filename, pagesize=legal)  # Cambiar a tamaño oficio
-            c.setFont("Helvetica", 10)
-
-            fecha = guia.get('fecha', 'N/A')
-            fecha_obj = str(fecha.year)[-2:]
-            print(f"año de dos digitos {fecha_obj}")
-
-            # Posición inicial de los títulos
-            y_position = 950  # Ajustar la posición inicial para el tamaño oficio
-
-            codigo_invima = "N/A"
-            if detalles:
-                especies = set(detalle.get('especie', '').lower() for detalle in detalles)
-                if len(especies) == 1:
-                    especie = especies.pop()
-                    if especie in ['bovino', 'bovinos','Bovino', 'Bovinos']:
-                        codigo_invima = "567 B"
-                    elif especie in ['porcino', 'porcinos','Porcino', 'Porcinos']:
-                        codigo_invima = "150 P"
-
-            # Definir los textos y sus colores
-            texto1 = str(id_guia_transporte)  # Convertir a string
-            color1 = colors.green  # Color para id_guia_transporte
-            texto2 = codigo_invima  # Código INVIMA
-            texto3 = fecha_obj  # Fecha (ajusta esto según tu variable real)
-            color2 = colors.red  # Color para codigo_invima
-            color3 = colors.red  # Color para fecha_obj (puedes cambiarlo)
-
-            # Definir el margen más estrecho
-            margen_izquierdo = 15  # Margen izquierdo
-            separacion = 5  # Espacio entre los textos
-
-            # Cambiar el tamaño de la fuente para los textos
-            tamanio_fuente = 16  # Tamaño de fuente más grande
-            c.setFont("Helvetica-Bold", tamanio_fuente)
-
-            # Calcular el ancho de los textos
-            ancho_texto1 = c.stringWidth(texto1, "Helvetica-Bold", tamanio_fuente)
-            ancho_texto2 = c.stringWidth(texto2, "Helvetica-Bold", tamanio_fuente)
-            ancho_texto3 = c.stringWidth(texto3, "Helvetica-Bold", tamanio_fuente)
-            ancho_guion = c.stringWidth("-", "Helvetica-Bold", tamanio_fuente)
-
-            # Dibujar texto1 (id_guia_transporte) en verde
-            c.setFillColor(color1)
-            c.drawString(margen_izquierdo, y_position, texto1)
-
-            # Dibujar el primer guion
-            c.setFillColor(colors.black)  # Color del guion
-            c.drawString(margen_izquierdo + ancho_texto1 + separacion, y_position, "-")
-
-            # Dibujar texto2 (codigo_invima) en rojo
-            c.setFillColor(color2)
-            c.drawString(margen_izquierdo + ancho_texto1 + separacion + ancho_guion + separacion, y_position, texto2)
-
-            # Dibujar el segundo guion
-            c.setFillColor(colors.black)  # Color del guion
-            c.drawString(margen_izquierdo + ancho_texto1 + separacion + ancho_guion + separacion + ancho_texto2 + separacion, y_position, "-")
-
-            # Dibujar texto3 (fecha_obj) en azul
-            c.setFillColor(color3)
-            c.drawString(margen_izquierdo + ancho_texto1 + separacion + ancho_guion + separacion + ancho_texto2 + separacion + ancho_guion + separacion, y_position, texto3)
-
-            # --- Agregar recuadro con texto en la parte derecha ---
-            # Texto que irá dentro del recuadro
-            texto_recuadro = str(destino.get("marca_diferencial", "N/A"))  # Texto como cadena
-            tamanio_fuente_recuadro = 12
-            color_texto_recuadro = colors.black
-            color_fondo_recuadro = colors.yellow
-
-            # Ancho fijo del recuadro
-            ancho_recuadro = 50  # Ancho fijo en puntos
-            alto_recuadro = 50  # Altura del recuadro
-
-            # Definir el margen derecho
-            margen_derecho = 30  # Margen derecho
-            ancho_pagina = legal[0]  # Ancho de la página (612 puntos para tamaño oficio)
-
-            # Calcular la posición del recuadro
-            x_recuadro = ancho_pagina - margen_derecho - ancho_recuadro  # Alinear a la derecha
-            y_recuadro = 980  # Posición vertical del recuadro (ajustada para tamaño oficio)
-
-            # Dibujar el recuadro amarillo con borde negro
-            c.setFillColor(color_fondo_recuadro)
-            c.setStrokeColor(colors.black)  # Color del borde
-            c.setLineWidth(1)  # Grosor del borde (1px)
-            c.rect(x_recuadro, y_recuadro - alto_recuadro, ancho_recuadro, alto_recuadro, fill=1, stroke=1)
-
-            # Dibujar el texto dentro del recuadro
-            c.setFillColor(color_texto_recuadro)
-            c.setFont("Helvetica-Bold", tamanio_fuente_recuadro)
-
-            # Centrar el texto horizontalmente dentro del recuadro
-            ancho_linea = c.stringWidth(texto_recuadro, "Helvetica-Bold", tamanio_fuente_recuadro)
-            x_texto = x_recuadro + (ancho_recuadro - ancho_linea) / 2  # Centrar horizontalmente
-
-            # Centrar el texto verticalmente dentro del recuadro
-            y_texto = y_recuadro - alto_recuadro + (alto_recuadro / 2) - (tamanio_fuente_recuadro / 2)  # Centrar verticalmente
-
-            # Dibujar el texto centrado
-            c.drawString(x_texto, y_texto, texto_recuadro)
-
-            # Ajustar la posición vertical para el siguiente contenido
-            y_position -= 15  # Espacio después del recuadro
-
-            # TITULOS Y DATOS
-            c.setFillColor(colors.red)
-            c.setFont("Helvetica-Bold", 10)
-            c.drawString(30, y_position, f"1. IDENTIFICACION DE LA PLANTA DE BENEFICIO DE PROCEDENCIA")
-            y_position -= 15
-            c.setFont("Helvetica-Oblique", 10)
-            c.drawString(30, y_position, f"emp.varias@caicedonia-valle.gov.co")
-            y_position -= 15
-
-            # Informacion General De La Planta
-            info = [
-                ["Planta", guia.get('nombre_planta','N/A')],
-                ["Departamento", destino.get('nombre_departamento', 'N/A')],
-                ["Municipio o Ciudad", destino.get('nombre_municipios', 'N/A')],
-                ["Codigo INVIMA", codigo_invima],
-                ["Direccion", guia.get('direccion', 'N/A')],
-                ["Sacrificio y Despacho", guia.get('fecha', 'N/A')],
-            ]
-
-            table_info = Table(info)
-            table_info.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ]))
-
-            # Calcula el tamaño de la tabla y dibújala en la posición correcta
-            table_width, table_height = table_info.wrapOn(c, 500, y_position)
-            table_info.drawOn(c, 30, y_position - table_height)
-
-            # Actualiza la posición para la tabla de decomisos
-            y_position -= (table_height + 20)
-
-            # Informacion Del Destino
-            info_destino = [
-                ["Nombre Dueño", destino.get('nombre_dueno', 'N/A')],
-                ["Nombre Establecimiento", destino.get('nombre_establecimiento', 'N/A')],
-                ["Direccion", destino.get('direccion', 'N/A')],
-            ]
-
-            c.setFillColor(colors.red)
-            c.setFont("Helvetica-Bold", 10)
-            c.drawString(30, y_position, f"2.DESTINO")
-            y_position -= 15
-
-            table_destino = Table(info_destino)
-            table_destino.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ]))
-
-            # Calcula el tamaño de la tabla y dibújala en la posición correcta
-            table_width, table_height = table_destino.wrapOn(c, 500, y_position)
-            table_destino.drawOn(c, 30, y_position - table_height)
-
-            # Actualiza la posición para la tabla de Destino
-            y_position -= (table_height + 20)
-
-            # Detalles de la guía
-            data_detalles = [["ID Animal", "Especie", "Carne en Octavos", "Viseras Blancas", "Viseras Rojas", "Cabezas", "Temperatura Promedio", "Dictamen"]]
-            for detalle in detalles:
-                row = [
-                    detalle.get('numero_animal', 'N/A'),
-                    detalle.get('especie', 'N/A'),
-                    detalle.get('carne_octavos', 'N/A'),
-                    detalle.get('viseras_blancas', 'N/A'),
-                    detalle.get('viseras_rojas', 'N/A'),
-                    detalle.get('cabezas', 'N/A'),
-                    detalle.get('temperatura_promedio', 'N/A'),
-                    detalle.get('dictamen', 'N/A')
-                ]
-                data_detalles.append(row)
-
-            c.setFillColor(colors.red)
-            c.setFont("Helvetica-Bold", 10)
-            c.drawString(30, y_position, f"3. DESCRIPCION DEL PRODUCTO")
-            y_position -= 15
-
-            table_detalles = Table(data_detalles)
-            table_detalles.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-
-            # Calcula el tamaño de la tabla y dibújala en la posición correcta
-            table_width, table_height = table_detalles.wrapOn(c, 500, y_position)
-            table_detalles.drawOn(c, 30, y_position - table_height)
-
-            # Actualiza la posición para la tabla de decomisos
-            y_position -= (table_height + 20)
-            
-            c.setFillColor(colors.red)
-            c.setFont("Helvetica-Bold", 10)
-            c.drawString(30, y_position, f"4. VEHICULO TRANSPORTADOR")
-            y_position -= 15
-            
-            transporte = [
-                ["Tipo Vehiculo ", guia.get('tipo_vehiculo','N/A')],
-                ["Placa", guia.get('placa', 'N/A')],
-                ["Nombre del Coductor", guia.get('nombre_conductor', 'N/A')],
-                ["N° Cedula", guia.get('numero_cedula', 'N/A')],
-                ["Tipo Refrigeracion", guia.get('tipo_refrigeracion', 'N/A')],
-
-            ]
-            
-            table_transporte = Table(transporte)
-            table_transporte.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-            ]))
-
-            # Calcula el tamaño de la tabla y dibújala en la posición correcta
-            table_width, table_height = table_transporte.wrapOn(c, 500, y_position)
-            table_transporte.drawOn(c, 30, y_position - table_height)
-            
-            # Actualiza la posición para la tabla de decomisos
-            y_position -= (table_height + 20)
-            
-            c.setFillColor(colors.red)
-            c.setFont("Helvetica-Bold", 10)
-            c.drawString(30, y_position, f"5. DECOMISOS")
-            y_position -= 15
-            
-            margen_inferior = 50
-            
-            # Datos de decomisos
-            headers = ["Producto", "ID Animal", "Cantidad", "Motivo"]  # Encabezados
-            data_decomisos = [headers]  # Incluir los encabezados en la lista de datos
-            for decomiso in decomisos:
-                row = [
-                    decomiso.get('producto', 'N/A'),
-                    decomiso.get('numero_animal', 'N/A'),
-                    decomiso.get('cantidad', 'N/A'),
-                    decomiso.get('motivo', 'N/A'),
-                ]
-                data_decomisos.append(row)
-
-            # Calcular el alto de una fila de la tabla de decomisos
-            alto_fila = 12  # Ajusta este valor según el tamaño de la fuente y el padding de la tabla
-            # Definir el ancho fijo de las columnas
-            ancho_columnas = [50, 50, 50, 50]  # Ancho fijo de 100 puntos para cada columna
+        if not guia or not destino:
+            raise Exception(f"Error al consultar los datos del PDF: no existe la guía {id_guia_transporte} o su destino.")
+        return {"guia": guia, "detalles": list(detalles), "decomisos": list(decomisos), "destino": destino}
 
-            # Dibujar la tabla de decomisos fila por fila
-            for i, fila in enumerate(data_decomisos):
-                # Crear una tabla con una sola fila y ancho fijo
-                tabla_fila = Table([fila], colWidths=ancho_columnas)
-                tabla_fila.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey if i == 0 else colors.white),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke if i == 0 else colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ]))
-
-                # Calcular el alto de la fila
-                _, alto_fila_actual = tabla_fila.wrapOn(c, 500, y_position)
-
-                # Verificar si la fila cabe en la página actual
-                if y_position - alto_fila_actual < margen_inferior:
-                    c.showPage()  # Crear una nueva página
-                    y_position = 950  # Reiniciar la posición vertical en la nueva página
-
-                # Dibujar la fila
-                tabla_fila.drawOn(c, 30, y_position - alto_fila_actual)
-                y_position -= alto_fila_actual
-
-            # Guardar el PDF
-            c.save()
-
-            # Ruta de la carpeta de destino
-            directorio_destino = "reportes_pdf/"
-
-            # Crear la carpeta si no existe
-            if not os.path.exists(directorio_destino):
-                os.makedirs(directorio_destino)
-
-            destino_final = os.path.join(directorio_destino, pdf_filename)
-            shutil.move(pdf_filename, destino_final)
-
-            print(f"PDF generado correctamente: {pdf_filename}")
+    def generar_pdf(self, id_guia_transporte, id_destino):
+        """Genera el PDF de la guía en este mismo hilo y retorna su ruta (o None si falla)."""
+        from pdf_guias import renderizar_guia
 
+        try:
+            ruta = renderizar_guia(id_guia_transporte, self.obtener_datos_pdf(id_guia_transporte, id_destino))
         except Exception as e:
             print(f"Error al generar el PDF: {str(e)}")
+            return None
+        print(f"PDF generado correctamente: {ruta}")
+        return ruta
 
-
-    def buscar_animal(self, numero):
+    def buscar_animal(self, numero, limite=LIMITE_BUSQUEDA):
         """
         Busca coincidencias en la tabla animales con base en el número proporcionado.
+        Retorna una lista de diccionarios con las primeras `limite` coincidencias;
+        ver buscar_animal_pagina para recorrer el resto por páginas.
         """
-        consulta_sql = """
-        SELECT id, numero_animal, numero_tiquete, guia_movilizacion, especie, peso, fecha_guia_ica, fecha_ingreso
-        FROM animales
-        WHERE id LIKE %s OR numero_animal LIKE %s OR numero_tiquete LIKE %s OR guia_movilizacion LIKE %s
+        return self.buscar_animal_pagina(numero, tamano=limite)["resultados"]
+
+    def buscar_animal_pagina(self, numero, despues_de=None, tamano=100, sin_buffer=False):
+        """
+        Retorna una página de coincidencias con paginación por llave (keyset).
+        Cada criterio usa un índice, de modo que el tiempo no crece con la tabla:
+          0. coincidencia exacta de id, número de animal o número de tiquete
+          1. prefijo de número de animal, número de tiquete o guía de movilización
+          2. guía de movilización que contiene el texto (índice de trigramas)
+        Los resultados se ordenan por (rango, id descendente) y cada animal aparece una
+        sola vez, en el mejor rango que le corresponda.
+
+        despues_de: llave "siguiente" de la página anterior, o None para la primera.
+        sin_buffer: lee las filas con un cursor del lado del servidor (SSDictCursor)
+                    en lugar de cargar todo el resultado en memoria.
+        Ejemplo de resultado:
+        {"resultados": [{"id": 10, "numero_animal": "123", ...}], "siguiente": (1, 10)}
+        "siguiente" es None cuando no hay más páginas.
         """
+        texto = str(numero).strip()
+        vacio = {"resultados": [], "siguiente": None}
+        if not texto:
+            return vacio
+
+        rango_desde, id_desde = despues_de if despues_de else (0, None)
+        prefijo = _escapar_like(texto) + "%"
+
+        exactos = ["a.numero_animal = %s", "a.numero_tiquete = %s"]
+        valores_exactos = [texto, texto]
+        # Con ceros a la izquierda ("003") no se busca por id, igual que rango_coincidencia,
+        # que compara el texto con str(id)
+        if es_numero(texto) and str(int(texto)) == texto:
+            exactos.insert(0, "a.id = %s")
+            valores_exactos.insert(0, int(texto))
+        prefijos = ["a.numero_animal LIKE %s", "a.numero_tiquete LIKE %s", "a.guia_movilizacion LIKE %s"]
+        valores_prefijos = [prefijo, prefijo, prefijo]
+
+        # (rango, FROM ... WHERE ..., valores); cada rango excluye lo que ya cubrió uno mejor
+        ramas = [(0, f"animales a WHERE {condicion}", [valor])
+                 for condicion, valor in zip(exactos, valores_exactos)]
+        # COALESCE evita que un número de tiquete NULL vuelva NULL toda la exclusión
+        excluir_exactos = " OR ".join(exactos)
+        ramas += [(1, f"animales a WHERE {condicion} AND NOT COALESCE({excluir_exactos}, FALSE)",
+                   [valor] + valores_exactos)
+                  for condicion, valor in zip(prefijos, valores_prefijos)]
+
+        trigramas_texto = sorted(trigramas(texto))
+        if trigramas_texto:
+            # Candidatos que contienen todos los trigramas; el LIKE descarta los falsos positivos
+            marcadores = ", ".join(["%s"] * len(trigramas_texto))
+            ramas.append((2, f"""(
+                    SELECT id_animal FROM animales_trigramas
+                    WHERE trigrama IN ({marcadores})
+                    GROUP BY id_animal
+                    HAVING COUNT(*) = %s
+                ) t
+                JOIN animales a ON a.id = t.id_animal
+                WHERE a.guia_movilizacion LIKE %s
+                AND NOT COALESCE({excluir_exactos} OR {" OR ".join(prefijos)}, FALSE)""",
+                trigramas_texto + [len(trigramas_texto), "%" + _escapar_like(texto) + "%"]
+                + valores_exactos + valores_prefijos))
+
+        columnas = "a.id, a.numero_animal, a.numero_tiquete, a.guia_movilizacion, a.especie, a.peso, a.fecha_guia_ica, a.fecha_ingreso"
+        selects = []
+        parametros = []
+        for rango, desde_donde, valores in ramas:
+            if rango < rango_desde:
+                continue  # Rango ya recorrido en páginas anteriores
+            llave = ""
+            if rango == rango_desde and id_desde is not None:
+                llave = " AND a.id < %s"
+                valores = valores + [id_desde]
+            selects.append(f"(SELECT {columnas}, {rango} AS rango FROM {desde_donde}{llave} ORDER BY a.id DESC LIMIT %s)")
+            parametros.extend(valores + [tamano])
+        if not selects:
+            return vacio
+
+        consulta_sql = " UNION ALL ".join(selects) + " ORDER BY rango, id DESC LIMIT %s"
+        parametros.append(tamano)
+
         connection = self.conexion_db.conectar()
         if not connection:
             print("No se pudo establecer conexión con la base de datos.")
-            return []
+            return vacio
 
+        clase_cursor = pymysql.cursors.SSDictCursor if sin_buffer else pymysql.cursors.DictCursor
         try:
-            with connection.cursor(pymysql.cursors.DictCursor) as cursor:
-                # Busca coincidencias parciales usando LIKE
-                parametro_busqueda = f"%{numero}%"  # Permite buscar coincidencias parciales
-                cursor.execute(consulta_sql, (parametro_busqueda, parametro_busqueda, parametro_busqueda, parametro_busqueda))
-                resultados = cursor.fetchall()
-                return resultados  # Devuelve una lista de diccionarios con las coincidencias
+            with connection.cursor(clase_cursor) as cursor:
+                cursor.execute(consulta_sql, parametros)
+                resultados = []
+                leidas = 0
+                ultima = None
+                for fila in cursor:
+                    leidas += 1
+                    llave = (fila.pop("rango"), fila["id"])
+                    # Un animal que coincide con dos prefijos llega dos veces con la misma llave
+                    if llave == ultima:
+                        continue
+                    ultima = llave
+                    resultados.append(fila)
+                return {
+                    "resultados": resultados,
+                    "siguiente": ultima if leidas == tamano else None
+                }
         except pymysql.MySQLError as e:
             print(f"Error al buscar animal: {e}")
-            return []
+            return vacio
         finally:
             self.conexion_db.cerrar_conexion()
 
@@ -0,0 +1,130 @@
+import itertools
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class _TareaDB(QRunnable):
+    """Ejecuta una llamada de OperacionesDB en un hilo del QThreadPool."""
+
+    def __init__(self, ejecutor, token, funcion, args, kwargs):
+        super().__init__()
+        self.ejecutor = ejecutor
+        self.token = token
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelada = False
+
+    def run(self):
+        # Si una solicitud más nueva la reemplazó mientras esperaba en cola, no consultar
+        if self.cancelada:
+            self.ejecutor._terminada.emit(self.token)
+            return
+        try:
+            resultado = self.funcion(*self.args, **self.kwargs)
+        except Exception as e:
+            print(traceback.format_exc())
+            self.ejecutor._fallida.emit(self.token, e)
+        else:
+            self.ejecutor._completada.emit(self.token, resultado)
+
+
+class EjecutorDB(QObject):
+    """
+    Ejecuta llamadas a OperacionesDB fuera del hilo de la interfaz y entrega los
+    resultados en el hilo principal mediante señales.
+
+    Cada solicitud pertenece a un canal (por ejemplo "animales_fecha"); una nueva
+    solicitud en el mismo canal cancela la anterior, de modo que solo se entrega
+    el resultado de la última.
+    """
+
+    # Señales internas: se emiten desde el hilo de trabajo y se reciben en el principal
+    _completada = pyqtSignal(int, object)
+    _fallida = pyqtSignal(int, object)
+    _terminada = pyqtSignal(int)
+
+    # Señal pública: (canal, ocupado) para deshabilitar botones mientras se ejecuta
+    ocupado_cambiado = pyqtSignal(str, bool)
+
+    _contador = itertools.count(1)
+
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._solicitudes = {}  # token -> (canal, tarea, al_terminar, al_fallar)
+        self._actual = {}  # canal -> token vigente
+
+        self._completada.connect(self._entregar_resultado)
+        self._fallida.connect(self._entregar_error)
+        self._terminada.connect(self._descartar)
+
+    def ejecutar(self, canal, funcion, *args, al_terminar=None, al_fallar=None, **kwargs):
+        """
+        Encola funcion(*args, **kwargs) en el pool de hilos.
+        al_terminar(resultado) y al_fallar(excepcion) se invocan en el hilo principal.
+        Retorna el token de la solicitud.
+        """
+        self.cancelar(canal)
+
+        token = next(self._contador)
+        tarea = _TareaDB(self, token, funcion, args, kwargs)
+        self._solicitudes[token] = (canal, tarea, al_terminar, al_fallar)
+        self._actual[canal] = token
+        self.ocupado_cambiado.emit(canal, True)
+        self.pool.start(tarea)
+        return token
+
+    def cancelar(self, canal):
+        """Cancela la solicitud vigente del canal; su resultado ya no se entregará."""
+        token = self._actual.pop(canal, None)
+        if token is None:
+            return
+        _, tarea, _, _ = self._solicitudes.pop(token)
+        tarea.cancelada = True
+        # Si todavía no empezó, retirarla de la cola del pool. Si ya terminó (su resultado
+        # espera en la cola de eventos) Qt ya liberó la tarea y no hay nada que retirar.
+        try:
+            self.pool.tryTake(tarea)
+        except RuntimeError:
+            pass
+        self.ocupado_cambiado.emit(canal, False)
+
+    def cancelar_todo(self):
+        for canal in list(self._actual):
+            self.cancelar(canal)
+
+    def en_curso(self, canal):
+        return canal in self._actual
+
+    def _finalizar(self, token):
+        solicitud = self._solicitudes.pop(token, None)
+        if solicitud is None:
+            # Solicitud reemplazada o cancelada: se descarta su resultado
+            return None
+        canal = solicitud[0]
+        if self._actual.get(canal) == token:
+            del self._actual[canal]
+            self.ocupado_cambiado.emit(canal, False)
+        return solicitud
+
+    @pyqtSlot(int, object)
+    def _entregar_resultado(self, token, resultado):
+        solicitud = self._finalizar(token)
+        if solicitud and solicitud[2]:
+            solicitud[2](resultado)
+
+    @pyqtSlot(int, object)
+    def _entregar_error(self, token, error):
+        solicitud = self._finalizar(token)
+        if not solicitud:
+            return
+        if solicitud[3]:
+            solicitud[3](error)
+        else:
+            print(f"Error en la consulta '{solicitud[0]}': {error}")
+
+    @pyqtSlot(int)
+    def _descartar(self, token):
+        self._finalizar(token)
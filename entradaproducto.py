@@ -5,7 +5,9 @@ from PyQt5.QtWidgets import QTableWidgetItem, QWidget, QGridLayout, QLabel, QLin
     QComboBox, \
     QPushButton, QDateEdit, QTableWidget, QHeaderView, QMessageBox
 
+from catalogos import catalogos
 from consultas import OperacionesDB
+from ejecutor_db import EjecutorDB
 
 
 
@@ -76,6 +78,9 @@ class AnimalForm(QWidget):
     def __init__(self):
         super().__init__()
         self.is_nuevo = True
+        self.db = OperacionesDB()
+        self.ejecutor = EjecutorDB(self)
+        self.ejecutor.ocupado_cambiado.connect(self.on_ocupado_cambiado)
         
         # Configuración de la ventana
         self.setWindowTitle('Agregar Animal')
@@ -177,9 +182,9 @@ class AnimalForm(QWidget):
         grid_layout.addWidget(submit_button, 5, 0, 2, 2)  # El botón ocupa 2 columnas
 
         # Botón de Enviar
-        saved_button = QPushButton('Guardar', self)
-        saved_button.clicked.connect(self.guardar_en_db)
-        grid_layout.addWidget(saved_button, 12, 0, 1, 2)  # El botón ocupa 2 columnas
+        self.saved_button = QPushButton('Guardar', self)
+        self.saved_button.clicked.connect(self.guardar_en_db)
+        grid_layout.addWidget(self.saved_button, 12, 0, 1, 2)  # El botón ocupa 2 columnas
 
         # Tabla para mostrar los animales ingresados
         self.table = QTableWidget(self)
@@ -297,9 +302,11 @@ class AnimalForm(QWidget):
     def animales_por_fecha(self):
         fecha = self.fecha_input.date().toString("yyyy-MM-dd")
 
-        db = OperacionesDB()
-        animales = db.obtener_ingreso_por_fecha(fecha)
-        
+        # Si el operador cambia la fecha otra vez, la consulta anterior se cancela
+        self.ejecutor.ejecutar("ingreso_fecha", self.db.obtener_ingreso_por_fecha, fecha,
+                               al_terminar=self.mostrar_animales_por_fecha)
+
+    def mostrar_animales_por_fecha(self, animales):
         self.limpia()
 
         if not animales or not animales.get('detalles'):
@@ -336,16 +343,27 @@ class AnimalForm(QWidget):
 
 
     def cargar_destinos(self):
+        self.ejecutor.ejecutar("destinos", catalogos.lista, "establecimientos",
+                               al_terminar=self.mostrar_destinos)
 
-        db = OperacionesDB()
-        destinos = db.obtener_establecimientos()
+    def recargar_catalogos(self):
+        self.cargar_destinos()
 
+    def mostrar_destinos(self, destinos):
+        # Al recargar los catálogos se conserva el destino elegido si sigue existiendo
+        seleccion = self.destino_input.currentData()
+        self.destino_input.clear()
         if destinos:
             self.destino_input.addItem("Seleccione un destino", -1)
             for id, nombre_establecimiento in destinos:
                 self.destino_input.addItem(nombre_establecimiento, id)
         else:
             self.destino_input.addItem("No hay destinos disponibles", -1)
+        self.destino_input.setCurrentIndex(max(self.destino_input.findData(seleccion), 0))
+
+    def on_ocupado_cambiado(self, canal, ocupado):
+        if canal == "guardar":
+            self.saved_button.setEnabled(not ocupado)
 
     def limpia(self):
         self.table.setRowCount(0)
@@ -402,8 +420,28 @@ class AnimalForm(QWidget):
         id_planta = 1
         fecha = self.fecha_input.date().toString("yyyy-MM-dd")
 
-        db = OperacionesDB()
-        if db.guardar_ingreso(id_user, id_planta, fecha, animales):
+        if self.ejecutor.en_curso("guardar"):
+            return  # Evita guardar dos veces por un doble clic
+
+        self.ejecutor.ejecutar("guardar", self.db.guardar_ingreso_lote, id_user, id_planta, fecha, animales,
+                               al_terminar=self.on_ingreso_guardado,
+                               al_fallar=lambda e: self.on_ingreso_guardado({"guardado": False}))
+
+    def on_ingreso_guardado(self, resultado):
+        if resultado["guardado"] and resultado["fallidos"]:
+            numeros = ", ".join(str(f["numero_animal"]) for f in resultado["fallidos"])
+            msg = QMessageBox()
+            msg.setIcon(QMessageBox.Icon.Warning)
+            msg.setWindowTitle("Advertencia")
+            msg.setText(f"""
+            Se Guardaron {resultado['insertados']} Animales,
+            No Se Pudieron Guardar Los Animales: {numeros}
+            """)
+            msg.exec_()
+
+            self.limpia()
+
+        elif resultado["guardado"]:
             msg = QMessageBox()
             msg.setIcon(QMessageBox.Icon.Information)
             msg.setWindowTitle("Exito")
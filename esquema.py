@@ -0,0 +1,577 @@
+"""
+Esquema versionado de la base de datos proyectoevc.
+
+    python esquema.py migrar      # crea las tablas e índices que falten
+    python esquema.py verificar   # EXPLAIN de las consultas de OperacionesDB
+    python esquema.py reconstruir [AAAA-MM-DD]   # recalcula estadisticas_diarias y decomisos_diarios
+
+La verificación debe correrse sobre una base con datos representativos: con
+tablas vacías el optimizador de MySQL prefiere recorrerlas completas aunque
+exista el índice.
+"""
+import sys
+
+import pymysql
+
+from conexion import ConexionDB
+
+
+TABLAS = [
+    """
+    CREATE TABLE IF NOT EXISTS departamento (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        nombre_departamento VARCHAR(100) NOT NULL
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS municipio (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        nombre_municipios VARCHAR(100) NOT NULL,
+        id_departamento INT NOT NULL,
+        FOREIGN KEY (id_departamento) REFERENCES departamento(id)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS establecimiento (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        nombre_dueno VARCHAR(150),
+        nombre_establecimiento VARCHAR(150) NOT NULL,
+        direccion VARCHAR(200),
+        marca_diferencial VARCHAR(50) NOT NULL,
+        id_municipio INT,
+        FOREIGN KEY (id_municipio) REFERENCES municipio(id)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS planta (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        nombre VARCHAR(150) NOT NULL,
+        telefono VARCHAR(30),
+        direccion VARCHAR(200)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS vehiculo (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        placa VARCHAR(20) NOT NULL,
+        tipo_vehiculo VARCHAR(50),
+        tipo_refrigeracion VARCHAR(50)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS conductores (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        nombre VARCHAR(150) NOT NULL,
+        numero_cedula VARCHAR(30),
+        telefono VARCHAR(30)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS vehiculo_conductor (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        id_vehiculo INT NOT NULL,
+        id_conductores INT NOT NULL,
+        created_at TIMESTAMP NULL,
+        updated_at TIMESTAMP NULL,
+        UNIQUE KEY uq_vehiculo_conductor (id_vehiculo, id_conductores),
+        FOREIGN KEY (id_vehiculo) REFERENCES vehiculo(id),
+        FOREIGN KEY (id_conductores) REFERENCES conductores(id)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS animales (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        numero_animal VARCHAR(20) NOT NULL,
+        peso DECIMAL(10, 2),
+        numero_tiquete VARCHAR(20),
+        sexo VARCHAR(10),
+        guia_movilizacion VARCHAR(50),
+        fecha_guia_ica DATE,
+        fecha_ingreso DATE,
+        especie VARCHAR(20),
+        id_establecimiento INT NOT NULL,
+        numero_corral VARCHAR(10),
+        estado VARCHAR(20) NOT NULL DEFAULT 'NO_DESPACHADO',
+        created_at TIMESTAMP NULL,
+        updated_at TIMESTAMP NULL,
+        FOREIGN KEY (id_establecimiento) REFERENCES establecimiento(id)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ingresos (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        id_user INT NOT NULL,
+        id_planta INT NOT NULL,
+        fecha DATE NOT NULL,
+        created_at TIMESTAMP NULL,
+        updated_at TIMESTAMP NULL,
+        FOREIGN KEY (id_planta) REFERENCES planta(id)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ingresos_detalles (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        id_ingresos INT NOT NULL,
+        id_animales INT NOT NULL,
+        created_at TIMESTAMP NULL,
+        updated_at TIMESTAMP NULL,
+        FOREIGN KEY (id_ingresos) REFERENCES ingresos(id),
+        FOREIGN KEY (id_animales) REFERENCES animales(id)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS guia_transporte (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        fecha DATE NOT NULL,
+        id_planta INT NOT NULL,
+        id_vehiculo_conductor INT NOT NULL,
+        FOREIGN KEY (id_planta) REFERENCES planta(id),
+        FOREIGN KEY (id_vehiculo_conductor) REFERENCES vehiculo_conductor(id)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS guia_transporte_detalle (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        id_guia_transporte INT NOT NULL,
+        id_ingreso_detalle INT NOT NULL,
+        carne_octavos INT,
+        viseras_blancas INT,
+        viseras_rojas INT,
+        cabezas INT,
+        temperatura_promedio VARCHAR(10),
+        dictamen VARCHAR(5),
+        FOREIGN KEY (id_guia_transporte) REFERENCES guia_transporte(id),
+        FOREIGN KEY (id_ingreso_detalle) REFERENCES ingresos_detalles(id)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS decomisos (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        id_animal INT NOT NULL,
+        producto VARCHAR(100),
+        cantidad INT,
+        motivo VARCHAR(200),
+        fecha DATE,
+        FOREIGN KEY (id_animal) REFERENCES animales(id)
+    ) ENGINE=InnoDB
+    """,
+]
+
+# (tabla, nombre del índice, columnas) para los predicados usados en consultas.py
+INDICES = [
+    ("animales", "idx_animales_numero_animal", "numero_animal"),
+    ("animales", "idx_animales_numero_tiquete", "numero_tiquete"),
+    ("animales", "idx_animales_guia_movilizacion", "guia_movilizacion"),
+    ("animales", "idx_animales_especie", "especie"),
+    # Cubre el conteo, la distribución por sexo, el peso promedio y la evolución por establecimiento
+    ("animales", "idx_animales_est_especie", "id_establecimiento, especie, sexo, peso, fecha_ingreso"),
+    ("animales", "idx_animales_estado_est", "estado, id_establecimiento"),
+    ("establecimiento", "idx_establecimiento_marca", "marca_diferencial"),
+    ("ingresos", "idx_ingresos_fecha_user", "fecha, id_user"),
+    ("ingresos_detalles", "idx_ingresos_detalles_ingreso", "id_ingresos, id_animales"),
+    ("ingresos_detalles", "idx_ingresos_detalles_animal", "id_animales, id_ingresos"),
+    ("guia_transporte_detalle", "idx_gtd_guia", "id_guia_transporte, id_ingreso_detalle"),
+    ("guia_transporte_detalle", "idx_gtd_ingreso_detalle", "id_ingreso_detalle, id_guia_transporte"),
+    ("guia_transporte", "idx_guia_transporte_fecha", "fecha"),
+    ("decomisos", "idx_decomisos_animal_fecha", "id_animal, fecha"),
+]
+
+
+def _crear_tablas(cursor):
+    for sentencia in TABLAS:
+        cursor.execute(sentencia)
+
+
+def _crear_indice(cursor, tabla, nombre, columnas):
+    """Crea el índice solo si no existe (MySQL no soporta CREATE INDEX IF NOT EXISTS)."""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (tabla, nombre))
+    if cursor.fetchone():
+        return
+    cursor.execute(f"CREATE INDEX {nombre} ON {tabla} ({columnas})")
+
+
+def _crear_indices(cursor):
+    for tabla, nombre, columnas in INDICES:
+        _crear_indice(cursor, tabla, nombre, columnas)
+
+
+TABLA_TRIGRAMAS = """
+    CREATE TABLE IF NOT EXISTS animales_trigramas (
+        trigrama CHAR(3) NOT NULL,
+        id_animal INT NOT NULL,
+        PRIMARY KEY (trigrama, id_animal),
+        KEY idx_trigramas_animal (id_animal),
+        FOREIGN KEY (id_animal) REFERENCES animales(id) ON DELETE CASCADE
+    ) ENGINE=InnoDB
+"""
+
+
+def _crear_trigramas(cursor):
+    """Crea el índice de trigramas de guia_movilizacion y lo llena con los animales existentes."""
+    from consultas import _insertar_trigramas
+
+    cursor.execute(TABLA_TRIGRAMAS)
+    ultimo_id = 0
+    while True:
+        cursor.execute("""
+            SELECT id, guia_movilizacion FROM animales
+            WHERE id > %s ORDER BY id LIMIT 5000
+        """, (ultimo_id,))
+        filas = cursor.fetchall()
+        if not filas:
+            break
+        _insertar_trigramas(cursor, filas)
+        ultimo_id = filas[-1][0]
+
+
+# Totales por día de ingreso, establecimiento, especie y sexo. guardar_ingreso y
+# guardar_datos_backend la mantienen al día y las consultas de estadísticas la leen
+# en lugar de recorrer animales y decomisos. Especie y sexo nulos se guardan como '' y
+# los animales sin fecha de ingreso con la fecha consultas.FECHA_SIN_INGRESO.
+TABLA_ESTADISTICAS_DIARIAS = """
+    CREATE TABLE IF NOT EXISTS estadisticas_diarias (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        fecha DATE NOT NULL,
+        id_establecimiento INT NOT NULL,
+        especie VARCHAR(20) NOT NULL DEFAULT '',
+        sexo VARCHAR(10) NOT NULL DEFAULT '',
+        cantidad INT NOT NULL DEFAULT 0,
+        peso_total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        con_peso INT NOT NULL DEFAULT 0,
+        decomisos INT NOT NULL DEFAULT 0,
+        UNIQUE KEY uq_estadisticas_diarias (id_establecimiento, fecha, especie, sexo),
+        FOREIGN KEY (id_establecimiento) REFERENCES establecimiento(id)
+    ) ENGINE=InnoDB
+"""
+
+
+# Decomisos por día de ingreso del animal, establecimiento, producto y motivo. Con la
+# cantidad de animales de estadisticas_diarias del mismo día da las tasas de decomiso.
+# Producto y motivo nulos se guardan como ''.
+TABLA_DECOMISOS_DIARIOS = """
+    CREATE TABLE IF NOT EXISTS decomisos_diarios (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        fecha DATE NOT NULL,
+        id_establecimiento INT NOT NULL,
+        producto VARCHAR(100) NOT NULL DEFAULT '',
+        motivo VARCHAR(200) NOT NULL DEFAULT '',
+        cantidad INT NOT NULL DEFAULT 0,
+        UNIQUE KEY uq_decomisos_diarios (id_establecimiento, fecha, producto, motivo),
+        FOREIGN KEY (id_establecimiento) REFERENCES establecimiento(id)
+    ) ENGINE=InnoDB
+"""
+
+
+def reconstruir_estadisticas(cursor, desde=None):
+    """
+    Recalcula estadisticas_diarias y decomisos_diarios a partir de animales y decomisos,
+    completas o desde la fecha de ingreso indicada. Los animales sin fecha de ingreso
+    se agrupan en consultas.FECHA_SIN_INGRESO; con desde, ese grupo no se toca.
+    Retorna la cantidad de filas generadas.
+    """
+    return _reconstruir_estadisticas_diarias(cursor, desde) + _reconstruir_decomisos_diarios(cursor, desde)
+
+
+def _reconstruir_estadisticas_diarias(cursor, desde=None):
+    from consultas import FECHA_SIN_INGRESO
+
+    filtro = ""
+    params = (FECHA_SIN_INGRESO,)
+    if desde is not None:
+        cursor.execute("DELETE FROM estadisticas_diarias WHERE fecha >= %s", (desde,))
+        filtro = "WHERE a.fecha_ingreso >= %s"
+        params = (FECHA_SIN_INGRESO, desde)
+    else:
+        cursor.execute("DELETE FROM estadisticas_diarias")
+    cursor.execute(f"""
+        INSERT INTO estadisticas_diarias
+            (fecha, id_establecimiento, especie, sexo, cantidad, peso_total, con_peso, decomisos)
+        SELECT COALESCE(a.fecha_ingreso, %s), a.id_establecimiento, COALESCE(a.especie, ''), COALESCE(a.sexo, ''),
+            COUNT(a.id), COALESCE(SUM(a.peso), 0), COUNT(a.peso), COALESCE(SUM(d.cantidad), 0)
+        FROM animales a
+        LEFT JOIN (
+            SELECT id_animal, COUNT(id) AS cantidad FROM decomisos GROUP BY id_animal
+        ) d ON d.id_animal = a.id
+        {filtro}
+        GROUP BY a.fecha_ingreso, a.id_establecimiento, COALESCE(a.especie, ''), COALESCE(a.sexo, '')
+    """, params)
+    return cursor.rowcount
+
+
+def _reconstruir_decomisos_diarios(cursor, desde=None):
+    from consultas import FECHA_SIN_INGRESO
+
+    filtro = ""
+    params = (FECHA_SIN_INGRESO,)
+    if desde is not None:
+        cursor.execute("DELETE FROM decomisos_diarios WHERE fecha >= %s", (desde,))
+        filtro = "WHERE a.fecha_ingreso >= %s"
+        params = (FECHA_SIN_INGRESO, desde)
+    else:
+        cursor.execute("DELETE FROM decomisos_diarios")
+    cursor.execute(f"""
+        INSERT INTO decomisos_diarios (fecha, id_establecimiento, producto, motivo, cantidad)
+        SELECT COALESCE(a.fecha_ingreso, %s), a.id_establecimiento, COALESCE(d.producto, ''), COALESCE(d.motivo, ''),
+            COUNT(d.id)
+        FROM decomisos d
+        JOIN animales a ON a.id = d.id_animal
+        {filtro}
+        GROUP BY a.fecha_ingreso, a.id_establecimiento, COALESCE(d.producto, ''), COALESCE(d.motivo, '')
+    """, params)
+    return cursor.rowcount
+
+
+def _crear_estadisticas_diarias(cursor):
+    cursor.execute(TABLA_ESTADISTICAS_DIARIAS)
+    _reconstruir_estadisticas_diarias(cursor)
+
+
+def _crear_decomisos_diarios(cursor):
+    cursor.execute(TABLA_DECOMISOS_DIARIOS)
+    _reconstruir_decomisos_diarios(cursor)
+
+
+def _agrupar_sin_fecha_ingreso(cursor):
+    """Las versiones anteriores dejaban fuera de los resúmenes a los animales sin fecha de ingreso."""
+    reconstruir_estadisticas(cursor)
+
+
+# Cada migración se aplica una sola vez y en orden: (versión, descripción, función)
+MIGRACIONES = [
+    (1, "Tablas base", _crear_tablas),
+    (2, "Índices de las consultas frecuentes", _crear_indices),
+    (3, "Índice de trigramas para buscar_animal", _crear_trigramas),
+    (4, "Estadísticas diarias por establecimiento", _crear_estadisticas_diarias),
+    (5, "Decomisos diarios por producto y motivo", _crear_decomisos_diarios),
+    (6, "Animales sin fecha de ingreso en los resúmenes diarios", _agrupar_sin_fecha_ingreso),
+]
+
+
+def version_actual(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            descripcion VARCHAR(200),
+            aplicada_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+    """)
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def aplicar_migraciones(connection):
+    """Aplica las migraciones pendientes y retorna la lista de versiones aplicadas."""
+    aplicadas = []
+    with connection.cursor() as cursor:
+        actual = version_actual(cursor)
+        for version, descripcion, migracion in MIGRACIONES:
+            if version <= actual:
+                continue
+            print(f"Aplicando migración {version}: {descripcion}")
+            migracion(cursor)
+            cursor.execute("INSERT INTO schema_version (version, descripcion) VALUES (%s, %s)",
+                           (version, descripcion))
+            connection.commit()
+            aplicadas.append(version)
+    return aplicadas
+
+
+# ---------------------------------------------------------------------------
+# Verificación con EXPLAIN
+# ---------------------------------------------------------------------------
+
+# Tablas de catálogo pequeñas que se pueden recorrer completas
+TABLAS_CATALOGO = {"establecimiento", "planta", "vehiculo", "conductores", "municipio",
+                   "departamento", "vehiculo_conductor"}
+
+# Tablas de resumen: crecen con los días de operación, no con los animales
+TABLAS_RESUMEN = {"estadisticas_diarias", "decomisos_diarios"}
+
+
+class _CursorExplicado:
+    """Cursor que ejecuta EXPLAIN antes de cada SELECT y guarda el plan."""
+
+    def __init__(self, cursor, connection, registro):
+        self._cursor = cursor
+        self._connection = connection
+        self._registro = registro
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._cursor.close()
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+    def execute(self, sql, params=None):
+        if sql.lstrip().upper().startswith("SELECT"):
+            with self._connection.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute("EXPLAIN " + sql, params)
+                self._registro.append((sql, cursor.fetchall()))
+        return self._cursor.execute(sql, params)
+
+
+class _ConexionExplicada:
+    def __init__(self, connection, registro):
+        self._connection = connection
+        self._registro = registro
+
+    def __getattr__(self, nombre):
+        return getattr(self._connection, nombre)
+
+    def cursor(self, *args):
+        return _CursorExplicado(self._connection.cursor(*args), self._connection, self._registro)
+
+
+class _ConexionDBExplicada(ConexionDB):
+    def __init__(self, registro):
+        super().__init__()
+        self.registro = registro
+
+    def conectar(self):
+        connection = super().conectar()
+        return _ConexionExplicada(connection, self.registro) if connection else None
+
+
+def _muestra(cursor):
+    """Toma valores reales de la base para usarlos como parámetros de las consultas."""
+    muestra = {}
+    cursor.execute("SELECT id, marca_diferencial FROM establecimiento ORDER BY id LIMIT 1")
+    muestra["id_establecimiento"], muestra["marca_diferencial"] = cursor.fetchone() or (1, "")
+    cursor.execute("SELECT fecha FROM ingresos ORDER BY id DESC LIMIT 1")
+    muestra["fecha"] = (cursor.fetchone() or ("2024-01-01",))[0]
+    cursor.execute("SELECT id FROM guia_transporte ORDER BY id DESC LIMIT 1")
+    muestra["id_guia"] = (cursor.fetchone() or (1,))[0]
+    cursor.execute("SELECT numero_animal, guia_movilizacion FROM animales ORDER BY id DESC LIMIT 1")
+    numero_animal, guia = cursor.fetchone() or ("1", "")
+    muestra["numero_animal"] = str(numero_animal)
+    muestra["guia_parcial"] = str(guia or "")[1:6]
+    return muestra
+
+
+def llamadas_verificadas(muestra):
+    """Métodos de lectura de OperacionesDB con los argumentos para verificarlos."""
+    return [
+        ("obtener_estadisticas_animales_por_especie", ()),
+        ("obtener_decomisos_totales_por_especie", ()),
+        ("obtener_estadisticas_animales_por_especie_establecimiento", (muestra["id_establecimiento"],)),
+        ("obtener_distribucion_sexo_por_especie_establecimiento", (muestra["id_establecimiento"],)),
+        ("obtener_peso_promedio_por_especie_establecimiento", (muestra["id_establecimiento"],)),
+        ("obtener_evolucion_ingresos_establecimiento", (muestra["id_establecimiento"],)),
+        ("obtener_evolucion_ingresos_establecimiento",
+         (muestra["id_establecimiento"], None, muestra["fecha"], "semana")),
+        ("obtener_evolucion_ingresos_establecimiento",
+         (muestra["id_establecimiento"], None, muestra["fecha"], "mes")),
+        ("obtener_resumen_establecimiento", (muestra["id_establecimiento"],)),
+        ("obtener_tasas_decomiso", (muestra["id_establecimiento"], None, muestra["fecha"], "semana")),
+        ("obtener_marca_cambios", ()),
+        ("obtener_columnas_animales", (0,)),
+        ("obtener_columnas_decomisos", (0,)),
+        ("obtener_guias_por_establecimiento", (muestra["id_establecimiento"],)),
+        ("obtener_animales_por_guia", (muestra["id_guia"],)),
+        ("obtener_destinos", ()),
+        ("obtener_plantas", ()),
+        ("obtener_vehiculos", ()),
+        ("obtener_conductores", ()),
+        ("obtener_animales", (muestra["marca_diferencial"], muestra["fecha"])),
+        ("obtener_establecimientos", ()),
+        ("obtener_catalogos", ()),
+        ("buscar_animal", (muestra["numero_animal"],)),
+        ("buscar_animal", (muestra["guia_parcial"],)),
+        ("obtener_ingreso_por_fecha", (muestra["fecha"],)),
+    ]
+
+
+def verificar_consultas():
+    """
+    Ejecuta cada consulta de OperacionesDB precedida de EXPLAIN y retorna la lista
+    de recorridos completos (type = ALL) sobre tablas que no son de catálogo:
+    [{"metodo": "buscar_animal", "tabla": "animales", "filas": 120000, "sql": "..."}]
+    """
+    from consultas import OperacionesDB
+
+    db = OperacionesDB()
+    registro = []
+    db.conexion_db = _ConexionDBExplicada(registro)
+
+    conexion_db = ConexionDB()
+    connection = conexion_db.conectar()
+    if not connection:
+        raise pymysql.MySQLError("No se pudo establecer conexión con la base de datos.")
+    try:
+        with connection.cursor() as cursor:
+            muestra = _muestra(cursor)
+    finally:
+        conexion_db.cerrar_conexion()
+
+    problemas = []
+    for metodo, argumentos in llamadas_verificadas(muestra):
+        del registro[:]
+        getattr(db, metodo)(*argumentos)
+        for sql, plan in registro:
+            for fila in plan:
+                tabla = str(fila.get("table") or "")
+                # <unionN,M> y <derivedN> son resultados intermedios ya acotados, no tablas
+                if (fila.get("type") == "ALL" and tabla not in TABLAS_CATALOGO | TABLAS_RESUMEN
+                        and not tabla.startswith("<")):
+                    problemas.append({
+                        "metodo": metodo,
+                        "tabla": tabla,
+                        "filas": fila.get("rows"),
+                        "sql": " ".join(sql.split()),
+                    })
+    return problemas
+
+
+def main(argv):
+    comando = argv[1] if len(argv) > 1 else "migrar"
+    if comando == "migrar":
+        conexion_db = ConexionDB()
+        connection = conexion_db.conectar()
+        if not connection:
+            return 1
+        try:
+            aplicadas = aplicar_migraciones(connection)
+        finally:
+            conexion_db.cerrar_conexion()
+        print(f"Migraciones aplicadas: {aplicadas or 'ninguna, el esquema está al día'}")
+        return 0
+    if comando == "verificar":
+        problemas = verificar_consultas()
+        for problema in problemas:
+            print(f"RECORRIDO COMPLETO en {problema['metodo']}: tabla {problema['tabla']} "
+                  f"(~{problema['filas']} filas)\n    {problema['sql']}")
+        if problemas:
+            return 1
+        print("Todas las consultas usan índices.")
+        return 0
+    if comando == "reconstruir":
+        desde = argv[2] if len(argv) > 2 else None
+        conexion_db = ConexionDB()
+        connection = conexion_db.conectar()
+        if not connection:
+            return 1
+        try:
+            with connection.cursor() as cursor:
+                filas = reconstruir_estadisticas(cursor, desde)
+            connection.commit()
+        except pymysql.MySQLError as e:
+            connection.rollback()
+            print(f"Error al reconstruir las estadísticas: {e}")
+            return 1
+        finally:
+            conexion_db.cerrar_conexion()
+        print(f"Estadísticas diarias reconstruidas{f' desde {desde}' if desde else ''}: {filas} filas")
+        return 0
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,23 +1,61 @@
 import sys
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox
+import datetime
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QTabWidget
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
-from consultas import OperacionesDB  # Asegúrate de que esta clase tenga implementados los métodos necesarios
-import numpy as np
+from analitica import analitica
+from catalogos import catalogos
+from consultas import OperacionesDB, inicio_periodo  # Asegúrate de que esta clase tenga implementados los métodos necesarios
+from ejecutor_db import EjecutorDB
+from graficos import AdministradorBlit, GraficoBarras, GraficoHistogramas, GraficoLinea, GraficoTorta
+
+# Cada cuánto se revisa la marca de cambios mientras la pantalla está visible
+INTERVALO_ACTUALIZACION_MS = 30000
+
+# Periodos de la evolución de ingresos: (texto, días hasta el último ingreso; None = todo el historial)
+PERIODOS = [("Últimos 30 días", 30), ("Últimos 90 días", 90), ("Último año", 365), ("Todo", None)]
+
+TITULOS_GRANULARIDAD = {"dia": "por día", "semana": "por semana", "mes": "por mes"}
+
+
+def granularidad_para(dias):
+    """Granularidad de la evolución según los días que abarca: hasta ~100 puntos en el gráfico."""
+    if dias <= 92:
+        return "dia"
+    if dias <= 731:
+        return "semana"
+    return "mes"
+
+
+def principales(filas, clave, maximo=6):
+    """
+    Etiquetas y tasas de las primeras filas (vienen ordenadas de mayor a menor); las
+    demás se suman en "Otros" para que las barras sigan siendo legibles.
+    """
+    etiquetas = [fila[clave] or "Sin dato" for fila in filas[:maximo]]
+    tasas = [fila["tasa"] for fila in filas[:maximo]]
+    if len(filas) > maximo:
+        etiquetas.append("Otros")
+        tasas.append(round(sum(fila["tasa"] for fila in filas[maximo:]), 2))
+    return etiquetas, tasas
 
-def make_autopct(values):
-    """Función para mostrar el valor absoluto en lugar del porcentaje en un gráfico de pastel."""
-    def my_autopct(pct):
-        total = sum(values)
-        val = int(round(pct * total / 100.0))
-        return f'{val}'
-    return my_autopct
 
 class Estadisticas(QWidget):
     def __init__(self):
         super().__init__()
         self.db = OperacionesDB()
+        self.ejecutor = EjecutorDB(self)
+        # Marca de cambios (último id de animales y de decomisos) de los datos mostrados
+        self.marca = None
+        # (est_id, periodo) -> (marca, datos); se vuelven a consultar solo si la marca cambió
+        self.cache_establecimientos = {}
+        # Últimos datos dibujados, para no redibujar los lienzos si no cambiaron
+        self.globales_dibujados = None
+        # (clave, datos) del establecimiento seleccionado y los dibujados en cada pestaña
+        self.adicionales = None
+        self.adicionales_dibujados = {}
         self.setWindowTitle("Estadísticas Globales y Adicionales")
         self.setGeometry(100, 100, 1000, 800)
         
@@ -30,6 +68,14 @@ class Estadisticas(QWidget):
         top_layout = QHBoxLayout(self.top_widget)
         self.top_figure, (self.ax_global_animales, self.ax_global_decomisos) = plt.subplots(1, 2, figsize=(8, 4))
         self.top_canvas = FigureCanvas(self.top_figure)
+        self.ax_global_animales.set_title("Animales por Especie (Global)", fontsize=14)
+        self.ax_global_decomisos.set_title("Decomisos por Especie (Global)", fontsize=14)
+        # Los gráficos conservan sus artistas y solo cambian los datos al actualizarse
+        self.blit_superior = AdministradorBlit(self.top_canvas)
+        self.grafico_global_animales = GraficoTorta(self.ax_global_animales, self.blit_superior,
+                                                    mensaje_vacio="Sin datos de animales")
+        self.grafico_global_decomisos = GraficoTorta(self.ax_global_decomisos, self.blit_superior,
+                                                     mensaje_vacio="Sin datos de decomisos")
         top_layout.addWidget(self.top_canvas)
         self.top_widget.setFixedHeight(300)
         main_layout.addWidget(self.top_widget)
@@ -40,115 +86,384 @@ class Estadisticas(QWidget):
         self.lower_widget = QWidget()
         lower_layout = QVBoxLayout(self.lower_widget)
         
-        # Combobox de establecimientos para filtrar estadísticas adicionales
+        # Combobox de establecimientos para filtrar estadísticas adicionales y del periodo de la evolución
+        filtros_layout = QHBoxLayout()
         self.combo_establecimientos = QComboBox()
         self.cargar_establecimientos()
         self.combo_establecimientos.currentIndexChanged.connect(self.actualizar_estadisticas_adicionales)
-        lower_layout.addWidget(self.combo_establecimientos)
+        filtros_layout.addWidget(self.combo_establecimientos, 1)
+        filtros_layout.addWidget(QLabel("Periodo:"))
+        self.combo_periodo = QComboBox()
+        for texto, dias in PERIODOS:
+            self.combo_periodo.addItem(texto, dias)
+        self.combo_periodo.setCurrentIndex(len(PERIODOS) - 1)
+        self.combo_periodo.currentIndexChanged.connect(self.cambiar_periodo)
+        filtros_layout.addWidget(self.combo_periodo)
+        lower_layout.addLayout(filtros_layout)
         
         # Crear una figura para los gráficos adicionales usando GridSpec
         self.lower_figure = plt.figure(figsize=(10, 6))
-        gs = gridspec.GridSpec(2, 2, height_ratios=[1, 1])
+        # Espacio entre filas para que el título de la evolución no tape las etiquetas de arriba
+        gs = gridspec.GridSpec(2, 2, height_ratios=[1, 1], hspace=0.6)
         self.ax_animales_est = self.lower_figure.add_subplot(gs[0, 0])
         self.ax_sexo_especie = self.lower_figure.add_subplot(gs[0, 1])
         self.ax_evolucion = self.lower_figure.add_subplot(gs[1, :])
         self.lower_canvas = FigureCanvas(self.lower_figure)
-        lower_layout.addWidget(self.lower_canvas)
+        self.ax_animales_est.set_title("Animales por Especie", fontsize=14)
+        self.ax_animales_est.set_xlabel("Especie", fontsize=12)
+        self.ax_animales_est.set_ylabel("Cantidad", fontsize=12)
+        self.ax_sexo_especie.set_title("Distribución de Sexo por Especie", fontsize=14)
+        self.ax_evolucion.set_title("Evolución Temporal de Ingresos", fontsize=14)
+        self.ax_evolucion.grid(True, linestyle='--', alpha=0.5)
+        self.blit_inferior = AdministradorBlit(self.lower_canvas)
+        self.grafico_animales_est = GraficoBarras(self.ax_animales_est, self.blit_inferior,
+                                                  [("Cantidad", '#3f51b5')], etiquetas_valor=True)
+        self.grafico_sexo_especie = GraficoBarras(self.ax_sexo_especie, self.blit_inferior,
+                                                  [("Macho", '#2196f3'), ("Hembra", '#f44336')],
+                                                  ancho=0.35, leyenda=True)
+        self.grafico_evolucion = GraficoLinea(self.ax_evolucion, self.blit_inferior, marker='o', linestyle='-',
+                                              color='#ff9800', markersize=8)
+
+        # Distribución de peso por especie del establecimiento y periodo seleccionados
+        self.peso_figure, (self.ax_histograma_peso, self.ax_percentiles_peso) = plt.subplots(
+            1, 2, figsize=(10, 6), gridspec_kw={"width_ratios": [3, 2]})
+        self.peso_figure.subplots_adjust(bottom=0.18)
+        self.peso_canvas = FigureCanvas(self.peso_figure)
+        self.ax_histograma_peso.set_title("Distribución de Peso por Especie", fontsize=14)
+        self.ax_histograma_peso.set_xlabel("Peso (kg)", fontsize=12)
+        self.ax_histograma_peso.set_ylabel("Animales", fontsize=12)
+        self.ax_percentiles_peso.set_title("Percentiles de Peso", fontsize=14)
+        self.ax_percentiles_peso.set_ylabel("Peso (kg)", fontsize=12)
+        self.blit_peso = AdministradorBlit(self.peso_canvas)
+        self.grafico_histograma_peso = GraficoHistogramas(self.ax_histograma_peso, self.blit_peso)
+        self.grafico_percentiles_peso = GraficoBarras(self.ax_percentiles_peso, self.blit_peso,
+                                                      [("P10", '#90caf9'), ("P50", '#1e88e5'), ("P90", '#0d47a1')],
+                                                      ancho=0.25, leyenda=True)
+
+        # Tasas de decomiso (decomisos por cada 100 animales) por producto, motivo y periodo;
+        # la etiqueta muestra el total del periodo
+        self.decomisos_widget = QWidget()
+        decomisos_layout = QVBoxLayout(self.decomisos_widget)
+        self.etiqueta_tasa_decomiso = QLabel()
+        decomisos_layout.addWidget(self.etiqueta_tasa_decomiso)
+        self.decomisos_figure = plt.figure(figsize=(10, 6))
+        # Las etiquetas inclinadas de productos y motivos necesitan más espacio bajo la primera fila
+        gs_decomisos = gridspec.GridSpec(2, 2, height_ratios=[1, 1], hspace=0.9, top=0.93, bottom=0.12)
+        self.ax_decomisos_producto = self.decomisos_figure.add_subplot(gs_decomisos[0, 0])
+        self.ax_decomisos_motivo = self.decomisos_figure.add_subplot(gs_decomisos[0, 1])
+        self.ax_decomisos_periodo = self.decomisos_figure.add_subplot(gs_decomisos[1, :])
+        self.decomisos_canvas = FigureCanvas(self.decomisos_figure)
+        self.ax_decomisos_producto.set_title("Tasa por Producto", fontsize=14)
+        self.ax_decomisos_motivo.set_title("Tasa por Motivo", fontsize=14)
+        self.ax_decomisos_periodo.set_title("Tasa de Decomiso", fontsize=14)
+        self.ax_decomisos_periodo.grid(True, linestyle='--', alpha=0.5)
+        self.blit_decomisos = AdministradorBlit(self.decomisos_canvas)
+        self.grafico_decomisos_producto = GraficoBarras(self.ax_decomisos_producto, self.blit_decomisos,
+                                                        [("Tasa", '#8e24aa')], etiquetas_valor=True,
+                                                        formato_valor="{:.1f}", rotacion=30,
+                                                        mensaje_vacio="Sin decomisos")
+        self.grafico_decomisos_motivo = GraficoBarras(self.ax_decomisos_motivo, self.blit_decomisos,
+                                                      [("Tasa", '#e53935')], etiquetas_valor=True,
+                                                      formato_valor="{:.1f}", rotacion=30,
+                                                      mensaje_vacio="Sin decomisos")
+        self.grafico_decomisos_periodo = GraficoLinea(self.ax_decomisos_periodo, self.blit_decomisos, marker='o',
+                                                      linestyle='-', color='#8e24aa', markersize=6)
+        decomisos_layout.addWidget(self.decomisos_canvas)
+
+        # Solo se dibuja la pestaña visible; las demás se dibujan al elegirlas
+        self.pestanas = QTabWidget()
+        self.pestanas.addTab(self.lower_canvas, "General")
+        self.pestanas.addTab(self.peso_canvas, "Peso")
+        self.pestanas.addTab(self.decomisos_widget, "Decomisos")
+        self.paneles = [
+            (self.blit_inferior, self.dibujar_general,
+             [self.grafico_animales_est, self.grafico_sexo_especie, self.grafico_evolucion]),
+            (self.blit_peso, self.dibujar_peso, [self.grafico_histograma_peso, self.grafico_percentiles_peso]),
+            (self.blit_decomisos, self.dibujar_decomisos,
+             [self.grafico_decomisos_producto, self.grafico_decomisos_motivo, self.grafico_decomisos_periodo]),
+        ]
+        self.pestanas.currentChanged.connect(self.dibujar_pestana)
+        lower_layout.addWidget(self.pestanas)
         
         main_layout.addWidget(self.lower_widget)
         self.setLayout(main_layout)
         
-        # Cargar datos globales y actualizar el panel adicional según la selección
-        self.cargar_estadisticas_globales()
+        # Los datos se cargan al mostrar la pantalla y se revisan periódicamente mientras está visible
+        self.temporizador = QTimer(self)
+        self.temporizador.setInterval(INTERVALO_ACTUALIZACION_MS)
+        self.temporizador.timeout.connect(self.cargar_estadisticas_globales)
         self.actualizar_estadisticas_adicionales()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.cargar_estadisticas_globales()
+        self.temporizador.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.temporizador.stop()
     
     def cargar_estadisticas_globales(self):
-        """Carga y muestra los gráficos globales de animales y decomisos por especie."""
-        self.ax_global_animales.clear()
-        self.ax_global_decomisos.clear()
-
-        # Global: Animales por especie (gráfico de pastel)
-        datos_animales = self.db.obtener_estadisticas_animales_por_especie()
-        if datos_animales:
-            especies = [d['especie'] for d in datos_animales]
-            cantidades = [d['cantidad'] for d in datos_animales]
-            self.ax_global_animales.pie(cantidades, labels=especies, autopct=make_autopct(cantidades),
-                                        startangle=140, textprops={'fontsize': 12})
-            self.ax_global_animales.set_title("Animales por Especie (Global)", fontsize=14)
-        else:
-            self.ax_global_animales.text(0.5, 0.5, "Sin datos de animales", ha='center', va='center', fontsize=12)
-
-        # Global: Decomisos por especie (gráfico de pastel)
-        datos_decomisos = self.db.obtener_decomisos_totales_por_especie()
-        if datos_decomisos:
-            especies_dec = [d['especie'] for d in datos_decomisos]
-            cantidades_dec = [d['cantidad_decomisos'] for d in datos_decomisos]
-            self.ax_global_decomisos.pie(cantidades_dec, labels=especies_dec, autopct=make_autopct(cantidades_dec),
-                                         startangle=140, textprops={'fontsize': 12})
-            self.ax_global_decomisos.set_title("Decomisos por Especie (Global)", fontsize=14)
-        else:
-            self.ax_global_decomisos.text(0.5, 0.5, "Sin datos de decomisos", ha='center', va='center', fontsize=12)
+        """Revisa en segundo plano la marca de cambios y recarga los datos globales si cambió."""
+        self.ejecutor.ejecutar("globales", self.obtener_datos_globales, self.marca,
+                               al_terminar=self.recibir_datos_globales)
+
+    def obtener_datos_globales(self, marca_anterior):
+        """
+        Consulta los datos globales; se ejecuta fuera del hilo de la interfaz.
+        Si la marca de cambios es la misma de los datos mostrados, solo retorna la marca.
+        """
+        marca = self.db.obtener_marca_cambios()
+        if marca is not None and marca == marca_anterior:
+            return {"marca": marca}
+        return {
+            "marca": marca,
+            "animales": self.db.obtener_estadisticas_animales_por_especie(),
+            "decomisos": self.db.obtener_decomisos_totales_por_especie(),
+        }
 
-        self.top_canvas.draw()
+    def recibir_datos_globales(self, datos):
+        cambio = datos["marca"] != self.marca
+        self.marca = datos["marca"]
+        if "animales" in datos:
+            self.mostrar_estadisticas_globales({"animales": datos["animales"], "decomisos": datos["decomisos"]})
+        if cambio:
+            # El resumen en caché del establecimiento seleccionado ya no corresponde a la marca
+            self.actualizar_estadisticas_adicionales()
+
+    def mostrar_estadisticas_globales(self, datos):
+        """Muestra los gráficos globales de animales y decomisos por especie."""
+        if datos == self.globales_dibujados:
+            return
+        self.globales_dibujados = datos
+        datos_animales = datos["animales"]
+        datos_decomisos = datos["decomisos"]
+        completo = self.grafico_global_animales.actualizar(
+            [d['especie'] for d in datos_animales], [d['cantidad'] for d in datos_animales])
+        completo |= self.grafico_global_decomisos.actualizar(
+            [d['especie'] for d in datos_decomisos], [d['cantidad_decomisos'] for d in datos_decomisos])
+        self.blit_superior.actualizar(completo)
     
     def cargar_establecimientos(self):
         """Carga los establecimientos en el combobox."""
-        establecimientos = self.db.obtener_establecimientos()
+        self.ejecutor.ejecutar("establecimientos", catalogos.lista, "establecimientos",
+                               al_terminar=self.mostrar_establecimientos)
+
+    def recargar_catalogos(self):
+        self.cargar_establecimientos()
+
+    def mostrar_establecimientos(self, establecimientos):
+        # Al recargar los catálogos se conserva el establecimiento elegido; solo si ya
+        # no existe cambia la selección y se actualizan los gráficos
+        seleccion = self.combo_establecimientos.currentData()
+        self.combo_establecimientos.blockSignals(True)
         self.combo_establecimientos.clear()
         self.combo_establecimientos.addItem("Seleccione un establecimiento", None)
         for est in establecimientos:
             self.combo_establecimientos.addItem(est[1], est[0])
+        self.combo_establecimientos.setCurrentIndex(max(self.combo_establecimientos.findData(seleccion), 0))
+        self.combo_establecimientos.blockSignals(False)
+        if self.combo_establecimientos.currentData() != seleccion:
+            self.actualizar_estadisticas_adicionales()
     
+    def cambiar_periodo(self):
+        # Los valores de otro periodo tienen otra escala: los ejes y se ajustan de nuevo
+        # y todas las pestañas se vuelven a dibujar
+        for _, _, graficos in self.paneles:
+            for grafico in graficos:
+                grafico.reiniciar_escala()
+        self.adicionales_dibujados = {}
+        self.actualizar_estadisticas_adicionales()
+
     def actualizar_estadisticas_adicionales(self):
-        """Actualiza los gráficos adicionales según el establecimiento seleccionado."""
+        """Actualiza los gráficos adicionales según el establecimiento y el periodo seleccionados."""
         est_id = self.combo_establecimientos.currentData()
-        for ax in [self.ax_animales_est, self.ax_sexo_especie, self.ax_evolucion]:
-            ax.clear()
-
         if not est_id:
-            for ax in [self.ax_animales_est, self.ax_sexo_especie, self.ax_evolucion]:
-                ax.text(0.5, 0.5, "Seleccione un establecimiento", ha='center', va='center', fontsize=12)
-            self.lower_canvas.draw()
+            self.ejecutor.cancelar("adicionales")
+            self.ejecutor.cancelar("peso")
+            self.adicionales = None
+            self.adicionales_dibujados = {}
+            self.etiqueta_tasa_decomiso.clear()
+            for blit, _, graficos in self.paneles:
+                for grafico in graficos:
+                    grafico.mostrar_mensaje("Seleccione un establecimiento")
+                blit.actualizar()
             return
-        
-        # Animales por especie
-        datos_animales_est = self.db.obtener_estadisticas_animales_por_especie_establecimiento(est_id)
-        if datos_animales_est:
-            especies = [d['especie'] for d in datos_animales_est]
-            cantidades = [d['cantidad'] for d in datos_animales_est]
-            bars = self.ax_animales_est.bar(especies, cantidades, color='#3f51b5')
-            self.ax_animales_est.set_title("Animales por Especie", fontsize=14)
-            self.ax_animales_est.set_xlabel("Especie", fontsize=12)
-            self.ax_animales_est.set_ylabel("Cantidad", fontsize=12)
-            self.ax_animales_est.tick_params(axis='x', labelsize=10, rotation=0)
-            
-            for bar in bars:
-                height = bar.get_height()
-                self.ax_animales_est.text(bar.get_x() + bar.get_width()/2, height, f'{int(height)}',
-                                          ha='center', va='bottom', fontsize=12, color='black')
-
-        # Distribución de sexo
-        datos_sexo_especie = self.db.obtener_distribucion_sexo_por_especie_establecimiento(est_id)
-        if datos_sexo_especie:
-            especies = [d['especie'] for d in datos_sexo_especie]
-            macho = [d['Macho'] for d in datos_sexo_especie]
-            hembra = [d['Hembra'] for d in datos_sexo_especie]
-            x = np.arange(len(especies))
-            width = 0.35
-            self.ax_sexo_especie.bar(x - width/2, macho, width, label='Macho', color='#2196f3')
-            self.ax_sexo_especie.bar(x + width/2, hembra, width, label='Hembra', color='#f44336')
-            self.ax_sexo_especie.set_xticks(x)
-            self.ax_sexo_especie.set_xticklabels(especies, rotation=0, fontsize=10)
-            self.ax_sexo_especie.set_title("Distribución de Sexo por Especie", fontsize=14)
-            self.ax_sexo_especie.legend(fontsize=12)
-
-        # Evolución temporal de ingresos
-        datos_evolucion = self.db.obtener_evolucion_ingresos_establecimiento(est_id)
-        if datos_evolucion:
-            fechas = [d['fecha'] for d in datos_evolucion]
-            cantidades_ing = [d['cantidad'] for d in datos_evolucion]
-            self.ax_evolucion.plot(fechas, cantidades_ing, marker='o', linestyle='-', color='#ff9800', markersize=8)
-            self.ax_evolucion.set_title("Evolución Temporal de Ingresos", fontsize=14)
-            self.ax_evolucion.grid(True, linestyle='--', alpha=0.5)
-
-        self.lower_canvas.draw()
+
+        clave = (est_id, self.combo_periodo.currentData())
+        marca, datos = self.cache_establecimientos.get(clave, (None, None))
+        if datos is not None:
+            # Se muestra la copia en caché; si la marca no cambió no hace falta consultar
+            self.ejecutor.cancelar("adicionales")
+            self.mostrar_estadisticas_adicionales(clave, datos)
+            if marca is not None and marca == self.marca:
+                return
+
+        # Si el usuario cambia de establecimiento antes de terminar, se descarta la consulta anterior
+        self.ejecutor.ejecutar("adicionales", self.obtener_datos_establecimiento, clave, marca,
+                               al_terminar=self.recibir_datos_establecimiento)
+
+    def obtener_datos_establecimiento(self, clave, marca_anterior):
+        """
+        Consulta los datos del establecimiento; se ejecuta fuera del hilo de la interfaz.
+        Retorna (clave, marca, datos), con datos None si la marca no cambió.
+        """
+        marca = self.db.obtener_marca_cambios()
+        if marca is not None and marca == marca_anterior:
+            return clave, marca, None
+        return clave, marca, self.consultar_establecimiento(*clave)
+
+    def consultar_establecimiento(self, est_id, dias):
+        """
+        Resumen del establecimiento más la evolución de ingresos de los últimos dias hasta
+        su último ingreso (None = todo el historial), con la granularidad que corresponde al
+        periodo, y las tasas de decomiso del mismo periodo. La distribución de peso se
+        calcula aparte con consultar_peso al abrir la pestaña Peso.
+        """
+        datos = self.db.obtener_resumen_establecimiento(est_id)
+        if datos["ultima_fecha"] is None:
+            hasta = datetime.date.today()
+        else:
+            hasta = datetime.date.fromisoformat(datos["ultima_fecha"])
+        if dias is None:
+            if datos["primera_fecha"] is None:
+                granularidad = "dia"
+                desde = hasta = None
+            else:
+                desde = datetime.date.fromisoformat(datos["primera_fecha"])
+                granularidad = granularidad_para((hasta - desde).days + 1)
+            rango = None
+            inicio = desde
+        else:
+            granularidad = granularidad_para(dias)
+            inicio = hasta - datetime.timedelta(days=dias - 1)
+            # El primer periodo se toma completo para que no aparezca con menos ingresos
+            desde = inicio_periodo(inicio, granularidad)
+            rango = (desde, hasta)
+        evolucion = self.db.obtener_evolucion_ingresos_establecimiento(est_id, desde, hasta, granularidad)
+        datos["granularidad"] = granularidad
+        datos["rango"] = rango
+        datos["fechas"] = [fila["fecha"] for fila in evolucion]
+        datos["ingresos"] = [fila["cantidad"] for fila in evolucion]
+        datos["decomisos"] = self.db.obtener_tasas_decomiso(est_id, desde, hasta, granularidad)
+        datos["periodo_peso"] = (inicio, hasta)
+        return datos
+
+    @staticmethod
+    def consultar_peso(est_id, desde, hasta):
+        """
+        Distribución de peso por especie del establecimiento; se ejecuta fuera del hilo de
+        la interfaz. La primera vez carga animales y decomisos completos en analitica, por
+        eso corre en su propio canal y solo cuando se abre la pestaña Peso.
+        """
+        # Histogramas y percentiles en memoria: solo se traen de la base las filas nuevas
+        analitica.refrescar()
+        return analitica.filtrar(id_establecimiento=est_id, desde=desde, hasta=hasta).distribucion_peso_por("especie")
+
+    def recibir_peso(self, datos, peso):
+        datos["peso"] = peso
+        indice = self.pestanas.indexOf(self.peso_canvas)
+        dibujado = self.adicionales_dibujados.get(indice)
+        if dibujado is None or dibujado[1] is not datos:
+            return  # La pestaña Peso ya muestra otro establecimiento o periodo
+        if self.pestanas.currentIndex() == indice:
+            self.blit_peso.actualizar(self.dibujar_peso(datos))
+        else:
+            # Quedó mostrando "Cargando...": se dibuja al volver a la pestaña
+            del self.adicionales_dibujados[indice]
+
+    def fallo_peso(self, datos, error):
+        print(f"Error al calcular la distribución de peso: {error}")
+        if self.adicionales is not None and self.adicionales[1] is datos:
+            self.grafico_histograma_peso.mostrar_mensaje("No se pudo calcular")
+            self.grafico_percentiles_peso.mostrar_mensaje("No se pudo calcular")
+            self.blit_peso.actualizar()
+
+    def recibir_datos_establecimiento(self, resultado):
+        clave, marca, datos = resultado
+        if datos is None:
+            datos = self.cache_establecimientos[clave][1]
+        self.cache_establecimientos[clave] = (marca, datos)
+        if clave == (self.combo_establecimientos.currentData(), self.combo_periodo.currentData()):
+            self.mostrar_estadisticas_adicionales(clave, datos)
+        if marca != self.marca:
+            # Hay registros nuevos: los gráficos globales también están desactualizados
+            self.cargar_estadisticas_globales()
+
+    def mostrar_estadisticas_adicionales(self, clave, datos):
+        """Muestra los datos del establecimiento en la pestaña visible."""
+        self.adicionales = (clave, datos)
+        self.dibujar_pestana()
+
+    def dibujar_pestana(self):
+        """Dibuja la pestaña visible si todavía no muestra los datos del establecimiento seleccionado."""
+        indice = self.pestanas.currentIndex()
+        if self.adicionales is None or self.adicionales_dibujados.get(indice) == self.adicionales:
+            return
+        self.adicionales_dibujados[indice] = self.adicionales
+        blit, dibujar, _ = self.paneles[indice]
+        blit.actualizar(dibujar(self.adicionales[1]))
+
+    def dibujar_general(self, datos):
+        """Gráficos de especies, sexo y evolución; retorna True si hace falta un dibujado completo."""
+        especies = datos["especies"]
+        completo = self.grafico_animales_est.actualizar(especies, [datos["cantidad"]])
+        completo |= self.grafico_sexo_especie.actualizar(especies, [datos["macho"], datos["hembra"]])
+        if self.ax_evolucion.get_title() != self.titulo_evolucion(datos["granularidad"]):
+            # El título es parte del fondo y con otra granularidad el eje x se ajusta de nuevo
+            self.ax_evolucion.set_title(self.titulo_evolucion(datos["granularidad"]), fontsize=14)
+            self.grafico_evolucion.reiniciar_rango()
+            completo = True
+        completo |= self.grafico_evolucion.actualizar(datos["fechas"], datos["ingresos"], datos["rango"])
+        return completo
+
+    @staticmethod
+    def titulo_evolucion(granularidad):
+        return f"Evolución Temporal de Ingresos ({TITULOS_GRANULARIDAD[granularidad]})"
+
+    def dibujar_peso(self, datos):
+        """Histogramas y percentiles de peso por especie; retorna True si hace falta un dibujado completo."""
+        if "peso" not in datos:
+            # Una selección nueva reemplaza la consulta en curso (mismo canal)
+            clave = self.adicionales[0]
+            self.ejecutor.ejecutar("peso", self.consultar_peso, clave[0], *datos["periodo_peso"],
+                                   al_terminar=lambda peso: self.recibir_peso(datos, peso),
+                                   al_fallar=lambda e: self.fallo_peso(datos, e))
+            self.grafico_histograma_peso.mostrar_mensaje("Cargando...")
+            self.grafico_percentiles_peso.mostrar_mensaje("Cargando...")
+            return False
+        peso = datos["peso"]
+        especies = [especie for especie in peso if especie is not None]
+        completo = self.grafico_histograma_peso.actualizar(
+            {especie: (peso[especie]["cantidades"], peso[especie]["bordes"]) for especie in especies})
+        completo |= self.grafico_percentiles_peso.actualizar(
+            [f"{especie}\n{peso[especie]['atipicos']} atípico{'' if peso[especie]['atipicos'] == 1 else 's'}"
+             for especie in especies],
+            [[peso[especie]["percentiles"][i] for especie in especies] for i in range(3)])
+        return completo
+
+    def dibujar_decomisos(self, datos):
+        """Tasas de decomiso por producto, motivo y periodo; retorna True si hace falta un dibujado completo."""
+        tasas = datos["decomisos"]
+        if tasas is None:
+            self.etiqueta_tasa_decomiso.setText("No se pudieron consultar los decomisos")
+            for grafico in [self.grafico_decomisos_producto, self.grafico_decomisos_motivo,
+                            self.grafico_decomisos_periodo]:
+                grafico.mostrar_mensaje()
+            return False
+        self.etiqueta_tasa_decomiso.setText(
+            f"{tasas['decomisos']} decomisos en {tasas['animales']} animales: "
+            f"{tasas['tasa']:.2f} por cada 100 animales")
+        productos, tasas_producto = principales(tasas["por_producto"], "producto")
+        completo = self.grafico_decomisos_producto.actualizar(productos, [tasas_producto])
+        motivos, tasas_motivo = principales(tasas["por_motivo"], "motivo")
+        completo |= self.grafico_decomisos_motivo.actualizar(motivos, [tasas_motivo])
+        titulo = f"Tasa de Decomiso ({TITULOS_GRANULARIDAD[datos['granularidad']]})"
+        if self.ax_decomisos_periodo.get_title() != titulo:
+            self.ax_decomisos_periodo.set_title(titulo, fontsize=14)
+            self.grafico_decomisos_periodo.reiniciar_rango()
+            completo = True
+        periodos = tasas["por_periodo"]
+        completo |= self.grafico_decomisos_periodo.actualizar(
+            [fila["fecha"] for fila in periodos], [fila["tasa"] for fila in periodos], datos["rango"])
+        return completo
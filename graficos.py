@@ -0,0 +1,369 @@
+"""
+Gráficos de matplotlib que conservan sus artistas (barras, líneas, porciones y textos)
+y solo cambian sus datos al actualizarse, en lugar de ax.clear() y volver a crearlos.
+
+Los artistas de datos se marcan como animados y los dibuja AdministradorBlit sobre
+el fondo guardado del lienzo (ejes, títulos, leyendas). Si solo cambian los valores
+basta con restaurar el fondo y dibujar esos artistas; si cambian los límites, las
+categorías o la cantidad de barras, se pide un redibujado completo con draw_idle().
+Por eso el eje y solo crece, con holgura, hasta que se llama a reiniciar_escala().
+"""
+import math
+
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.patches import Patch
+
+
+class AdministradorBlit:
+    """Redibuja los artistas animados de un lienzo sobre el fondo guardado en el último dibujado completo."""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.fondo = None
+        self.artistas = []
+        canvas.mpl_connect("draw_event", self._al_dibujar)
+
+    def agregar(self, artista):
+        artista.set_animated(True)
+        self.artistas.append(artista)
+        return artista
+
+    def quitar(self, artista):
+        self.artistas.remove(artista)
+        artista.remove()
+
+    def _al_dibujar(self, event):
+        # Después de un dibujado completo: guardar el fondo y dibujar encima los artistas animados
+        self.fondo = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._dibujar_artistas()
+
+    def _dibujar_artistas(self):
+        figura = self.canvas.figure
+        for artista in self.artistas:
+            if artista.get_visible():
+                figura.draw_artist(artista)
+
+    def actualizar(self, completo=False):
+        """Muestra los cambios: blit de los artistas animados o, si completo, draw_idle()."""
+        if completo or self.fondo is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.fondo)
+        self._dibujar_artistas()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+
+def _tope(maximo):
+    """Límite superior del eje y: el primer múltiplo redondo (1, 1.5, 2, ... 8 x 10^n) que deja margen para las etiquetas."""
+    if maximo <= 0:
+        return 1
+    objetivo = maximo * 1.15
+    escala = 10 ** math.floor(math.log10(objetivo))
+    for paso in (1, 1.5, 2, 2.5, 3, 4, 5, 6, 8, 10):
+        if paso * escala >= objetivo:
+            return paso * escala
+
+
+# Al crecer, el eje y deja lugar para valores este factor más altos
+HOLGURA_ESCALA = 1.5
+
+
+def _nuevo_tope(ax, maximo):
+    """
+    Retorna el nuevo límite superior del eje y, o None si el actual sirve. El eje solo
+    crece cuando los valores no caben, y entonces con holgura: al pasar de un
+    establecimiento a otro los valores caben casi siempre y basta un blit.
+    """
+    _, tope = ax.get_ylim()
+    if _tope(maximo) <= tope:
+        return None
+    return _tope(maximo * HOLGURA_ESCALA)
+
+
+class _Grafico:
+    def __init__(self, ax, blit, mensaje_vacio="Sin datos"):
+        self.ax = ax
+        self.blit = blit
+        self.mensaje_vacio = mensaje_vacio
+        self.mensaje = blit.agregar(ax.text(0.5, 0.5, "", ha='center', va='center', fontsize=12,
+                                            transform=ax.transAxes, visible=False))
+
+    def _artistas_datos(self):
+        return []
+
+    def reiniciar_escala(self):
+        """El próximo actualizar() vuelve a ajustar el eje y a sus valores (p. ej. al cambiar de periodo)."""
+        self.ax.set_ylim(0, 1)
+
+    def mostrar_mensaje(self, texto=None):
+        """Oculta los datos y muestra un texto en el centro del gráfico. Retorna False (basta blit)."""
+        for artista in self._artistas_datos():
+            artista.set_visible(False)
+        self.mensaje.set_text(texto or self.mensaje_vacio)
+        self.mensaje.set_visible(True)
+        return False
+
+    def _mostrar_datos(self):
+        self.mensaje.set_visible(False)
+        for artista in self._artistas_datos():
+            artista.set_visible(True)
+
+
+class GraficoBarras(_Grafico):
+    """
+    Barras agrupadas por categoría, una serie por cada (etiqueta, color). Las barras
+    se crean de nuevo solo si cambia la cantidad de categorías.
+    """
+
+    def __init__(self, ax, blit, series, ancho=0.8, etiquetas_valor=False, leyenda=False, mensaje_vacio="Sin datos",
+                 formato_valor="{:.0f}", rotacion=0):
+        super().__init__(ax, blit, mensaje_vacio)
+        self.series = series
+        self.ancho = ancho
+        self.etiquetas_valor = etiquetas_valor
+        self.formato_valor = formato_valor
+        self.rotacion = rotacion
+        self.categorias = None
+        self.contenedores = []
+        self.barras = []  # por serie, lista de Rectangle
+        self.textos = []  # por serie, lista de Text con el valor de cada barra
+        self.ax.set_xticks([])
+        self.ax.set_ylim(0, 1)
+        if leyenda:
+            # La leyenda es parte del fondo; se arma con muestras que no se dibujan
+            self.ax.legend(handles=[Patch(color=color, label=etiqueta) for etiqueta, color in series], fontsize=12)
+
+    def _artistas_datos(self):
+        return [artista for grupo in self.barras + self.textos for artista in grupo]
+
+    def _crear_barras(self, cantidad):
+        for artista in self._artistas_datos():
+            self.blit.quitar(artista)
+        for contenedor in self.contenedores:
+            self.ax.containers.remove(contenedor)
+        x = np.arange(cantidad)
+        desplazamiento = (len(self.series) - 1) / 2
+        self.contenedores, self.barras, self.textos = [], [], []
+        for i, (_, color) in enumerate(self.series):
+            posiciones = x + (i - desplazamiento) * self.ancho
+            barras = self.ax.bar(posiciones, np.zeros(cantidad), self.ancho, color=color)
+            self.contenedores.append(barras)
+            self.barras.append([self.blit.agregar(barra) for barra in barras.patches])
+            textos = []
+            if self.etiquetas_valor:
+                for barra in barras.patches:
+                    textos.append(self.blit.agregar(self.ax.text(
+                        barra.get_x() + barra.get_width() / 2, 0, "", ha='center', va='bottom',
+                        fontsize=12, color='black')))
+            self.textos.append(textos)
+        self.ax.set_xticks(x)
+        borde = desplazamiento * self.ancho + self.ancho / 2 + 0.3
+        self.ax.set_xlim(-borde, cantidad - 1 + borde)
+
+    def actualizar(self, categorias, valores):
+        """
+        valores: una lista por serie, alineada con categorias.
+        Retorna True si cambió algo del fondo (categorías o escala) y hace falta un dibujado completo.
+        """
+        if not categorias:
+            return self.mostrar_mensaje()
+        completo = False
+        if self.categorias is None or len(categorias) != len(self.categorias):
+            self._crear_barras(len(categorias))
+            completo = True
+        if categorias != self.categorias:
+            self.ax.set_xticklabels(categorias, rotation=self.rotacion, ha='right' if self.rotacion else 'center',
+                                    rotation_mode='anchor', fontsize=10 if not self.rotacion else 9)
+            self.categorias = list(categorias)
+            completo = True
+
+        maximo = 0
+        for barras, textos, serie in zip(self.barras, self.textos, valores):
+            for j, (barra, valor) in enumerate(zip(barras, serie)):
+                barra.set_height(valor)
+                maximo = max(maximo, valor)
+                if textos:
+                    textos[j].set_position((barra.get_x() + barra.get_width() / 2, valor))
+                    textos[j].set_text(self.formato_valor.format(valor))
+
+        tope = _nuevo_tope(self.ax, maximo)
+        if tope is not None:
+            self.ax.set_ylim(0, tope)
+            completo = True
+        self._mostrar_datos()
+        return completo
+
+
+class GraficoLinea(_Grafico):
+    """
+    Serie temporal (un punto por día, semana o mes); fechas como "YYYY-MM-DD" o date.
+    Con un rango fijo el eje x muestra exactamente ese periodo; sin rango el eje solo
+    se amplía (abarca todas las fechas mostradas desde reiniciar_rango()), así cambiar
+    de serie no obliga a recalcular las marcas de fecha mientras caiga en el mismo rango.
+    """
+
+    def __init__(self, ax, blit, mensaje_vacio="Sin datos", **estilo):
+        super().__init__(ax, blit, mensaje_vacio)
+        (self.linea,) = ax.plot([], [], **estilo)
+        blit.agregar(self.linea)
+        self.rango = None
+        localizador = mdates.AutoDateLocator()
+        ax.xaxis.set_major_locator(localizador)
+        ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(localizador))
+        ax.set_ylim(0, 1)
+
+    def _artistas_datos(self):
+        return [self.linea]
+
+    def reiniciar_rango(self):
+        """El próximo actualizar() sin rango ajusta el eje x a sus fechas en lugar de ampliarlo."""
+        self.rango = None
+
+    def actualizar(self, fechas, valores, rango=None):
+        """
+        rango: (desde, hasta) fijo para el eje x, o None para ampliarlo según las fechas.
+        Retorna True si cambiaron los límites de los ejes y hace falta un dibujado completo.
+        """
+        if not fechas:
+            return self.mostrar_mensaje()
+        x = mdates.date2num(np.array(fechas, dtype="datetime64[D]"))
+        self.linea.set_data(x, valores)
+        completo = False
+        if rango is not None:
+            desde, hasta = mdates.date2num(np.array(rango, dtype="datetime64[D]"))
+            rango = (desde - 0.5, hasta + 0.5)
+        else:
+            rango = (x[0] - 0.5, x[-1] + 0.5)
+            if self.rango is not None:
+                rango = (min(rango[0], self.rango[0]), max(rango[1], self.rango[1]))
+        if rango != self.rango:
+            self.rango = rango
+            self.ax.set_xlim(rango)
+            completo = True
+        tope = _nuevo_tope(self.ax, max(valores))
+        if tope is not None:
+            self.ax.set_ylim(0, tope)
+            completo = True
+        self._mostrar_datos()
+        return completo
+
+
+class GraficoHistogramas(_Grafico):
+    """
+    Un histograma escalonado (StepPatch) por serie sobre el mismo eje x, cada uno con
+    sus propias clases. Los escalones se crean de nuevo solo si cambian las series.
+    """
+
+    def __init__(self, ax, blit, mensaje_vacio="Sin datos", alpha=0.4):
+        super().__init__(ax, blit, mensaje_vacio)
+        self.alpha = alpha
+        self.nombres = None
+        self.escalones = []
+        ax.set_ylim(0, 1)
+
+    def _artistas_datos(self):
+        return self.escalones
+
+    def _crear_escalones(self, nombres):
+        for artista in self.escalones:
+            self.blit.quitar(artista)
+        self.escalones = [self.blit.agregar(self.ax.stairs([0], [0, 1], fill=True, alpha=self.alpha, color=f"C{i}"))
+                          for i in range(len(nombres))]
+        self.ax.legend(handles=[Patch(color=f"C{i}", alpha=self.alpha, label=nombre)
+                                for i, nombre in enumerate(nombres)], fontsize=10)
+
+    def actualizar(self, series):
+        """
+        series: {nombre: (cantidades, bordes)}, con len(bordes) == len(cantidades) + 1.
+        Retorna True si cambiaron las series o la escala y hace falta un dibujado completo.
+        """
+        if not series:
+            return self.mostrar_mensaje()
+        completo = False
+        nombres = list(series)
+        if nombres != self.nombres:
+            self._crear_escalones(nombres)
+            self.nombres = nombres
+            completo = True
+
+        maximo, izquierda, derecha = 0, math.inf, -math.inf
+        for escalon, (cantidades, bordes) in zip(self.escalones, series.values()):
+            escalon.set_data(cantidades, bordes)
+            maximo = max(maximo, max(cantidades))
+            izquierda = min(izquierda, bordes[0])
+            derecha = max(derecha, bordes[-1])
+
+        # El eje x se cambia si los datos no caben o si sobra más del doble de su ancho
+        desde, hasta = self.ax.get_xlim()
+        ancho = derecha - izquierda
+        if izquierda < desde or derecha > hasta or hasta - desde > 2 * ancho + 1 or completo:
+            margen = ancho * 0.05
+            self.ax.set_xlim(izquierda - margen, derecha + margen)
+            completo = True
+        tope = _nuevo_tope(self.ax, maximo)
+        if tope is not None:
+            self.ax.set_ylim(0, tope)
+            completo = True
+        self._mostrar_datos()
+        return completo
+
+
+class GraficoTorta(_Grafico):
+    """
+    Gráfico de pastel con el valor absoluto en cada porción. Si la cantidad de
+    porciones no cambia se actualizan los ángulos y textos de las existentes.
+    """
+
+    def __init__(self, ax, blit, mensaje_vacio="Sin datos", angulo_inicial=140, fontsize=12):
+        super().__init__(ax, blit, mensaje_vacio)
+        self.angulo_inicial = angulo_inicial
+        self.fontsize = fontsize
+        self.porciones = []
+        self.etiquetas = []
+        self.valores = []
+        ax.set(aspect="equal", frame_on=False, xticks=[], yticks=[], xlim=(-1.25, 1.25), ylim=(-1.25, 1.25))
+
+    def _artistas_datos(self):
+        return self.porciones + self.etiquetas + self.valores
+
+    def reiniciar_escala(self):
+        """Los ejes del pastel son fijos."""
+
+    def _crear_porciones(self, cantidad):
+        for artista in self._artistas_datos():
+            self.blit.quitar(artista)
+        porciones, etiquetas, valores = self.ax.pie(
+            [1] * cantidad, labels=[""] * cantidad, autopct=lambda pct: "", startangle=self.angulo_inicial,
+            colors=[f"C{i}" for i in range(cantidad)], textprops={'fontsize': self.fontsize})
+        self.porciones = [self.blit.agregar(artista) for artista in porciones]
+        self.etiquetas = [self.blit.agregar(artista) for artista in etiquetas]
+        self.valores = [self.blit.agregar(artista) for artista in valores]
+        # pie() vuelve a fijar los límites y el aspecto de los ejes; se conservan los de __init__
+        self.ax.set(aspect="equal", frame_on=False, xticks=[], yticks=[], xlim=(-1.25, 1.25), ylim=(-1.25, 1.25))
+
+    def actualizar(self, etiquetas, valores):
+        """Retorna False: las porciones son artistas animados y los ejes no cambian."""
+        total = sum(valores)
+        if not etiquetas or not total:
+            return self.mostrar_mensaje()
+        if len(etiquetas) != len(self.porciones):
+            self._crear_porciones(len(etiquetas))
+
+        # Mismos ángulos y posiciones que calcula Axes.pie
+        theta1 = self.angulo_inicial / 360
+        for porcion, etiqueta, texto_valor, nombre, valor in zip(
+                self.porciones, self.etiquetas, self.valores, etiquetas, valores):
+            theta2 = theta1 + valor / total
+            porcion.set_theta1(360 * theta1)
+            porcion.set_theta2(360 * theta2)
+            thetam = math.pi * (theta1 + theta2)
+            x, y = math.cos(thetam), math.sin(thetam)
+            etiqueta.set_position((1.1 * x, 1.1 * y))
+            etiqueta.set_horizontalalignment('left' if x > 0 else 'right')
+            etiqueta.set_text(nombre)
+            texto_valor.set_position((0.6 * x, 0.6 * y))
+            texto_valor.set_text(f"{valor}")
+            theta1 = theta2
+        self._mostrar_datos()
+        return False
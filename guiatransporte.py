@@ -4,7 +4,10 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QLabel, QLineEdi
 from PyQt5.QtCore import  QDate, Qt
 
 
+from catalogos import catalogos
 from consultas import OperacionesDB  # Asegúrate de importar la clase de operaciones DB
+from ejecutor_db import EjecutorDB
+from pdf_guias import ColaPDF
 import traceback
 
 
@@ -100,6 +103,11 @@ class GuiaTransporteApp(QWidget):
         self.resize(1000, 700)
 
         self.db_ops = OperacionesDB()  # Instanciamos la clase para usar sus métodos
+        self.ejecutor = EjecutorDB(self)  # Ejecuta las consultas fuera del hilo de la interfaz
+        self.ejecutor.ocupado_cambiado.connect(self.on_ocupado_cambiado)
+        self.cola_pdf = ColaPDF(self)  # Maqueta los PDF de las guías en otros procesos
+        self.cola_pdf.terminado.connect(self.on_pdf_terminado)
+        self.cola_pdf.fallido.connect(self.on_pdf_fallido)
         self.setup_ui()
         
         self.diccionario_animales = {}
@@ -245,6 +253,10 @@ class GuiaTransporteApp(QWidget):
         self.save_button.clicked.connect(self.guardar_todo)
         layout.addWidget(self.save_button)
 
+        # Estado de los PDF de las guías guardadas
+        self.estado_pdf_label = QLabel("")
+        layout.addWidget(self.estado_pdf_label)
+
         self.setLayout(layout)
 
         # Cargar los comboboxes
@@ -372,34 +384,57 @@ class GuiaTransporteApp(QWidget):
         print("Los datos de la seleccion", self.animal_combo.currentData())
 
 
+    # Los combos guardan el id de cada registro como dato asociado; los datos salen de
+    # la caché de catálogos compartida en lugar de consultar la base por cada combo
+    def llenar_combo(self, combo, registros):
+        # Al recargar los catálogos se reemplazan los registros (no el "Seleccione", con
+        # dato -1) y se conserva la selección si el registro sigue existiendo
+        seleccion = combo.currentData()
+        texto_anterior = combo.currentText()
+        combo.blockSignals(True)
+        for indice in reversed(range(combo.count())):
+            if combo.itemData(indice) != -1:
+                combo.removeItem(indice)
+        for value, text in registros:
+            combo.addItem(text, value)
+        combo.setCurrentIndex(max(combo.findData(seleccion), 0))
+        combo.blockSignals(False)
+        if combo.currentText() != texto_anterior:
+            combo.currentTextChanged.emit(combo.currentText())
+
+    def recargar_catalogos(self):
+        self.load_destinos()
+        self.load_plantas()
+        self.load_vehiculos()
+        self.load_conductores()
+
     def load_destinos(self):
-        destinos = self.db_ops.obtener_destinos()  # Llamamos al método para obtener destinos
-        
-        for text,value in destinos:
-            print(f"este es el texto {text} y este el valor {value}")
-        
-            self.destino_combo.addItem(text,value)
+        self.ejecutor.ejecutar("destinos", catalogos.lista, "establecimientos",
+                               al_terminar=lambda destinos: self.llenar_combo(self.destino_combo, destinos))
 
     def load_plantas(self):
-        plantas = self.db_ops.obtener_plantas()  # Llamamos al método para obtener plantas
-        self.planta_combo.addItems(plantas)
+        self.ejecutor.ejecutar("plantas", catalogos.lista, "plantas",
+                               al_terminar=lambda plantas: self.llenar_combo(self.planta_combo, plantas))
 
     def load_vehiculos(self):
-        vehiculos = self.db_ops.obtener_vehiculos()  # Llamamos al método para obtener vehículos
-        self.vehiculo_combo.addItems(vehiculos)
+        self.ejecutor.ejecutar("vehiculos", catalogos.lista, "vehiculos",
+                               al_terminar=lambda vehiculos: self.llenar_combo(self.vehiculo_combo, vehiculos))
 
     def load_conductores(self):
-        conductores = self.db_ops.obtener_conductores()  # Llamamos al método para obtener conductores
-        self.conductor_combo.addItems(conductores)
+        self.ejecutor.ejecutar("conductores", catalogos.lista, "conductores",
+                               al_terminar=lambda conductores: self.llenar_combo(self.conductor_combo, conductores))
 
     def load_animales(self):
         # Obtener el destino y la fecha seleccionados
         destino = self.destino_combo.currentText()
         fecha = self.fecha_input.date().toString("yyyy-MM-dd")
 
-        # Obtener los animales y su correspondiente id_ingreso_detalle desde la base de datos
-        animales = self.db_ops.obtener_animales(destino, fecha)
+        # Obtener los animales y su correspondiente id_ingreso_detalle desde la base de datos.
+        # Si el destino o la fecha cambian de nuevo antes de terminar, se cancela esta consulta.
+        self.ejecutor.ejecutar("animales", self.db_ops.obtener_animales, destino, fecha,
+                               al_terminar=self.mostrar_animales)
 
+    def mostrar_animales(self, animales):
         # Limpiar el combo box de animales
         self.animal_combo.clear()
         #limpiamos el diccionario para evitar duplicidad en los datos
@@ -429,6 +464,31 @@ class GuiaTransporteApp(QWidget):
         # Actualizar los animales disponibles cuando el destino o fecha cambian
         self.load_animales()
 
+    def on_ocupado_cambiado(self, canal, ocupado):
+        if canal == "guardar":
+            self.save_button.setEnabled(not ocupado)
+
+    def on_guia_guardada(self, id_guia, id_destino):
+        self.limpiar()
+        self.mostrar_estado_pdf(f"Guía {id_guia} guardada, generando su PDF...")
+        # Un canal por guía: guardar otra guía no cancela la consulta de esta
+        self.ejecutor.ejecutar(f"pdf_{id_guia}", self.db_ops.obtener_datos_pdf, id_guia, id_destino,
+                               al_terminar=lambda datos: self.cola_pdf.encolar(id_guia, datos),
+                               al_fallar=lambda e: self.on_pdf_fallido(id_guia, str(e)))
+
+    def on_pdf_terminado(self, id_guia, ruta):
+        self.mostrar_estado_pdf(f"PDF de la guía {id_guia} listo: {ruta}")
+
+    def on_pdf_fallido(self, id_guia, mensaje):
+        self.mostrar_estado_pdf(f"No se pudo generar el PDF de la guía {id_guia}")
+        self.mostrar_mensaje("Error", f"No se pudo generar el PDF de la guía {id_guia}: {mensaje}")
+
+    def mostrar_estado_pdf(self, mensaje):
+        pendientes = self.cola_pdf.pendientes()
+        if pendientes:
+            mensaje += f" ({pendientes} PDF en cola)"
+        self.estado_pdf_label.setText(mensaje)
+
     def limpiar(self):
         self.data_table.setRowCount(0)
         self.decomiso_table.setRowCount(0)
@@ -440,10 +500,11 @@ class GuiaTransporteApp(QWidget):
         try:
             # Recolectar datos generales del formulario
             fecha = self.fecha_input.date().toString("yyyy-MM-dd")
-            id_planta = self.planta_combo.currentIndex() + 1  # Asume que los índices coinciden con los ID
-            id_destino = self.destino_combo.currentIndex()
-            id_vehiculo = self.vehiculo_combo.currentIndex() + 1
-            id_conductores = self.conductor_combo.currentIndex() + 1
+            # Cada combo guarda el id real del registro
+            id_planta = self.planta_combo.currentData()
+            id_destino = self.destino_combo.currentData()
+            id_vehiculo = self.vehiculo_combo.currentData()
+            id_conductores = self.conductor_combo.currentData()
             
             print(f"este es el id del destino {id_destino}")
     
@@ -526,9 +587,12 @@ class GuiaTransporteApp(QWidget):
                 msg.exec_()
             else:
                 print("La Lista Tiene Datos")
+                if self.ejecutor.en_curso("guardar"):
+                    return  # Evita guardar la misma guía dos veces por un doble clic
                 # Llamar al back-end para almacenar los datos
-                self.db_ops.guardar_datos_backend(datos_para_guardar)
-                self.limpiar()
+                self.ejecutor.ejecutar("guardar", self.db_ops.guardar_datos_backend, datos_para_guardar,
+                                       al_terminar=lambda id_guia: self.on_guia_guardada(id_guia, id_destino),
+                                       al_fallar=lambda e: self.mostrar_mensaje("Error", str(e)))
 
         except Exception as e:
             self.mostrar_mensaje("Error", f"Ocurrió un error al recolectar los datos: {str(e)}")
@@ -48,7 +48,10 @@ class InstallGUI(QWidget):
         self.progress.setValue(3)
         
         self.log_message("Configurando base de datos...")
-        self.configurar_base_datos()
+        if not self.configurar_base_datos():
+            self.log_message("Instalación detenida: la aplicación no puede funcionar sin la base de datos.")
+            self.start_button.setEnabled(True)
+            return
         self.progress.setValue(4)
         
         self.log_message("Ejecutando aplicación...")
@@ -87,14 +90,27 @@ class InstallGUI(QWidget):
         self.log_message("Dependencias instaladas correctamente.\n")
     
     def configurar_base_datos(self):
+        """Crea la base y aplica las migraciones de esquema.py en este mismo proceso. Retorna True si quedó lista."""
+        conexion = None
         try:
+            # Se importa aquí porque sus dependencias se instalan en el paso anterior
+            import esquema
+
             conexion = pymysql.connect(host="localhost", user="root", password="")
-            cursor = conexion.cursor()
-            cursor.execute("CREATE DATABASE IF NOT EXISTS proyectoevc;")
-            conexion.close()
+            with conexion.cursor() as cursor:
+                cursor.execute("CREATE DATABASE IF NOT EXISTS proyectoevc;")
+            conexion.select_db("proyectoevc")
+            # Crear tablas e índices con las migraciones versionadas del proyecto
+            aplicadas = esquema.aplicar_migraciones(conexion)
+            self.log_message(f"Migraciones aplicadas: {aplicadas or 'ninguna, el esquema está al día'}")
             self.log_message("Base de datos configurada exitosamente.\n")
+            return True
         except Exception as e:
             self.log_message(f"Error al configurar la base de datos: {e}\n")
+            return False
+        finally:
+            if conexion:
+                conexion.close()
     
     def ejecutar_aplicacion(self):
         try:
@@ -0,0 +1,305 @@
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+# Límites superiores (ms) de las clases del histograma de tiempos por método
+LIMITES_HISTOGRAMA_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Sentencias más lentas que esto se escriben en el registro de consultas lentas
+UMBRAL_LENTA_MS = float(os.environ.get("EVC_CONSULTA_LENTA_MS", 500))
+
+ARCHIVO_LENTAS = os.path.join("logs", "consultas_lentas.log")
+
+# Largo máximo de los parámetros en el registro (los INSERT de varias filas tienen miles)
+MAX_PARAMETROS_LOG = 2000
+
+
+class MetricasMetodo:
+    """Contadores acumulados de un método de OperacionesDB."""
+
+    def __init__(self):
+        self.llamadas = 0
+        self.errores = 0
+        self.tiempo_total_ms = 0.0
+        self.tiempo_max_ms = 0.0
+        self.filas = 0
+        self.viajes = 0
+        self.adquisicion_ms = 0.0
+        self.histograma = [0] * (len(LIMITES_HISTOGRAMA_MS) + 1)
+
+    def registrar(self, tiempo_ms, filas, viajes, adquisicion_ms, error):
+        self.llamadas += 1
+        self.errores += 1 if error else 0
+        self.tiempo_total_ms += tiempo_ms
+        self.tiempo_max_ms = max(self.tiempo_max_ms, tiempo_ms)
+        self.filas += filas
+        self.viajes += viajes
+        self.adquisicion_ms += adquisicion_ms
+        for i, limite in enumerate(LIMITES_HISTOGRAMA_MS):
+            if tiempo_ms <= limite:
+                self.histograma[i] += 1
+                break
+        else:
+            self.histograma[-1] += 1
+
+    def percentil(self, p):
+        """Estimación del percentil p (0-100) a partir del histograma: límite superior de su clase."""
+        if not self.llamadas:
+            return None
+        objetivo = self.llamadas * p / 100
+        acumulado = 0
+        for i, cantidad in enumerate(self.histograma):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return LIMITES_HISTOGRAMA_MS[i] if i < len(LIMITES_HISTOGRAMA_MS) else self.tiempo_max_ms
+        return self.tiempo_max_ms
+
+    def como_dict(self):
+        return {
+            "llamadas": self.llamadas,
+            "errores": self.errores,
+            "tiempo_total_ms": self.tiempo_total_ms,
+            "tiempo_promedio_ms": self.tiempo_total_ms / self.llamadas if self.llamadas else 0.0,
+            "tiempo_max_ms": self.tiempo_max_ms,
+            "p50_ms": self.percentil(50),
+            "p95_ms": self.percentil(95),
+            "p99_ms": self.percentil(99),
+            "filas": self.filas,
+            "viajes": self.viajes,
+            "adquisicion_ms": self.adquisicion_ms,
+            "histograma": list(zip(LIMITES_HISTOGRAMA_MS + (None,), self.histograma)),
+        }
+
+
+class _Medicion:
+    """Lo que acumula una llamada en curso mientras ejecuta sus sentencias."""
+
+    def __init__(self, metodo):
+        self.metodo = metodo
+        self.filas = 0
+        self.viajes = 0
+        self.adquisicion_ms = 0.0
+
+
+class RegistroMetricas:
+    """
+    Métricas por método de OperacionesDB: tiempo, filas, viajes a la base y tiempo de
+    obtención de la conexión, con un histograma de tiempos. Es seguro entre hilos.
+    """
+
+    def __init__(self, umbral_lenta_ms=UMBRAL_LENTA_MS, archivo_lentas=ARCHIVO_LENTAS):
+        self.umbral_lenta_ms = umbral_lenta_ms
+        self.archivo_lentas = archivo_lentas
+        self._lock = threading.Lock()
+        self._metodos = {}
+        self._local = threading.local()
+        self._log_lentas = None
+
+    def configurar(self, umbral_lenta_ms=None, archivo_lentas=None):
+        """Cambia el umbral de consultas lentas (ms) y/o el archivo donde se registran."""
+        with self._lock:
+            if umbral_lenta_ms is not None:
+                self.umbral_lenta_ms = umbral_lenta_ms
+            if archivo_lentas is not None and archivo_lentas != self.archivo_lentas:
+                self.archivo_lentas = archivo_lentas
+                self._cerrar_log()
+
+    # Llamadas en curso (una pila por hilo, porque un método puede llamar a otro)
+
+    def _pila(self):
+        pila = getattr(self._local, "pila", None)
+        if pila is None:
+            pila = self._local.pila = []
+        return pila
+
+    def _medicion_actual(self):
+        pila = self._pila()
+        return pila[-1] if pila else None
+
+    def iniciar(self, metodo):
+        medicion = _Medicion(metodo)
+        self._pila().append(medicion)
+        return medicion
+
+    def terminar(self, medicion, tiempo_ms, error):
+        pila = self._pila()
+        pila.pop()
+        if pila:
+            # El método que hizo la llamada también incluye lo que consultó el anidado
+            pila[-1].filas += medicion.filas
+            pila[-1].viajes += medicion.viajes
+            pila[-1].adquisicion_ms += medicion.adquisicion_ms
+        with self._lock:
+            metricas = self._metodos.setdefault(medicion.metodo, MetricasMetodo())
+            metricas.registrar(tiempo_ms, medicion.filas, medicion.viajes, medicion.adquisicion_ms, error)
+
+    def registrar_adquisicion(self, tiempo_ms):
+        medicion = self._medicion_actual()
+        if medicion:
+            medicion.adquisicion_ms += tiempo_ms
+
+    def registrar_viaje(self, sql=None, params=None, tiempo_ms=0.0, filas=0):
+        medicion = self._medicion_actual()
+        if medicion:
+            medicion.viajes += 1
+            medicion.filas += filas
+        if sql is not None and tiempo_ms >= self.umbral_lenta_ms:
+            self._registrar_lenta(medicion.metodo if medicion else None, sql, params, tiempo_ms, filas)
+
+    # Registro de consultas lentas
+
+    def _cerrar_log(self):
+        if self._log_lentas:
+            for handler in list(self._log_lentas.handlers):
+                self._log_lentas.removeHandler(handler)
+                handler.close()
+            self._log_lentas = None
+
+    def _logger(self):
+        with self._lock:
+            if self._log_lentas is None:
+                directorio = os.path.dirname(self.archivo_lentas)
+                if directorio:
+                    os.makedirs(directorio, exist_ok=True)
+                logger = logging.getLogger("consultas_lentas")
+                logger.setLevel(logging.WARNING)
+                logger.propagate = False
+                handler = RotatingFileHandler(self.archivo_lentas, maxBytes=1024 * 1024, backupCount=5,
+                                              encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                logger.addHandler(handler)
+                self._log_lentas = logger
+            return self._log_lentas
+
+    def _registrar_lenta(self, metodo, sql, params, tiempo_ms, filas):
+        parametros = repr(params)
+        if len(parametros) > MAX_PARAMETROS_LOG:
+            parametros = parametros[:MAX_PARAMETROS_LOG] + "..."
+        try:
+            self._logger().warning("%.1f ms metodo=%s filas=%d sql=%s parametros=%s",
+                                   tiempo_ms, metodo or "-", filas, " ".join(sql.split()), parametros)
+        except OSError as e:
+            print(f"Error al escribir el registro de consultas lentas: {e}")
+
+    # Lectura de los contadores
+
+    def instantanea(self):
+        """Diccionario metodo -> métricas (ver MetricasMetodo.como_dict)."""
+        with self._lock:
+            return {metodo: metricas.como_dict() for metodo, metricas in self._metodos.items()}
+
+    def reiniciar(self):
+        with self._lock:
+            self._metodos = {}
+
+    def reporte(self):
+        """Tabla de texto con las métricas de cada método, ordenada por tiempo total."""
+        filas = sorted(self.instantanea().items(), key=lambda item: item[1]["tiempo_total_ms"], reverse=True)
+        ancho = max([len("método")] + [len(metodo) for metodo, _ in filas])
+        lineas = [f"{'método':<{ancho}} {'llamadas':>8} {'prom ms':>8} {'p95 ms':>7} {'máx ms':>8} "
+                  f"{'filas':>8} {'viajes':>7} {'conexión ms':>11}"]
+        for metodo, m in filas:
+            lineas.append(f"{metodo:<{ancho}} {m['llamadas']:>8} {m['tiempo_promedio_ms']:>8.1f} "
+                          f"{m['p95_ms']:>7.0f} {m['tiempo_max_ms']:>8.1f} {m['filas']:>8} "
+                          f"{m['viajes']:>7} {m['adquisicion_ms']:>11.1f}")
+        return "\n".join(lineas)
+
+
+# Instancia única del proceso
+metricas = RegistroMetricas()
+
+
+def medir(funcion, nombre=None):
+    """Envuelve funcion para que cada llamada quede registrada en metricas."""
+    nombre = nombre or funcion.__qualname__
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        medicion = metricas.iniciar(nombre)
+        inicio = time.perf_counter()
+        error = False
+        try:
+            return funcion(*args, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            metricas.terminar(medicion, (time.perf_counter() - inicio) * 1000, error)
+
+    return envoltura
+
+
+def instrumentar(clase):
+    """Decorador de clase: mide todos los métodos públicos de la clase."""
+    for nombre, valor in list(vars(clase).items()):
+        if inspect.isfunction(valor) and not nombre.startswith("_"):
+            setattr(clase, nombre, medir(valor, f"{clase.__name__}.{nombre}"))
+    return clase
+
+
+def _filas_afectadas(cursor):
+    filas = getattr(cursor, "rowcount", -1)
+    # Los cursores sin búfer no conocen el total de filas (-1 o 2**64 - 1)
+    return filas if isinstance(filas, int) and 0 <= filas < 2 ** 63 else 0
+
+
+class _CursorMedido:
+    """Cursor que cuenta cada sentencia como un viaje a la base y la cronometra."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._cursor.close()
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _medir(self, ejecutar, sql, params):
+        inicio = time.perf_counter()
+        try:
+            return ejecutar(sql, params)
+        finally:
+            metricas.registrar_viaje(sql, params, (time.perf_counter() - inicio) * 1000,
+                                     _filas_afectadas(self._cursor))
+
+    def execute(self, sql, params=None):
+        return self._medir(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, params):
+        return self._medir(self._cursor.executemany, sql, params)
+
+
+class ConexionMedida:
+    """Conexión cuyos cursores, begin, commit y rollback se cuentan en metricas."""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __getattr__(self, nombre):
+        return getattr(self._connection, nombre)
+
+    def cursor(self, *args):
+        return _CursorMedido(self._connection.cursor(*args))
+
+    def begin(self):
+        metricas.registrar_viaje()
+        return self._connection.begin()
+
+    def commit(self):
+        metricas.registrar_viaje()
+        return self._connection.commit()
+
+    def rollback(self):
+        metricas.registrar_viaje()
+        return self._connection.rollback()
@@ -1,42 +1,40 @@
+import time
+
+# Referencia para medir el tiempo hasta la primera ventana (antes de las importaciones pesadas)
+INICIO_PROCESO = time.perf_counter()
+
+import importlib
 import sys
-import os
-import subprocess
-import psutil  
-from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, QStackedWidget, QHBoxLayout
-
-from entradaproducto import AnimalForm
-from estadisticas import Estadisticas
-from guiatransporte import GuiaTransporteApp
-from tabs_buscador import ConsultaWidget
-
-def iniciar_xampp():
-    """Verifica si XAMPP ya está corriendo, si no, lo inicia."""
-    if os.name == "nt":  # Windows
-        apache_running = any("httpd.exe" in p.name() for p in psutil.process_iter())
-        mysql_running = any("mysqld.exe" in p.name() for p in psutil.process_iter())
-        
-        if not apache_running or not mysql_running:
-            try:
-                subprocess.run(["C:\\xampp\\xampp_start.exe"], shell=True)
-            except Exception as e:
-                print(f"Error al iniciar XAMPP: {e}")
-        else:
-            print("XAMPP ya está en ejecución.")
-    else:  # Linux
-        try:
-            subprocess.run(["sudo", "/opt/lampp/lampp", "start"])
-        except Exception as e:
-            print(f"Error al iniciar XAMPP: {e}")
+from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtGui import QFont, QKeySequence
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, QStackedWidget,
+                             QHBoxLayout, QLabel, QShortcut, QDialog, QPlainTextEdit)
+
+from conexion import ConexionDB
+from instrumentacion import metricas
+from servidor_db import VerificadorServidor
+
+# (módulo, clase, precalentar) de cada pantalla del menú lateral. Los módulos se importan
+# al construir la pantalla, así matplotlib, numpy y reportlab no se cargan al arrancar.
+# Estadísticas no se precalienta para que matplotlib solo se cargue si se abre esa pantalla.
+PANTALLAS = [
+    ("entradaproducto", "AnimalForm", True),
+    ("guiatransporte", "GuiaTransporteApp", True),
+    ("tabs_buscador", "ConsultaWidget", True),
+    ("estadisticas", "Estadisticas", False),
+]
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, precalentar=True, al_mostrarse=None, conectar=True):
+        """
+        precalentar: construir las pantallas restantes una por una después de mostrar la ventana.
+        al_mostrarse: función que recibe los milisegundos hasta la primera ventana.
+        conectar: verificar (e iniciar si hace falta) el servidor de base de datos al mostrarse.
+        """
         super().__init__()
         self.setWindowTitle("PBA")
         self.setGeometry(100, 100, 800, 600)
 
-        # Iniciar XAMPP antes de cargar la aplicación
-        iniciar_xampp()
-
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
         main_layout = QHBoxLayout(main_widget)
@@ -62,6 +60,16 @@ class MainWindow(QMainWindow):
         sidebar_layout.addWidget(btn_pantalla4)
         sidebar_layout.addStretch()
 
+        # Establecimientos, plantas, vehículos y conductores nuevos en la base (F5)
+        btn_catalogos = QPushButton("Actualizar catálogos")
+        btn_catalogos.clicked.connect(self.actualizar_catalogos)
+        sidebar_layout.addWidget(btn_catalogos)
+
+        # Se habilitan cuando el servidor de base de datos responde
+        self.botones_menu = [btn_animal_form, btn_guia_form, btn_pantalla3, btn_pantalla4, btn_catalogos]
+        for boton in self.botones_menu:
+            boton.setEnabled(False)
+
         sidebar_widget = QWidget()
         sidebar_widget.setStyleSheet("""
             QWidget {
@@ -87,18 +95,167 @@ class MainWindow(QMainWindow):
         sidebar_widget.setFixedWidth(150)
         main_layout.addWidget(sidebar_widget, 1)
 
+        # Cada pantalla se construye la primera vez que se abre; mientras tanto
+        # el QStackedWidget tiene un QWidget vacío en su posición
+        self.pantallas_construidas = set()
         self.stacked_widget = QStackedWidget()
-        self.stacked_widget.addWidget(AnimalForm())
-        self.stacked_widget.addWidget(GuiaTransporteApp())
-        self.stacked_widget.addWidget(ConsultaWidget())
-        self.stacked_widget.addWidget(Estadisticas())
+        for _ in PANTALLAS:
+            self.stacked_widget.addWidget(QWidget())
         main_layout.addWidget(self.stacked_widget, 4)
 
+        # Pantalla de espera mientras se verifica el servidor de base de datos
+        self.pagina_conexion = QWidget()
+        conexion_layout = QVBoxLayout(self.pagina_conexion)
+        conexion_layout.addStretch()
+        self.conexion_label = QLabel("Conectando con la base de datos...")
+        self.conexion_label.setAlignment(Qt.AlignCenter)
+        self.conexion_label.setWordWrap(True)
+        conexion_layout.addWidget(self.conexion_label)
+        self.reintentar_button = QPushButton("Reintentar")
+        self.reintentar_button.clicked.connect(self.verificar_servidor)
+        self.reintentar_button.hide()
+        conexion_layout.addWidget(self.reintentar_button, alignment=Qt.AlignCenter)
+        conexion_layout.addStretch()
+        self.stacked_widget.addWidget(self.pagina_conexion)
+        self.stacked_widget.setCurrentWidget(self.pagina_conexion)
+
+        self.precalentar = precalentar
+        self.al_mostrarse = al_mostrarse
+        self.primera_ventana_ms = None
+        self.conectar = conectar
+
+        # Métricas de las consultas a la base (Ctrl+Shift+M)
+        QShortcut(QKeySequence("Ctrl+Shift+M"), self, self.mostrar_metricas)
+        QShortcut(QKeySequence("F5"), self, self.actualizar_catalogos)
+        self.servidor_listo = False
+        self.verificador = None
+
+    def construir_pantalla(self, index):
+        """Reemplaza el marcador de la posición index por la pantalla real."""
+        if index in self.pantallas_construidas:
+            return
+        self.pantallas_construidas.add(index)
+        inicio = time.perf_counter()
+        modulo, clase, _ = PANTALLAS[index]
+        pantalla = getattr(importlib.import_module(modulo), clase)()
+        marcador = self.stacked_widget.widget(index)
+        self.stacked_widget.removeWidget(marcador)
+        marcador.deleteLater()
+        self.stacked_widget.insertWidget(index, pantalla)
+        print(f"Pantalla {pantalla.__class__.__name__} construida en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
     def cambiar_pantalla(self, index):
+        self.construir_pantalla(index)
         self.stacked_widget.setCurrentIndex(index)
 
+    def actualizar_catalogos(self):
+        """Descarta la caché de catálogos y recarga los combos de las pantallas ya construidas."""
+        if not self.servidor_listo:
+            return
+        from catalogos import catalogos
+        catalogos.invalidar()
+        for index in sorted(self.pantallas_construidas):
+            pantalla = self.stacked_widget.widget(index)
+            if hasattr(pantalla, "recargar_catalogos"):
+                pantalla.recargar_catalogos()
+        self.statusBar().showMessage("Actualizando catálogos...", 5000)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.primera_ventana_ms is None:
+            # singleShot(0) corre después de que se procesa el primer pintado
+            QTimer.singleShot(0, self.on_primer_pintado)
+
+    def on_primer_pintado(self):
+        if self.primera_ventana_ms is not None:
+            return
+        self.primera_ventana_ms = (time.perf_counter() - INICIO_PROCESO) * 1000
+        print(f"Tiempo hasta la primera ventana: {self.primera_ventana_ms:.0f} ms")
+        if self.al_mostrarse:
+            self.al_mostrarse(self.primera_ventana_ms)
+        # Con la ventana ya visible se verifica el servidor sin bloquear la interfaz
+        if self.conectar:
+            self.verificar_servidor()
+
+    def verificar_servidor(self):
+        """Inicia la verificación del servidor de base de datos en un hilo aparte."""
+        if self.verificador is not None and self.verificador.isRunning():
+            return
+        self.reintentar_button.hide()
+        self.mostrar_estado_conexion("Conectando con la base de datos...")
+        self.verificador = VerificadorServidor(ConexionDB().host, parent=self)
+        self.verificador.estado_cambiado.connect(self.mostrar_estado_conexion)
+        self.verificador.listo.connect(self.on_servidor_listo)
+        self.verificador.fallido.connect(self.on_servidor_fallido)
+        self.verificador.start()
+
+    def mostrar_estado_conexion(self, mensaje):
+        self.conexion_label.setText(mensaje)
+        self.statusBar().showMessage(mensaje)
+
+    def on_servidor_listo(self):
+        self.servidor_listo = True
+        self.statusBar().showMessage("Conectado a la base de datos", 5000)
+        for boton in self.botones_menu:
+            boton.setEnabled(True)
+        self.cambiar_pantalla(0)
+        if self.precalentar:
+            QTimer.singleShot(0, self.precalentar_siguiente)
+
+    def on_servidor_fallido(self, mensaje):
+        self.mostrar_estado_conexion(mensaje)
+        self.reintentar_button.show()
+
+    def mostrar_metricas(self):
+        """Muestra los contadores por método de OperacionesDB."""
+        dialogo = QDialog(self)
+        dialogo.setWindowTitle("Métricas de consultas")
+        dialogo.resize(1000, 500)
+        layout = QVBoxLayout(dialogo)
+        texto = QPlainTextEdit()
+        texto.setReadOnly(True)
+        texto.setFont(QFont("Monospace"))
+        texto.setLineWrapMode(QPlainTextEdit.NoWrap)
+        layout.addWidget(texto)
+
+        botones = QHBoxLayout()
+        actualizar_button = QPushButton("Actualizar")
+        actualizar_button.clicked.connect(lambda: texto.setPlainText(metricas.reporte()))
+        reiniciar_button = QPushButton("Reiniciar")
+        reiniciar_button.clicked.connect(lambda: (metricas.reiniciar(), texto.setPlainText(metricas.reporte())))
+        botones.addWidget(actualizar_button)
+        botones.addWidget(reiniciar_button)
+        botones.addStretch()
+        layout.addLayout(botones)
+
+        texto.setPlainText(metricas.reporte())
+        dialogo.show()
+
+    def closeEvent(self, event):
+        if self.verificador is not None:
+            self.verificador.requestInterruption()
+            self.verificador.wait()
+        super().closeEvent(event)
+
+    def precalentar_siguiente(self):
+        """Construye una pantalla pendiente por vuelta del ciclo de eventos, sin bloquear la interfaz."""
+        pendientes = [i for i, (_, _, precalentar) in enumerate(PANTALLAS)
+                      if precalentar and i not in self.pantallas_construidas]
+        if not pendientes:
+            return
+        self.construir_pantalla(pendientes[0])
+        QTimer.singleShot(50, self.precalentar_siguiente)
+
 if __name__ == "__main__":
+    # Los procesos de pdf_guias.ColaPDF arrancan este mismo ejecutable cuando está empaquetado.
+    # multiprocessing se importa aquí y no arriba para no sumarlo a tiempo_importacion.py
+    import multiprocessing
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
-    window = MainWindow()
+    if "--medir-arranque" in sys.argv:
+        # Mide el tiempo hasta la primera ventana y cierra la aplicación
+        window = MainWindow(precalentar=False, conectar=False, al_mostrarse=lambda ms: app.quit())
+    else:
+        window = MainWindow()
     window.showMaximized()
     sys.exit(app.exec_())
\ No newline at end of file
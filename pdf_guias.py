@@ -0,0 +1,412 @@
+"""
+Generación de los PDF de guías de transporte en un pool de procesos.
+
+guardar_datos_backend solo guarda la guía. GuiaTransporteApp consulta después los
+datos del PDF con OperacionesDB.obtener_datos_pdf (en un hilo de EjecutorDB) y los
+entrega a ColaPDF, que maqueta cada PDF con reportlab en un proceso aparte. Así la
+pantalla responde apenas se confirma la transacción y varias guías guardadas
+seguidas se maquetan en paralelo, una por núcleo.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+# Carpeta donde quedan los PDF de las guías
+DIRECTORIO_PDF = "reportes_pdf"
+
+# Estados de un trabajo de ColaPDF
+EN_COLA = "en cola"
+LISTO = "listo"
+ERROR = "error"
+
+
+def renderizar_guia(id_guia_transporte, datos, directorio=DIRECTORIO_PDF):
+    """
+    Maqueta el PDF de la guía con los datos de OperacionesDB.obtener_datos_pdf y
+    retorna la ruta del archivo. Se ejecuta en los procesos de ColaPDF, por eso solo
+    recibe datos que se pueden serializar y no consulta la base.
+    """
+    # reportlab se importa aquí para no cargarlo al arrancar la aplicación
+    from reportlab.lib.pagesizes import legal
+    from reportlab.platypus import Table, TableStyle
+    from reportlab.lib import colors
+    from reportlab.pdfgen import canvas
+
+    guia = datos["guia"]
+    detalles = datos["detalles"]
+    decomisos = datos["decomisos"]
+    destino = datos["destino"]
+
+    # Crear el PDF con tamaño oficio. Se escribe con otro nombre y se renombra al final,
+    # así nunca queda a la vista un PDF a medio escribir
+    os.makedirs(directorio, exist_ok=True)
+    destino_final = os.path.join(directorio, f"guia_transporte_{id_guia_transporte}.pdf")
+    temporal = destino_final + ".tmp"
+    c = canvas.Canvas(temporal, pagesize=legal)  # Cambiar a tamaño oficio
+    c.setFont("Helvetica", 10)
+
+    fecha = guia.get('fecha', 'N/A')
+    fecha_obj = str(fecha.year)[-2:]
+
+    # Posición inicial de los títulos
+    y_position = 950  # Ajustar la posición inicial para el tamaño oficio
+
+    codigo_invima = "N/A"
+    if detalles:
+        especies = set(detalle.get('especie', '').lower() for detalle in detalles)
+        if len(especies) == 1:
+            especie = especies.pop()
+            if especie in ['bovino', 'bovinos','Bovino', 'Bovinos']:
+                codigo_invima = "567 B"
+            elif especie in ['porcino', 'porcinos','Porcino', 'Porcinos']:
+                codigo_invima = "150 P"
+
+    # Definir los textos y sus colores
+    texto1 = str(id_guia_transporte)  # Convertir a string
+    color1 = colors.green  # Color para id_guia_transporte
+    texto2 = codigo_invima  # Código INVIMA
+    texto3 = fecha_obj  # Fecha (ajusta esto según tu variable real)
+    color2 = colors.red  # Color para codigo_invima
+    color3 = colors.red  # Color para fecha_obj (puedes cambiarlo)
+
+    # Definir el margen más estrecho
+    margen_izquierdo = 15  # Margen izquierdo
+    separacion = 5  # Espacio entre los textos
+
+    # Cambiar el tamaño de la fuente para los textos
+    tamanio_fuente = 16  # Tamaño de fuente más grande
+    c.setFont("Helvetica-Bold", tamanio_fuente)
+
+    # Calcular el ancho de los textos
+    ancho_texto1 = c.stringWidth(texto1, "Helvetica-Bold", tamanio_fuente)
+    ancho_texto2 = c.stringWidth(texto2, "Helvetica-Bold", tamanio_fuente)
+    ancho_texto3 = c.stringWidth(texto3, "Helvetica-Bold", tamanio_fuente)
+    ancho_guion = c.stringWidth("-", "Helvetica-Bold", tamanio_fuente)
+
+    # Dibujar texto1 (id_guia_transporte) en verde
+    c.setFillColor(color1)
+    c.drawString(margen_izquierdo, y_position, texto1)
+
+    # Dibujar el primer guion
+    c.setFillColor(colors.black)  # Color del guion
+    c.drawString(margen_izquierdo + ancho_texto1 + separacion, y_position, "-")
+
+    # Dibujar texto2 (codigo_invima) en rojo
+    c.setFillColor(color2)
+    c.drawString(margen_izquierdo + ancho_texto1 + separacion + ancho_guion + separacion, y_position, texto2)
+
+    # Dibujar el segundo guion
+    c.setFillColor(colors.black)  # Color del guion
+    c.drawString(margen_izquierdo + ancho_texto1 + separacion + ancho_guion + separacion + ancho_texto2 + separacion, y_position, "-")
+
+    # Dibujar texto3 (fecha_obj) en azul
+    c.setFillColor(color3)
+    c.drawString(margen_izquierdo + ancho_texto1 + separacion + ancho_guion + separacion + ancho_texto2 + separacion + ancho_guion + separacion, y_position, texto3)
+
+    # --- Agregar recuadro con texto en la parte derecha ---
+    # Texto que irá dentro del recuadro
+    texto_recuadro = str(destino.get("marca_diferencial", "N/A"))  # Texto como cadena
+    tamanio_fuente_recuadro = 12
+    color_texto_recuadro = colors.black
+    color_fondo_recuadro = colors.yellow
+
+    # Ancho fijo del recuadro
+    ancho_recuadro = 50  # Ancho fijo en puntos
+    alto_recuadro = 50  # Altura del recuadro
+
+    # Definir el margen derecho
+    margen_derecho = 30  # Margen derecho
+    ancho_pagina = legal[0]  # Ancho de la página (612 puntos para tamaño oficio)
+
+    # Calcular la posición del recuadro
+    x_recuadro = ancho_pagina - margen_derecho - ancho_recuadro  # Alinear a la derecha
+    y_recuadro = 980  # Posición vertical del recuadro (ajustada para tamaño oficio)
+
+    # Dibujar el recuadro amarillo con borde negro
+    c.setFillColor(color_fondo_recuadro)
+    c.setStrokeColor(colors.black)  # Color del borde
+    c.setLineWidth(1)  # Grosor del borde (1px)
+    c.rect(x_recuadro, y_recuadro - alto_recuadro, ancho_recuadro, alto_recuadro, fill=1, stroke=1)
+
+    # Dibujar el texto dentro del recuadro
+    c.setFillColor(color_texto_recuadro)
+    c.setFont("Helvetica-Bold", tamanio_fuente_recuadro)
+
+    # Centrar el texto horizontalmente dentro del recuadro
+    ancho_linea = c.stringWidth(texto_recuadro, "Helvetica-Bold", tamanio_fuente_recuadro)
+    x_texto = x_recuadro + (ancho_recuadro - ancho_linea) / 2  # Centrar horizontalmente
+
+    # Centrar el texto verticalmente dentro del recuadro
+    y_texto = y_recuadro - alto_recuadro + (alto_recuadro / 2) - (tamanio_fuente_recuadro / 2)  # Centrar verticalmente
+
+    # Dibujar el texto centrado
+    c.drawString(x_texto, y_texto, texto_recuadro)
+
+    # Ajustar la posición vertical para el siguiente contenido
+    y_position -= 15  # Espacio después del recuadro
+
+    # TITULOS Y DATOS
+    c.setFillColor(colors.red)
+    c.setFont("Helvetica-Bold", 10)
+    c.drawString(30, y_position, f"1. IDENTIFICACION DE LA PLANTA DE BENEFICIO DE PROCEDENCIA")
+    y_position -= 15
+    c.setFont("Helvetica-Oblique", 10)
+    c.drawString(30, y_position, f"emp.varias@caicedonia-valle.gov.co")
+    y_position -= 15
+
+    # Informacion General De La Planta
+    info = [
+        ["Planta", guia.get('nombre_planta','N/A')],
+        ["Departamento", destino.get('nombre_departamento', 'N/A')],
+        ["Municipio o Ciudad", destino.get('nombre_municipios', 'N/A')],
+        ["Codigo INVIMA", codigo_invima],
+        ["Direccion", guia.get('direccion', 'N/A')],
+        ["Sacrificio y Despacho", guia.get('fecha', 'N/A')],
+    ]
+
+    table_info = Table(info)
+    table_info.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ]))
+
+    # Calcula el tamaño de la tabla y dibújala en la posición correcta
+    table_width, table_height = table_info.wrapOn(c, 500, y_position)
+    table_info.drawOn(c, 30, y_position - table_height)
+
+    # Actualiza la posición para la tabla de decomisos
+    y_position -= (table_height + 20)
+
+    # Informacion Del Destino
+    info_destino = [
+        ["Nombre Dueño", destino.get('nombre_dueno', 'N/A')],
+        ["Nombre Establecimiento", destino.get('nombre_establecimiento', 'N/A')],
+        ["Direccion", destino.get('direccion', 'N/A')],
+    ]
+
+    c.setFillColor(colors.red)
+    c.setFont("Helvetica-Bold", 10)
+    c.drawString(30, y_position, f"2.DESTINO")
+    y_position -= 15
+
+    table_destino = Table(info_destino)
+    table_destino.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ]))
+
+    # Calcula el tamaño de la tabla y dibújala en la posición correcta
+    table_width, table_height = table_destino.wrapOn(c, 500, y_position)
+    table_destino.drawOn(c, 30, y_position - table_height)
+
+    # Actualiza la posición para la tabla de Destino
+    y_position -= (table_height + 20)
+
+    # Detalles de la guía
+    data_detalles = [["ID Animal", "Especie", "Carne en Octavos", "Viseras Blancas", "Viseras Rojas", "Cabezas", "Temperatura Promedio", "Dictamen"]]
+    for detalle in detalles:
+        row = [
+            detalle.get('numero_animal', 'N/A'),
+            detalle.get('especie', 'N/A'),
+            detalle.get('carne_octavos', 'N/A'),
+            detalle.get('viseras_blancas', 'N/A'),
+            detalle.get('viseras_rojas', 'N/A'),
+            detalle.get('cabezas', 'N/A'),
+            detalle.get('temperatura_promedio', 'N/A'),
+            detalle.get('dictamen', 'N/A')
+        ]
+        data_detalles.append(row)
+
+    c.setFillColor(colors.red)
+    c.setFont("Helvetica-Bold", 10)
+    c.drawString(30, y_position, f"3. DESCRIPCION DEL PRODUCTO")
+    y_position -= 15
+
+    table_detalles = Table(data_detalles)
+    table_detalles.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]))
+
+    # Calcula el tamaño de la tabla y dibújala en la posición correcta
+    table_width, table_height = table_detalles.wrapOn(c, 500, y_position)
+    table_detalles.drawOn(c, 30, y_position - table_height)
+
+    # Actualiza la posición para la tabla de decomisos
+    y_position -= (table_height + 20)
+
+    c.setFillColor(colors.red)
+    c.setFont("Helvetica-Bold", 10)
+    c.drawString(30, y_position, f"4. VEHICULO TRANSPORTADOR")
+    y_position -= 15
+
+    transporte = [
+        ["Tipo Vehiculo ", guia.get('tipo_vehiculo','N/A')],
+        ["Placa", guia.get('placa', 'N/A')],
+        ["Nombre del Coductor", guia.get('nombre_conductor', 'N/A')],
+        ["N° Cedula", guia.get('numero_cedula', 'N/A')],
+        ["Tipo Refrigeracion", guia.get('tipo_refrigeracion', 'N/A')],
+
+    ]
+
+    table_transporte = Table(transporte)
+    table_transporte.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ]))
+
+    # Calcula el tamaño de la tabla y dibújala en la posición correcta
+    table_width, table_height = table_transporte.wrapOn(c, 500, y_position)
+    table_transporte.drawOn(c, 30, y_position - table_height)
+
+    # Actualiza la posición para la tabla de decomisos
+    y_position -= (table_height + 20)
+
+    c.setFillColor(colors.red)
+    c.setFont("Helvetica-Bold", 10)
+    c.drawString(30, y_position, f"5. DECOMISOS")
+    y_position -= 15
+
+    margen_inferior = 50
+
+    # Datos de decomisos
+    headers = ["Producto", "ID Animal", "Cantidad", "Motivo"]  # Encabezados
+    data_decomisos = [headers]  # Incluir los encabezados en la lista de datos
+    for decomiso in decomisos:
+        row = [
+            decomiso.get('producto', 'N/A'),
+            decomiso.get('numero_animal', 'N/A'),
+            decomiso.get('cantidad', 'N/A'),
+            decomiso.get('motivo', 'N/A'),
+        ]
+        data_decomisos.append(row)
+
+    # Calcular el alto de una fila de la tabla de decomisos
+    alto_fila = 12  # Ajusta este valor según el tamaño de la fuente y el padding de la tabla
+    # Definir el ancho fijo de las columnas
+    ancho_columnas = [50, 50, 50, 50]  # Ancho fijo de 100 puntos para cada columna
+
+    # Dibujar la tabla de decomisos fila por fila
+    for i, fila in enumerate(data_decomisos):
+        # Crear una tabla con una sola fila y ancho fijo
+        tabla_fila = Table([fila], colWidths=ancho_columnas)
+        tabla_fila.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey if i == 0 else colors.white),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke if i == 0 else colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]))
+
+        # Calcular el alto de la fila
+        _, alto_fila_actual = tabla_fila.wrapOn(c, 500, y_position)
+
+        # Verificar si la fila cabe en la página actual
+        if y_position - alto_fila_actual < margen_inferior:
+            c.showPage()  # Crear una nueva página
+            y_position = 950  # Reiniciar la posición vertical en la nueva página
+
+        # Dibujar la fila
+        tabla_fila.drawOn(c, 30, y_position - alto_fila_actual)
+        y_position -= alto_fila_actual
+
+    # Guardar el PDF
+    c.save()
+
+    os.replace(temporal, destino_final)
+    return destino_final
+
+
+class ColaPDF(QObject):
+    """
+    Maqueta los PDF de las guías en un pool de procesos y avisa en el hilo principal
+    cuando cada uno termina.
+
+    trabajos guarda el estado de cada guía encolada (EN_COLA, LISTO o ERROR). El pool
+    se crea con el primer PDF y sus procesos quedan vivos para los siguientes.
+    """
+
+    # Señales públicas; se reciben en el hilo principal
+    estado_cambiado = pyqtSignal(int, str)  # (id_guia_transporte, estado)
+    terminado = pyqtSignal(int, str)  # (id_guia_transporte, ruta del PDF)
+    fallido = pyqtSignal(int, str)  # (id_guia_transporte, mensaje)
+
+    # Señal interna: se emite desde el hilo del pool que recoge los resultados
+    _resultado = pyqtSignal(int, object, object)
+
+    def __init__(self, parent=None, procesos=None, directorio=DIRECTORIO_PDF):
+        super().__init__(parent)
+        self.procesos = procesos or os.cpu_count() or 1
+        self.directorio = directorio
+        self.trabajos = {}  # id_guia_transporte -> estado
+        self._pool = None
+
+        self._resultado.connect(self._entregar)
+
+    def _obtener_pool(self):
+        if self._pool is None:
+            # spawn y no fork: copiar un proceso con Qt y otros hilos activos puede bloquearse
+            self._pool = ProcessPoolExecutor(max_workers=self.procesos,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def encolar(self, id_guia_transporte, datos):
+        """Encola el PDF de la guía con los datos de OperacionesDB.obtener_datos_pdf."""
+        # Ruta absoluta: los procesos del pool conservan el directorio de trabajo con que se crearon
+        futuro = self._obtener_pool().submit(renderizar_guia, id_guia_transporte, datos,
+                                             os.path.abspath(self.directorio))
+        self._cambiar_estado(id_guia_transporte, EN_COLA)
+        futuro.add_done_callback(lambda f: self._resultado.emit(id_guia_transporte, *_desenvolver(f)))
+
+    def pendientes(self):
+        return sum(1 for estado in self.trabajos.values() if estado == EN_COLA)
+
+    def cerrar(self, esperar=True):
+        """Detiene el pool; con esperar=False descarta los PDF que no empezaron."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=esperar, cancel_futures=not esperar)
+            self._pool = None
+
+    def _cambiar_estado(self, id_guia_transporte, estado):
+        self.trabajos[id_guia_transporte] = estado
+        self.estado_cambiado.emit(id_guia_transporte, estado)
+
+    @pyqtSlot(int, object, object)
+    def _entregar(self, id_guia_transporte, ruta, error):
+        if error is None:
+            self._cambiar_estado(id_guia_transporte, LISTO)
+            self.terminado.emit(id_guia_transporte, ruta)
+            return
+        if isinstance(error, BrokenProcessPool):
+            # Un proceso murió (p. ej. sin memoria): el siguiente PDF crea un pool nuevo
+            self._pool = None
+        print(f"Error al generar el PDF de la guía {id_guia_transporte}: {error}")
+        self._cambiar_estado(id_guia_transporte, ERROR)
+        self.fallido.emit(id_guia_transporte, str(error))
+
+
+def _desenvolver(futuro):
+    """(ruta, None) si el PDF se generó o (None, excepción) si falló o se canceló."""
+    if futuro.cancelled():
+        return None, RuntimeError("PDF cancelado al cerrar la aplicación")
+    error = futuro.exception()
+    return (None, error) if error is not None else (futuro.result(), None)
@@ -0,0 +1,78 @@
+import os
+import socket
+import subprocess
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+def puerto_abierto(host, puerto, timeout=0.5):
+    """Indica si hay un servidor escuchando en host:puerto."""
+    try:
+        with socket.create_connection((host, puerto), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def iniciar_servidor_db():
+    """Lanza XAMPP sin esperar a que termine de arrancar."""
+    try:
+        if os.name == "nt":  # Windows
+            subprocess.Popen(["C:\\xampp\\xampp_start.exe"], shell=True)
+        else:  # Linux
+            subprocess.Popen(["sudo", "/opt/lampp/lampp", "start"])
+    except Exception as e:
+        print(f"Error al iniciar XAMPP: {e}")
+
+
+class VerificadorServidor(QThread):
+    """
+    Comprueba en segundo plano que MySQL acepte conexiones. Si el puerto está cerrado
+    inicia XAMPP una sola vez y vuelve a probar con espera exponencial hasta
+    espera_maxima segundos.
+    """
+
+    estado_cambiado = pyqtSignal(str)
+    listo = pyqtSignal()
+    fallido = pyqtSignal(str)
+
+    def __init__(self, host, puerto=3306, espera_maxima=60, parent=None):
+        super().__init__(parent)
+        self.host = host
+        self.puerto = puerto
+        self.espera_maxima = espera_maxima
+
+    def esperar(self, segundos):
+        """Duerme en intervalos cortos; retorna False si se pidió detener el hilo."""
+        fin = time.monotonic() + segundos
+        while time.monotonic() < fin:
+            if self.isInterruptionRequested():
+                return False
+            self.msleep(50)
+        return not self.isInterruptionRequested()
+
+    def run(self):
+        self.estado_cambiado.emit("Conectando con la base de datos...")
+        if puerto_abierto(self.host, self.puerto):
+            self.listo.emit()
+            return
+
+        self.estado_cambiado.emit("Iniciando el servidor de base de datos...")
+        iniciar_servidor_db()
+
+        limite = time.monotonic() + self.espera_maxima
+        espera = 0.25
+        intento = 1
+        while time.monotonic() < limite:
+            if not self.esperar(espera):
+                return
+            if puerto_abierto(self.host, self.puerto):
+                self.listo.emit()
+                return
+            intento += 1
+            self.estado_cambiado.emit(f"Esperando el servidor de base de datos (intento {intento})...")
+            espera = min(espera * 2, 4)
+
+        self.fallido.emit(f"El servidor de base de datos no respondió en {self.host}:{self.puerto} "
+                          f"después de {self.espera_maxima} segundos.")
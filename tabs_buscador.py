@@ -26,7 +26,11 @@ class ConsultaWidget(QWidget):
         # Pestaña 1: Buscador individual
         tab_widget.addTab(Buscador(), "Busqueda Individual")
         # Pestaña 2: Guías de Transporte
-        tab_widget.addTab(GuiasTransporteBuscador(), "Busqueda por Establecimiento")
+        self.buscador_guias = GuiasTransporteBuscador()
+        tab_widget.addTab(self.buscador_guias, "Busqueda por Establecimiento")
         
         layout.addWidget(tab_widget)
         self.setLayout(layout)
+
+    def recargar_catalogos(self):
+        self.buscador_guias.recargar_catalogos()